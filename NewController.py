@@ -8,35 +8,155 @@ from ryu.lib import hub
 import switch
 from datetime import datetime
 
-import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder, MinMaxScaler
-from sklearn.metrics import confusion_matrix, accuracy_score
-import joblib
 import os
+import subprocess
+import sys
+import time
 import traceback
 
-# Keras / TensorFlow
-from tensorflow.keras.models import Sequential, load_model
-from tensorflow.keras.layers import LSTM, Dense, Dropout
+from flow_store import FlowStatsStore, FlowRateCache, CsvDebugSink, KEY_COLUMN, stats_to_columns
+from poll_scheduler import AdaptivePollScheduler
+from inference_worker import InferenceWorker, InferenceJob
+from sequence_buffer import FlowSequenceBuffer
+from mitigation import MitigationManager
+from victims import rank_victims
+from metrics import MonitorMetrics, MetricsServer
+from stats_record import StatsRecorder
+from model_bundle import ModelBundle
+import model_bundle
+import model_artifacts
+
+# pandas / sklearn / Keras (TensorFlow) tidak di-import oleh controller: training
+# berjalan di proses retrain.py dan inferensi memakai bundle NumPy. joblib / sklearn
+# hanya di-import saat mengonversi file flat lama menjadi bundle.
+# Lihat bench_startup.py untuk perbandingan waktu startup.
+
+# hasil lstm.py (file flat): model Keras, scaler, label encoder, dan bundle inferensinya
+MODEL_H5_PATH = "flow_model.h5"
+SCALER_PATH = "flow_scaler.save"
+LABEL_ENCODER_PATH = "flow_le.save"
+MODEL_BUNDLE_PATH = "flow_model.bundle.npz"
+
+# direktori artefak berversi hasil retrain.py (model + scaler + label encoder per versi);
+# file flat di atas hanya dipakai jika belum ada versi yang dipublikasikan
+MODEL_DIR = model_artifacts.DEFAULT_ROOT
+TRAINING_CSV_PATH = "FlowStatsfile.csv"
+TRAINING_EPOCHS = 30
+
+# tulis snapshot prediksi ke PredictFlowStatsfile.csv (hanya untuk debug, asinkron)
+PREDICT_CSV_DEBUG = False
+PREDICT_CSV_PATH = "PredictFlowStatsfile.csv"
+
+# rekam reply flow stats mentah untuk replay_bench.py (None = tidak merekam), mis. "stats.ofsr.gz"
+STATS_RECORD_PATH = None
+
+# periode polling flow stats (detik): awal, dan batas bawah/atas interval adaptif per datapath
+POLL_INTERVAL = 10
+POLL_MIN_INTERVAL = 2
+POLL_MAX_INTERVAL = 30
+# batas tunggu reply per epoch; datapath yang belum selesai dianggap straggler
+STATS_REPLY_TIMEOUT = 3
+
+# filter OFPFlowStatsRequest agar switch hanya mengirim rule yang dimonitor.
+# STATS_TABLE_ID None = semua tabel (OFPTT_ALL); cookie mask 0 = cookie tidak difilter;
+# match eth_type IPv4 membuang table-miss dan flow ARP di sisi switch.
+STATS_TABLE_ID = None
+STATS_COOKIE = 0
+STATS_COOKIE_MASK = 0
+STATS_MATCH = {'eth_type': 0x0800}
+# priority rule per-flow yang dipasang switch (filter priority tidak ada di OF1.3)
+MONITORED_PRIORITY = 1
+
+# jumlah snapshot maksimum yang antre di worker inferensi (lebih dari ini, yang tertua dibuang)
+INFERENCE_MAX_PENDING = 2
+# interval event loop mengecek hasil inferensi yang sudah selesai (detik)
+INFERENCE_RESULT_POLL = 0.05
+
+# sekuens LSTM per flow: jumlah poll terakhir per window untuk model yang dilatih
+# retrain.py, jeda yang memutus sekuens (detik), dan jumlah flow maksimum yang dilacak
+SEQUENCE_TIMESTEPS = 5
+SEQUENCE_MAX_IDLE = 3 * POLL_MAX_INTERVAL
+SEQUENCE_CAPACITY = 100000
+
+# endpoint metrik Prometheus (GET /metrics): latensi / ukuran reply stats, waktu
+# preprocessing dan inferensi, rasio ddos, waktu sejak siklus terakhir yang berhasil
+METRICS_ENABLED = True
+METRICS_HOST = '127.0.0.1'
+METRICS_PORT = 9108
+
+# laporan epoch ddos: jumlah victim (ip_dst, urut packet rate ddos) dan sumber per victim
+VICTIM_REPORT_TOP = 3
+VICTIM_TOP_SOURCES = 5
+
+# mitigasi otomatis saat epoch terdeteksi ddos: rule 'drop' atau 'meter' (rate limit
+# per victim) untuk sumber teratas tiap victim, dihapus switch lewat hard_timeout.
+# priority harus di atas MONITORED_PRIORITY agar rule mitigasi didahulukan.
+MITIGATION_ENABLED = True
+MITIGATION_MODE = 'drop'
+MITIGATION_PRIORITY = 100
+MITIGATION_HARD_TIMEOUT = 60
+MITIGATION_MAX_SOURCES = 20
+# batas FlowMod / MeterMod per datapath agar mitigasi tidak membebani switch
+MITIGATION_FLOWMODS_PER_SECOND = 50
+MITIGATION_BURST = 100
+MITIGATION_METER_RATE_KBPS = 1000
 
 class SimpleMonitor13(switch.SimpleSwitch13):
 
     def __init__(self, *args, **kwargs):
         super(SimpleMonitor13, self).__init__(*args, **kwargs)
         self.datapaths = {}
-        self.monitor_thread = hub.spawn(self._monitor)
 
-        # tempat menyimpan model / scaler / encoder
+        # tempat menyimpan model / scaler / encoder (semuanya dari satu ModelBundle)
+        self.bundle = None
         self.flow_model = None
         self.scaler = None
         self.le = None
         self.timesteps = 1
         self.features = None
+        # versi artefak yang sedang dipakai dan proses retrain.py yang sedang berjalan
+        self.model_version = None
+        self.training_process = None
+        # T observasi terakhir per flow untuk model dengan timesteps > 1 (dibuat saat dibutuhkan)
+        self.sequence_buffer = None
+        self.sequence_max_idle = SEQUENCE_MAX_IDLE
+
+        # flow stats siklus polling berjalan disimpan di memori (kolumnar)
+        self.flow_store = FlowStatsStore()
+        # counter poll sebelumnya per flow untuk rate per interval
+        self.flow_rates = FlowRateCache()
+        # di-set reply handler ketika semua datapath epoch berjalan sudah reply
+        self.epoch_complete = hub.Event()
+        # interval polling adaptif per datapath (lihat poll_scheduler.status() / .history)
+        self.poll_scheduler = AdaptivePollScheduler(POLL_MIN_INTERVAL, POLL_MAX_INTERVAL, POLL_INTERVAL)
+        # model.predict dijalankan di OS thread, hasilnya diambil kembali oleh green thread
+        self.inference_worker = InferenceWorker(max_pending=INFERENCE_MAX_PENDING)
+        hub.spawn(self._inference_results_loop)
+        self.csv_sink = CsvDebugSink(PREDICT_CSV_PATH, logger=self.logger) if PREDICT_CSV_DEBUG else None
+        self.stats_recorder = StatsRecorder(STATS_RECORD_PATH) if STATS_RECORD_PATH else None
+        self.mitigation = None
+        if MITIGATION_ENABLED:
+            self.mitigation = MitigationManager(
+                MITIGATION_MODE, MITIGATION_PRIORITY, MITIGATION_HARD_TIMEOUT, MITIGATION_MAX_SOURCES,
+                MITIGATION_FLOWMODS_PER_SECOND, MITIGATION_BURST, MITIGATION_METER_RATE_KBPS)
+        # timing per tahap siklus monitor (selalu dicatat, endpoint HTTP opsional)
+        self.metrics = MonitorMetrics()
+        self.metrics.registry.add_collector(
+            lambda: self.metrics.collect(self.inference_worker, self.poll_scheduler))
+        if METRICS_ENABLED:
+            try:
+                MetricsServer(self.metrics.registry, METRICS_HOST, METRICS_PORT).start()
+            except OSError as e:
+                # mis. port sudah dipakai controller lain: monitor tetap jalan tanpa endpoint
+                self.logger.error("Server metrik %s:%d gagal dijalankan (%s), endpoint /metrics dimatikan.",
+                                  METRICS_HOST, METRICS_PORT, e)
 
         # spawn training agar tidak block startup
         hub.spawn(self._maybe_train_on_startup)
+        # _monitor dijalankan setelah semua state siap: start server metrik bisa
+        # berpindah ke green thread lain sebelum __init__ selesai
+        self.monitor_thread = hub.spawn(self._monitor)
 
     def _maybe_train_on_startup(self):
         """
@@ -44,18 +164,15 @@ class SimpleMonitor13(switch.SimpleSwitch13):
         Hal ini mencegah pelatihan yang tidak perlu setiap kali controller restart.
         """
         try:
-            model_path = "flow_model.h5"
-            scaler_path = "flow_scaler.save"
-            le_path = "flow_le.save"
+            if self._check_model_update():
+                return
 
-            if os.path.exists(model_path) and os.path.exists(scaler_path) and os.path.exists(le_path):
+            # belum ada versi di MODEL_DIR: coba file flat hasil lstm.py di direktori kerja
+            sources = (MODEL_H5_PATH, SCALER_PATH, LABEL_ENCODER_PATH)
+            if os.path.exists(MODEL_BUNDLE_PATH) or all(os.path.exists(p) for p in sources):
                 # load existing
                 try:
-                    self.flow_model = load_model(model_path)
-                    self.scaler = joblib.load(scaler_path)
-                    self.le = joblib.load(le_path)
-                    # features cannot be inferred reliably here; set to None but will be inferred during predict
-                    self.timesteps = 1
+                    self._use_bundle(self._load_flat_bundle(), None)
                     self.logger.info("Loaded existing LSTM model and preprocessing objects.")
                 except Exception:
                     self.logger.exception("Gagal load model/scaler/labelencoder, akan melakukan training ulang.")
@@ -66,6 +183,64 @@ class SimpleMonitor13(switch.SimpleSwitch13):
         except Exception:
             self.logger.exception("Error di _maybe_train_on_startup")
 
+    def _load_flat_bundle(self):
+        """
+        Muat flow_model.bundle.npz. Jika belum ada atau lebih lama dari
+        flow_model.h5 / flow_scaler.save / flow_le.save, bundle dibangun dulu
+        dari ketiga file tersebut (satu kali; load berikutnya hanya NumPy).
+        """
+        sources = [p for p in (MODEL_H5_PATH, SCALER_PATH, LABEL_ENCODER_PATH) if os.path.exists(p)]
+        stale = (not os.path.exists(MODEL_BUNDLE_PATH) or
+                 any(os.path.getmtime(MODEL_BUNDLE_PATH) < os.path.getmtime(p) for p in sources))
+        if stale and len(sources) == 3:
+            import joblib
+            model_bundle.save(MODEL_BUNDLE_PATH, MODEL_H5_PATH,
+                              joblib.load(SCALER_PATH), joblib.load(LABEL_ENCODER_PATH))
+            self.logger.info("%s dibangun dari %s", MODEL_BUNDLE_PATH, ', '.join(sources))
+        return ModelBundle.load(MODEL_BUNDLE_PATH)
+
+    def _use_bundle(self, bundle, version):
+        """
+        Pakai bundle untuk prediksi berikutnya. Model, scaler dan label diganti
+        bersamaan sehingga job inferensi selalu memakai set yang konsisten.
+        """
+        if (bundle.timesteps, bundle.sequence_max_idle, bundle.features) != (
+                self.timesteps, self.sequence_max_idle, self.bundle and self.bundle.features):
+            # history lama tidak sesuai panjang window / aturan idle / fitur model baru
+            self.sequence_buffer = None
+        self.bundle = bundle
+        self.flow_model, self.scaler, self.le = bundle.model, bundle.scaler, bundle.le
+        self.features = len(bundle.features)
+        self.timesteps = bundle.timesteps
+        self.sequence_max_idle = bundle.sequence_max_idle
+        self.model_version = version
+
+    def _check_model_update(self):
+        """
+        Ganti model jika CURRENT di MODEL_DIR menunjuk versi baru. Dipanggil dari
+        _monitor di antara siklus polling. Return True jika ada versi yang sedang dipakai.
+        """
+        if self.training_process is not None and self.training_process.poll() is not None:
+            if self.training_process.returncode != 0:
+                self.logger.error("retrain.py selesai dengan exit code %d, model lama tetap dipakai.",
+                                  self.training_process.returncode)
+            self.training_process = None
+
+        version = model_artifacts.current_version(MODEL_DIR)
+        if version is None or version == self.model_version:
+            return self.model_version is not None
+        try:
+            bundle = model_artifacts.load_version(version, MODEL_DIR)
+        except Exception:
+            self.logger.exception("Gagal load model versi %s, model lama tetap dipakai.", version)
+            return self.model_version is not None
+
+        previous = self.model_version
+        self._use_bundle(bundle, version)
+        self.logger.info("Model versi %s dipakai (sebelumnya: %s, timesteps: %d, val_accuracy: %s)",
+                         version, previous or '-', bundle.timesteps, bundle.meta.get('val_accuracy', '-'))
+        return True
+
     @set_ev_cls(ofp_event.EventOFPStateChange,
                 [MAIN_DISPATCHER, DEAD_DISPATCHER])
     def _state_change_handler(self, ev):
@@ -74,278 +249,252 @@ class SimpleMonitor13(switch.SimpleSwitch13):
             if datapath.id not in self.datapaths:
                 self.logger.debug('register datapath: %016x', datapath.id)
                 self.datapaths[datapath.id] = datapath
+                self.poll_scheduler.register(datapath.id)
         elif ev.state == DEAD_DISPATCHER:
             if datapath.id in self.datapaths:
                 self.logger.debug('unregister datapath: %016x', datapath.id)
                 del self.datapaths[datapath.id]
+                # jangan tunggu reply dari datapath yang sudah putus
+                self.flow_store.forget_datapath(datapath.id)
+                self.flow_rates.forget_datapath(datapath.id)
+                self.poll_scheduler.unregister(datapath.id)
+                if self.mitigation is not None:
+                    self.mitigation.forget_datapath(datapath.id)
+                self.metrics.forget_datapath(datapath.id)
 
     def _monitor(self):
         while True:
-            for dp in self.datapaths.values():
-                self._request_stats(dp)
-            hub.sleep(10)
-            # prediksi tiap 10 detik
-            self.flow_predict()
-
-    def _request_stats(self, datapath):
+            now = time.time()
+            # satu epoch polling mencakup semua datapath yang sudah jatuh tempo
+            datapaths = [self.datapaths[d] for d in self.poll_scheduler.due(now)
+                         if d in self.datapaths]
+            # model hasil retrain.py hanya diganti di sini, di antara siklus polling
+            self._check_model_update()
+            # rule mitigasi yang tertunda karena batas FlowMod per datapath
+            if self.mitigation is not None and self.mitigation.pending():
+                self.mitigation.flush(self.datapaths)
+            if datapaths:
+                epoch = self.flow_store.begin_epoch([dp.id for dp in datapaths])
+                self.epoch_complete.clear()
+                for dp in datapaths:
+                    self._request_stats(dp, epoch)
+                    self.poll_scheduler.mark_polled(dp.id, now)
+                # prediksi langsung setelah semua reply masuk, atau saat timeout straggler
+                self.epoch_complete.wait(timeout=STATS_REPLY_TIMEOUT)
+                self.flow_predict(epoch)
+            hub.sleep(self.poll_scheduler.next_wakeup())
+
+    def _request_stats(self, datapath, epoch):
         self.logger.debug('send stats request: %016x', datapath.id)
+        ofproto = datapath.ofproto
         parser = datapath.ofproto_parser
 
-        req = parser.OFPFlowStatsRequest(datapath)
+        table_id = ofproto.OFPTT_ALL if STATS_TABLE_ID is None else STATS_TABLE_ID
+        req = parser.OFPFlowStatsRequest(datapath, 0, table_id,
+                                         ofproto.OFPP_ANY, ofproto.OFPG_ANY,
+                                         STATS_COOKIE, STATS_COOKIE_MASK,
+                                         parser.OFPMatch(**STATS_MATCH))
+        # xid dipasang sebelum kirim agar reply bisa dipetakan ke epoch-nya
+        datapath.set_xid(req)
+        self.flow_store.expect_reply(epoch, datapath.id, req.xid)
+        self.metrics.stats_request(datapath.id)
         datapath.send_msg(req)
 
     @set_ev_cls(ofp_event.EventOFPFlowStatsReply, MAIN_DISPATCHER)
     def _flow_stats_reply_handler(self, ev):
 
         timestamp = datetime.now().timestamp()
-
-        # gunakan mode append, tapi sebelumnya file diinisialisasi header di tempat lain
-        # untuk menghindari race condition, kita tulis seluruh file setiap kali (sebagai pendekatan sederhana)
-        file0 = open("PredictFlowStatsfile.csv","w")
-        file0.write('timestamp,datapath_id,flow_id,ip_src,tp_src,ip_dst,tp_dst,ip_proto,icmp_code,icmp_type,flow_duration_sec,flow_duration_nsec,idle_timeout,hard_timeout,flags,packet_count,byte_count,packet_count_per_second,packet_count_per_nsecond,byte_count_per_second,byte_count_per_nsecond\n')
-        body = ev.msg.body
-        icmp_code = -1
-        icmp_type = -1
-        tp_src = 0
-        tp_dst = 0
-
-        for stat in sorted([flow for flow in body if (flow.priority == 1) ], key=lambda flow:
-            (flow.match.get('eth_type',0),flow.match.get('ipv4_src',''),flow.match.get('ipv4_dst',''),flow.match.get('ip_proto',0))):
-        
-            ip_src = stat.match.get('ipv4_src', '0.0.0.0')
-            ip_dst = stat.match.get('ipv4_dst', '0.0.0.0')
-            ip_proto = stat.match.get('ip_proto', 0)
-            
-            if ip_proto == 1:
-                icmp_code = stat.match.get('icmpv4_code', -1)
-                icmp_type = stat.match.get('icmpv4_type', -1)
-                
-            elif ip_proto == 6:
-                tp_src = stat.match.get('tcp_src', 0)
-                tp_dst = stat.match.get('tcp_dst', 0)
-
-            elif ip_proto == 17:
-                tp_src = stat.match.get('udp_src', 0)
-                tp_dst = stat.match.get('udp_dst', 0)
-
-            flow_id = str(ip_src) + str(tp_src) + str(ip_dst) + str(tp_dst) + str(ip_proto)
-          
-            try:
-                packet_count_per_second = stat.packet_count / stat.duration_sec
-                packet_count_per_nsecond = stat.packet_count / stat.duration_nsec
-            except Exception:
-                packet_count_per_second = 0
-                packet_count_per_nsecond = 0
-                
-            try:
-                byte_count_per_second = stat.byte_count / stat.duration_sec
-                byte_count_per_nsecond = stat.byte_count / stat.duration_nsec
-            except Exception:
-                byte_count_per_second = 0
-                byte_count_per_nsecond = 0
-                
-            file0.write("{},{},{},{},{},{},{},{},{},{},{},{},{},{},{},{},{},{},{},{},{}\n"
-                .format(timestamp, ev.msg.datapath.id, flow_id, ip_src, tp_src, ip_dst, tp_dst,
-                        ip_proto, icmp_code, icmp_type,
-                        stat.duration_sec, stat.duration_nsec,
-                        stat.idle_timeout, stat.hard_timeout,
-                        stat.flags if hasattr(stat, 'flags') else 0, stat.packet_count, stat.byte_count,
-                        packet_count_per_second, packet_count_per_nsecond,
-                        byte_count_per_second, byte_count_per_nsecond))
-            
-        file0.close()
+        msg = ev.msg
+        datapath_id = msg.datapath.id
+
+        epoch = self.flow_store.epoch_of(datapath_id, msg.xid)
+        if epoch is None:
+            # reply terlambat (epoch sudah diproses) atau bukan dari request _monitor
+            self.logger.debug('stats reply tanpa epoch dari %016x (xid=%d), diabaikan',
+                              datapath_id, msg.xid)
+            return
+
+        if self.stats_recorder is not None:
+            self.stats_recorder.write(timestamp, epoch, datapath_id, msg.buf)
+
+        # ekstraksi field + rate untuk seluruh bagian reply ini sekaligus (vektor numpy);
+        # setiap bagian multipart langsung diproses saat datang (tanpa buffer + sort)
+        columns = stats_to_columns(msg.body, timestamp, datapath_id,
+                                   MONITORED_PRIORITY, self.flow_rates)
+        self.flow_store.append(epoch, datapath_id, columns)
+
+        # multipart reply: tunggu sampai bagian terakhir (tanpa flag REPLY_MORE)
+        last = not (msg.flags & msg.datapath.ofproto.OFPMPF_REPLY_MORE)
+        self.metrics.stats_reply(datapath_id, len(msg.body), len(msg.buf or b''), last)
+        if last:
+            if self.flow_store.finish_reply(epoch, datapath_id) and epoch == self.flow_store.epoch:
+                # semua datapath sudah reply: bangunkan _monitor untuk klasifikasi
+                self.epoch_complete.set()
+
+    @set_ev_cls(ofp_event.EventOFPBarrierReply, MAIN_DISPATCHER)
+    def _barrier_reply_handler(self, ev):
+        if self.mitigation is None:
+            return
+        rules = self.mitigation.barrier_reply(ev.msg.datapath.id, ev.msg.xid)
+        if rules:
+            self.logger.debug('%d rule mitigasi terpasang di %016x', rules, ev.msg.datapath.id)
 
     def flow_training(self):
         """
-        Training LSTM menggunakan FlowStatsfile.csv.
-        Menyimpan model (flow_model.h5), scaler (flow_scaler.save), dan label encoder (flow_le.save).
+        Jalankan retrain.py di proses terpisah (training streaming dari FlowStatsfile.csv).
+        Tidak memblok event loop: model lama tetap dipakai untuk prediksi sampai
+        versi baru dipublikasikan ke MODEL_DIR dan diambil oleh _check_model_update().
         """
         try:
-            self.logger.info("Flow Training (LSTM) dimulai ...")
-            # 1. Load dataset
-            flow_dataset = pd.read_csv('FlowStatsfile.csv')
-
-            # 2. Simpan kolom ip_dst jika ingin digunakan kemudian (tidak digunakan untuk training)
-            # 3. Drop kolom non-numerik sesuai kode LSTM Anda
-            drop_cols = ['timestamp', 'datapath_id', 'flow_id', 'ip_src', 'ip_dst', 'flags']
-            flow_dataset = flow_dataset.drop(columns=drop_cols, errors='ignore')
-
-            # 4. Handle missing values
-            flow_dataset = flow_dataset.fillna(0)
-
-            # 5. Label encode (jika ada kolom 'label')
-            if 'label' not in flow_dataset.columns:
-                self.logger.error("Kolom 'label' tidak ditemukan di FlowStatsfile.csv. Training dibatalkan.")
+            if self.training_process is not None and self.training_process.poll() is None:
+                self.logger.info("Flow Training (LSTM) masih berjalan (pid %d).", self.training_process.pid)
                 return
-
-            le = LabelEncoder()
-            flow_dataset['label'] = le.fit_transform(flow_dataset['label'])
-
-            # 6. Split fitur dan target
-            X = flow_dataset.drop(columns=['label'])
-            y = flow_dataset['label'].values
-
-            # 7. Scaling
-            scaler = MinMaxScaler()
-            X_scaled = scaler.fit_transform(X.values.astype('float64'))
-
-            # 8. Reshape ke 3D untuk LSTM (timesteps=1)
-            X_lstm = X_scaled.reshape((X_scaled.shape[0], 1, X_scaled.shape[1]))
-
-            # 9. Train-test split
-            X_train, X_test, y_train, y_test = train_test_split(
-                X_lstm, y, test_size=0.2, random_state=42
-            )
-
-            # 10. Build model (mirip dengan yang Anda berikan)
-            n_features = X_train.shape[2]
-            model = Sequential()
-            model.add(LSTM(128, input_shape=(X_train.shape[1], X_train.shape[2]), return_sequences=False))
-            model.add(Dropout(0.3))
-            model.add(Dense(64, activation='relu'))
-            model.add(Dropout(0.3))
-            n_classes = len(np.unique(y_train))
-            if n_classes <= 2:
-                # binary classification -> gunakan 1 output dengan sigmoid (tapi karena Anda pakai sparse_categorical_crossentropy di kode awal, mempertahankan softmax)
-                model.add(Dense(2, activation='softmax'))
-                loss = 'sparse_categorical_crossentropy'
-            else:
-                model.add(Dense(n_classes, activation='softmax'))
-                loss = 'sparse_categorical_crossentropy'
-
-            model.compile(optimizer='adam', loss=loss, metrics=['accuracy'])
-
-            # 11. Training (jumlah epoch/batch dapat disesuaikan)
-            history = model.fit(
-                X_train, y_train,
-                epochs=30,
-                batch_size=64,
-                validation_data=(X_test, y_test),
-                verbose=1
-            )
-
-            # 12. Evaluasi singkat
-            loss_val, acc_val = model.evaluate(X_test, y_test, verbose=0)
-            self.logger.info("Akurasi Test (LSTM): {:.2f}%".format(acc_val * 100))
-
-            # 13. Simpan model & scaler & label encoder
-            model.save("flow_model.h5")
-            joblib.dump(scaler, "flow_scaler.save")
-            joblib.dump(le, "flow_le.save")
-
-            # 14. Assign ke atribut objek controller
-            self.flow_model = model
-            self.scaler = scaler
-            self.le = le
-            self.timesteps = 1
-            self.features = n_features
-
-            self.logger.info("Flow LSTM training selesai dan model disimpan sebagai flow_model.h5")
+            script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'retrain.py')
+            self.training_process = subprocess.Popen([
+                sys.executable, script,
+                '--csv', TRAINING_CSV_PATH,
+                '--models', MODEL_DIR,
+                '--epochs', str(TRAINING_EPOCHS),
+                '--timesteps', str(SEQUENCE_TIMESTEPS),
+                '--max-idle', str(SEQUENCE_MAX_IDLE),
+            ])
+            self.logger.info("Flow Training (LSTM) dimulai di proses terpisah (pid %d) ...",
+                             self.training_process.pid)
         except Exception:
             self.logger.exception("Error selama flow_training()")
 
-    def flow_predict(self):
+    def flow_predict(self, epoch):
         """
-        Baca PredictFlowStatsfile.csv, lakukan preprocessing yang identik, reshape,
-        predict dengan LSTM, dan laporkan apakah traffic ddos atau legitimate.
+        Ambil snapshot gabungan semua datapath untuk epoch dari memori dan kirim
+        ke worker inferensi. Preprocessing + predict LSTM berjalan di OS thread;
+        hasilnya dilaporkan oleh _report_prediction() dari _inference_results_loop.
         """
         try:
-            if self.flow_model is None or self.scaler is None or self.le is None:
-                self.logger.warning("Model atau scaler belum tersedia. Me-load jika file ada.")
-                # coba load dari disk jika ada
-                try:
-                    if os.path.exists("flow_model.h5"):
-                        self.flow_model = load_model("flow_model.h5")
-                    if os.path.exists("flow_scaler.save"):
-                        self.scaler = joblib.load("flow_scaler.save")
-                    if os.path.exists("flow_le.save"):
-                        self.le = joblib.load("flow_le.save")
-                    self.timesteps = 1
-                except Exception:
-                    self.logger.exception("Gagal load model/scaler dari disk. Prediksi dilewatkan.")
-                    return
-
-            # baca file predict
-            predict_flow_dataset = pd.read_csv('PredictFlowStatsfile.csv')
-
-            if predict_flow_dataset.shape[0] == 0:
-                # tidak ada data
+            # straggler (belum selesai reply saat timeout) tidak ikut diklasifikasi,
+            # reply mereka yang datang belakangan diabaikan oleh reply handler
+            if not self.flow_store.is_complete(epoch):
+                self.logger.warning("Epoch %d timeout, straggler: %s (%d baris dibuang)",
+                                    epoch, ', '.join('%016x' % d for d in self.flow_store.missing(epoch)),
+                                    self.flow_store.straggler_rows(epoch))
+
+            # ambil snapshot epoch ini dari memori (state epoch langsung dihapus,
+            # juga ketika prediksi dilewatkan agar buffer tidak terus membesar)
+            datapath_ids = self.flow_store.completed(epoch)
+            snapshot = self.flow_store.take(epoch)
+            self.flow_rates.commit(datapath_ids)
+            self.metrics.snapshot(len(snapshot))
+            if self.stats_recorder is not None:
+                self.stats_recorder.flush()
+
+            if len(snapshot) == 0:
+                # tidak ada data: traffic sepi, polling boleh diperlambat
+                self._update_poll_schedule(datapath_ids, snapshot, np.empty(0, dtype=np.int64))
+                self.metrics.success()
                 return
 
-            # simpan ip_dst sebelum drop agar bisa menentukan victim
-            ip_dst_series = None
-            if 'ip_dst' in predict_flow_dataset.columns:
-                ip_dst_series = predict_flow_dataset['ip_dst'].astype(str).values
-
-            # lakukan preprocessing sama seperti training: drop kolom non-numerik
-            drop_cols = ['timestamp', 'datapath_id', 'flow_id', 'ip_src', 'ip_dst', 'flags']
-            df_proc = predict_flow_dataset.drop(columns=drop_cols, errors='ignore')
-            df_proc = df_proc.fillna(0)
-
-            # Pastikan kolom urutannya sama seperti saat training: kita asumsikan file FlowStatsfile.csv dan PredictFlowStatsfile.csv
-            # memiliki kolom fitur identik setelah drop. Jika tidak identik, transformasi harus disesuaikan.
-            X_predict = df_proc.values.astype('float64')
-
-            # Jika scaler belum pernah fit, tidak bisa transform -> abort
-            if self.scaler is None:
-                self.logger.error("Scaler belum tersedia untuk transform. Prediksi dilewatkan.")
-                return
-
-            # transform dan reshape
-            try:
-                X_scaled = self.scaler.transform(X_predict)
-            except Exception:
-                # kemungkinan jumlah kolom berbeda -> log dan return
-                self.logger.exception("Gagal melakukan scaler.transform — kemungkinan fitur tidak cocok.")
-                return
+            if self.csv_sink is not None:
+                self.csv_sink.submit(snapshot)
 
-            X_lstm = X_scaled.reshape((X_scaled.shape[0], 1, X_scaled.shape[1]))
-
-            # predict
-            preds_proba = self.flow_model.predict(X_lstm)
-            preds = np.argmax(preds_proba, axis=1)
-
-            legitimate_trafic = 0
-            ddos_trafic = 0
-            victim = None
-
-            # hitung dan tentukan victim pertama jika ddos
-            for idx, p in enumerate(preds):
-                if p == 0:
-                    legitimate_trafic += 1
-                else:
-                    ddos_trafic += 1
-                    # coba ambil ip_dst dari ip_dst_series
-                    if ip_dst_series is not None and idx < len(ip_dst_series):
-                        ipdst = ip_dst_series[idx]
-                        # ambil oktet terakhir ip sebagai host id, jika gagal default 0
-                        try:
-                            last_octet = int(str(ipdst).strip().split('.')[-1])
-                            victim = last_octet % 20
-                        except Exception:
-                            victim = 0
-
-            total = len(preds)
-            self.logger.info("------------------------------------------------------------------------------")
-            if total == 0:
+            # model / scaler belum ada (training pertama masih berjalan) -> prediksi dilewatkan
+            if self.flow_model is None or self.scaler is None:
+                self.logger.warning("Model atau scaler belum tersedia untuk prediksi. Prediksi dilewatkan.")
                 return
 
-            if (legitimate_trafic / total * 100) > 80:
-                self.logger.info("legitimate traffic ... ({}%)".format(round(legitimate_trafic / total * 100, 2)))
-            else:
-                self.logger.info("ddos traffic ... ({}% ddos)".format(round(ddos_trafic / total * 100, 2)))
-                if victim is not None:
-                    self.logger.info("victim is host: h{}".format(victim))
-                else:
-                    self.logger.info("victim unknown")
-
-            self.logger.info("------------------------------------------------------------------------------")
-
-            # kosongkan file predict untuk siklus berikutnya (tulis header saja)
-            try:
-                with open("PredictFlowStatsfile.csv", "w") as f:
-                    f.write('timestamp,datapath_id,flow_id,ip_src,tp_src,ip_dst,tp_dst,ip_proto,icmp_code,icmp_type,flow_duration_sec,flow_duration_nsec,idle_timeout,hard_timeout,flags,packet_count,byte_count,packet_count_per_second,packet_count_per_nsecond,byte_count_per_second,byte_count_per_nsecond\n')
-            except Exception:
-                self.logger.exception("Gagal mengosongkan PredictFlowStatsfile.csv")
+            # history per flow diperbarui di event loop (urutan epoch terjaga), scaling di worker
+            prepare_start = time.time()
+            sequences = self._flow_sequences(snapshot) if self.timesteps > 1 else None
+            submitted = time.time()
+
+            # submit tidak memblok; saat antrian penuh snapshot tertua dibuang
+            job = InferenceJob(epoch, snapshot, datapath_ids, self.flow_model, self.scaler,
+                               self.bundle.feature_index, submitted, sequences,
+                               submitted - prepare_start)
+            if not self.inference_worker.submit(job):
+                self.logger.warning("Worker inferensi tertinggal, snapshot lama dibuang (total %d)",
+                                    self.inference_worker.dropped)
         except Exception:
             self.logger.exception("Error di flow_predict()")
+
+    def _flow_sequences(self, snapshot):
+        """
+        Tambahkan observasi epoch ini ke FlowSequenceBuffer dan kembalikan
+        (windows (flows, timesteps, features), lengths) fitur mentah per baris snapshot.
+        """
+        # urutan kolom fitur sudah divalidasi saat bundle di-load
+        X = snapshot.features(self.bundle.feature_index)
+        buffer = self.sequence_buffer
+        if buffer is None or buffer.n_features != X.shape[1]:
+            buffer = self.sequence_buffer = FlowSequenceBuffer(
+                self.timesteps, X.shape[1], SEQUENCE_CAPACITY, self.sequence_max_idle)
+        # waktu reply switch, basis waktu yang sama dengan kolom timestamp data training
+        now = float(snapshot.column('timestamp').max())
+        buffer.expire(now)
+        return buffer.push(snapshot.column(KEY_COLUMN), X, now)
+
+    def _inference_results_loop(self):
+        while True:
+            for job, result, error in self.inference_worker.results():
+                if error is not None:
+                    self.metrics.inference_error()
+                    self.logger.error("Gagal prediksi epoch %d.\n%s", job.epoch, error)
+                    continue
+                try:
+                    self.metrics.prediction(job, result)
+                    self._report_prediction(job, result.preds)
+                except Exception:
+                    self.logger.exception("Error di _report_prediction()")
+            hub.sleep(INFERENCE_RESULT_POLL)
+
+    def _report_prediction(self, job, preds):
+        """Laporkan hasil prediksi satu epoch: ddos atau legitimate, dan victim-nya."""
+        self._update_poll_schedule(job.datapath_ids, job.snapshot, preds)
+
+        total = len(preds)
+        self.logger.info("------------------------------------------------------------------------------")
+        if total == 0:
+            return
+
+        ddos_trafic = int(np.count_nonzero(preds))
+        legitimate_trafic = total - ddos_trafic
+
+        if (legitimate_trafic / total * 100) > 80:
+            self.logger.info("legitimate traffic ... ({}%)".format(round(legitimate_trafic / total * 100, 2)))
+        else:
+            self.logger.info("ddos traffic ... ({}% ddos)".format(round(ddos_trafic / total * 100, 2)))
+            # agregasi per ip_dst sekali untuk laporan dan mitigasi
+            top_k = VICTIM_TOP_SOURCES
+            if self.mitigation is not None:
+                top_k = max(top_k, self.mitigation.max_sources)
+            victims = rank_victims(job.snapshot, preds, top_k)
+            if not victims:
+                self.logger.info("victim unknown")
+            for rank, victim in enumerate(victims[:VICTIM_REPORT_TOP], 1):
+                self.logger.info("victim #%d: %s (%d/%d flow ddos, %.0f pkt/s, %.0f byte/s)",
+                                 rank, victim.ip_dst, victim.ddos_flows, victim.total_flows,
+                                 victim.pps, victim.bps)
+                self.logger.info("  sumber teratas: %s", ', '.join(
+                    '%s (%.0f pkt/s)' % (source.ip_src, source.pps)
+                    for source in victim.sources[:VICTIM_TOP_SOURCES]))
+            if len(victims) > VICTIM_REPORT_TOP:
+                self.logger.info("... dan %d victim lain", len(victims) - VICTIM_REPORT_TOP)
+            if self.mitigation is not None:
+                added = self.mitigation.plan(victims)
+                sent = self.mitigation.flush(self.datapaths)
+                self.logger.info("mitigasi (%s): %d rule baru, %d pesan dikirim, %d menunggu, %d aktif",
+                                 self.mitigation.mode, added, sum(sent.values()),
+                                 self.mitigation.pending(), self.mitigation.active())
+
+        self.logger.info("------------------------------------------------------------------------------")
+
+    def _update_poll_schedule(self, datapath_ids, snapshot, preds):
+        """Sesuaikan interval polling tiap datapath dari rasio ddos dan jumlah flow epoch ini."""
+        now = time.time()
+        dp_column = snapshot.column('datapath_id')
+        for datapath_id in datapath_ids:
+            mask = dp_column == datapath_id
+            n_flows = int(np.count_nonzero(mask))
+            ddos_ratio = float(np.count_nonzero(preds[mask])) / n_flows if n_flows else 0.0
+            change = self.poll_scheduler.update(datapath_id, ddos_ratio, n_flows, now)
+            if change is not None:
+                self.logger.info("poll interval %016x: %.1fs -> %.1fs (%s)",
+                                 datapath_id, change[0], change[1], change[2])
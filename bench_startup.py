@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+bench_startup.py
+
+Benchmark waktu startup SimpleMonitor13: import controller + konstruksi app
+sampai model siap dipakai, untuk backend lama (model Keras flow_model.h5 lewat
+TensorFlow load_model) dan backend controller sekarang (ModelBundle NumPy
+flow_model.bundle.npz, di-load oleh _maybe_train_on_startup). Setiap
+percobaan berjalan di proses Python baru agar waktu import dan RSS terukur
+dari nol. Bundle dan file lain hasil benchmark ditulis ke direktori
+sementara (tempfile.mkdtemp), bukan ke direktori repo.
+
+Usage:
+  python3 bench_startup.py
+  python3 bench_startup.py --runs 5 --batch 10000
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# kode yang dijalankan di proses anak (cwd = direktori sementara); mencetak satu baris JSON.
+# Server metrik dimatikan agar percobaan tidak berebut port.
+CHILD_TEMPLATE = r'''
+import json, resource, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {here!r})
+import controller
+controller.METRICS_ENABLED = False
+app = controller.SimpleMonitor13()
+{load}
+t1 = time.perf_counter()
+import numpy as np
+x = np.random.RandomState(0).rand(*shape).astype("float32")
+model.predict(x, verbose=0)
+t2 = time.perf_counter()
+model.predict(x, verbose=0)
+t3 = time.perf_counter()
+print(json.dumps({{
+    "startup": t1 - t0,
+    "first_predict": t2 - t1,
+    "predict": t3 - t2,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0,
+    "tensorflow_loaded": "tensorflow" in sys.modules,
+    "shape": list(shape),
+}}))
+'''
+
+BACKENDS = {
+    # startup lama: app tanpa bundle, model dari TensorFlow load_model
+    'keras (h5)': '''
+import os
+os.environ.setdefault("TF_CPP_MIN_LOG_LEVEL", "3")
+from tensorflow.keras.models import load_model
+model = load_model({h5!r})
+shape = ({batch},) + tuple(model.input_shape[1:])
+''',
+    # startup controller: bundle di direktori kerja di-load oleh green thread startup
+    'numpy (bundle)': '''
+from ryu.lib import hub
+while app.bundle is None and time.perf_counter() - t0 < {timeout}:
+    hub.sleep(0.001)
+if app.bundle is None:
+    raise RuntimeError("bundle tidak ter-load dalam {timeout} s")
+model = app.flow_model
+shape = ({batch}, app.timesteps, len(app.bundle.features))
+''',
+}
+
+
+def build_bundle(workdir, h5, scaler_path, le_path):
+    """
+    Tulis flow_model.bundle.npz ke workdir. Tanpa file scaler / label encoder,
+    dipakai scaler identitas dan label 0/1 (cukup untuk mengukur waktu).
+    """
+    sys.path.insert(0, HERE)
+    import numpy as np
+    import model_bundle
+    from flow_store import FEATURE_COLUMNS, INTERVAL_COLUMNS
+    from numpy_lstm import read_h5
+
+    if os.path.exists(scaler_path) and os.path.exists(le_path):
+        import joblib
+        scaler, le = joblib.load(scaler_path), joblib.load(le_path)
+    else:
+        n_features = read_h5(h5)[2][-1]
+        features = (FEATURE_COLUMNS + INTERVAL_COLUMNS)[:n_features]
+        scaler = model_bundle.BundleScaler(features, np.ones(len(features)), np.zeros(len(features)))
+        le = model_bundle.BundleLabels(np.array(['0', '1']))
+    return model_bundle.save(os.path.join(workdir, 'flow_model.bundle.npz'), h5, scaler, le)
+
+
+def run_child(load, workdir):
+    code = CHILD_TEMPLATE.format(load=load.strip(), here=HERE)
+    out = subprocess.run([sys.executable, '-c', code], cwd=workdir,
+                         stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if out.returncode != 0:
+        raise RuntimeError(out.stderr.strip().splitlines()[-1] if out.stderr.strip() else 'exit %d' % out.returncode)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Benchmark startup controller per backend inferensi LSTM")
+    p.add_argument("--h5", default=os.path.join(HERE, "flow_model.h5"))
+    p.add_argument("--scaler", default=os.path.join(HERE, "flow_scaler.save"))
+    p.add_argument("--le", default=os.path.join(HERE, "flow_le.save"))
+    p.add_argument("--runs", type=int, default=3, help="jumlah proses per backend (median dilaporkan)")
+    p.add_argument("--batch", type=int, default=1000, help="jumlah flow per batch predict")
+    p.add_argument("--timeout", type=float, default=60, help="batas tunggu bundle ter-load (detik)")
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix='bench-startup-')
+    try:
+        build_bundle(workdir, args.h5, args.scaler, args.le)
+        print("{:<15} {:>11} {:>15} {:>13} {:>12} {:>6}  {}".format(
+            "backend", "startup(s)", "first pred(s)", "predict(ms)", "max RSS(MB)", "TF?", "input"))
+        for name, load in BACKENDS.items():
+            load = load.format(h5=os.path.abspath(args.h5), batch=args.batch, timeout=args.timeout)
+            try:
+                results = [run_child(load, workdir) for _ in range(args.runs)]
+            except Exception as e:
+                print("{:<15} gagal: {}".format(name, e))
+                continue
+            med = lambda key: statistics.median(r[key] for r in results)
+            print("{:<15} {:>11.3f} {:>15.3f} {:>13.2f} {:>12.1f} {:>6}  {}".format(
+                name, med("startup"), med("first_predict"), med("predict") * 1000,
+                med("max_rss_mb"), "ya" if results[0]["tensorflow_loaded"] else "tidak",
+                tuple(results[0]["shape"])))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+# dataset_cache.py
+# Cache hasil preprocessing FlowStatsfile.csv (kolom non-numerik dibuang,
+# fillna(0), fitur float64 + label) dalam segmen .npy yang di-load dengan
+# mmap, sehingga training berikutnya tidak perlu mem-parse CSV lagi.
+#
+#   <cache_dir>/<nama csv>-<key>/
+#     manifest.json            <- ukuran/mtime/offset csv yang sudah diproses, hash prefix
+#     X_00000.npy y_00000.npy  <- satu segmen per chunk yang diproses (fitur, label)
+#     g_00000.npy t_00000.npy  <- id flow (hash datapath_id + flow_id) dan timestamp,
+#                                 untuk membangun sekuens per flow (sequence_buffer)
+#
+# key diturunkan dari path csv + konfigurasi preprocessing; konfigurasi berbeda
+# memakai direktori cache berbeda. Jika CSV hanya bertambah di akhir (append
+# oleh controller), hanya baris baru yang di-parse dan ditambahkan sebagai
+# segmen baru. Jika isi lama berubah, cache dibangun ulang.
+import hashlib
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from flow_store import DROP_COLUMNS
+
+CACHE_FORMAT = 2
+MANIFEST_FILE = 'manifest.json'
+DEFAULT_CHUNKSIZE = 100000
+_HASH_BLOCK = 1 << 20
+# kolom yang menentukan identitas flow untuk sekuens multi-timestep
+GROUP_COLUMNS = ('datapath_id', 'flow_id')
+
+
+def _config(label_column, drop_columns):
+    return {
+        'format': CACHE_FORMAT,
+        'label_column': label_column,
+        'drop_columns': list(drop_columns),
+        'fillna': 0,
+        'dtype': 'float64',
+    }
+
+
+def split_chunk(chunk, features, label_column):
+    """
+    Pecah satu chunk DataFrame CSV menjadi (X float64, y, id flow uint64, timestamp).
+    Dipakai oleh cache dan pembacaan CSV langsung agar hasilnya identik.
+    """
+    group_columns = [c for c in GROUP_COLUMNS if c in chunk.columns]
+    if group_columns:
+        groups = pd.util.hash_pandas_object(chunk[group_columns].astype(str), index=False).to_numpy()
+    else:
+        groups = np.zeros(len(chunk), dtype=np.uint64)
+    if 'timestamp' in chunk.columns:
+        timestamps = chunk['timestamp'].to_numpy(dtype=np.float64)
+    else:
+        timestamps = np.zeros(len(chunk), dtype=np.float64)
+    chunk = chunk.fillna(0)
+    X = chunk[features].to_numpy(dtype=np.float64)
+    y = chunk[label_column].to_numpy()
+    if y.dtype == object:
+        y = y.astype(str)
+    return X, y, groups, timestamps
+
+
+def cache_path(csv_path, cache_dir, label_column='label', drop_columns=DROP_COLUMNS):
+    config = _config(label_column, drop_columns)
+    key = hashlib.sha1(json.dumps([os.path.abspath(csv_path), config], sort_keys=True)
+                       .encode('utf-8')).hexdigest()[:12]
+    return os.path.join(cache_dir, '{}-{}'.format(os.path.basename(csv_path), key))
+
+
+class _BoundedReader(object):
+    """File-like read() yang berhenti di offset `end` (baris terakhir yang lengkap)."""
+
+    def __init__(self, f, end):
+        self._f = f
+        self._end = end
+
+    def read(self, size=-1):
+        remaining = self._end - self._f.tell()
+        if remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        return self._f.read(size)
+
+    def __iter__(self):
+        # dibutuhkan pandas untuk mengenali objek ini sebagai file-like
+        return iter(self.read().splitlines(True))
+
+
+def _hash_range(f, start, end, digest):
+    f.seek(start)
+    while start < end:
+        block = f.read(min(_HASH_BLOCK, end - start))
+        if not block:
+            break
+        digest.update(block)
+        start += len(block)
+    return digest
+
+
+def _last_line_end(f, size):
+    """Offset setelah newline terakhir: baris yang sedang ditulis tidak ikut diproses."""
+    pos = size
+    while pos > 0:
+        step = min(_HASH_BLOCK, pos)
+        f.seek(pos - step)
+        block = f.read(step)
+        i = block.rfind(b'\n')
+        if i >= 0:
+            return pos - step + i + 1
+        pos -= step
+    return 0
+
+
+_SEGMENT_ARRAYS = ('x', 'y', 'g', 't')
+
+
+class CachedDataset(object):
+    """Fitur (float64), label, id flow dan timestamp hasil cache, dibaca per chunk dari segmen mmap."""
+
+    def __init__(self, path, manifest):
+        self.path = path
+        self.features = manifest['features']
+        self.has_groups = manifest['has_groups']
+        self.n_rows = sum(seg['rows'] for seg in manifest['segments'])
+        self._segments = [[os.path.join(path, seg[name]) for name in _SEGMENT_ARRAYS]
+                          for seg in manifest['segments'] if seg['rows']]
+
+    def iter_chunks(self, chunksize=DEFAULT_CHUNKSIZE):
+        """
+        Yield (X, y, groups, timestamps) per `chunksize` baris, batasnya sama
+        dengan pd.read_csv(chunksize=...).
+        """
+        pending = [[] for _ in _SEGMENT_ARRAYS]
+        n_pending = 0
+        for paths in self._segments:
+            arrays = [np.load(p, mmap_mode='r') for p in paths]
+            n = len(arrays[0])
+            start = 0
+            while start < n:
+                take = min(chunksize - n_pending, n - start)
+                for parts, arr in zip(pending, arrays):
+                    parts.append(arr[start:start + take])
+                n_pending += take
+                start += take
+                if n_pending == chunksize:
+                    yield tuple(_join(parts) for parts in pending)
+                    pending = [[] for _ in _SEGMENT_ARRAYS]
+                    n_pending = 0
+        if n_pending:
+            yield tuple(_join(parts) for parts in pending)
+
+
+def _join(parts):
+    return np.asarray(parts[0]) if len(parts) == 1 else np.concatenate(parts)
+
+
+def _read_manifest(path):
+    try:
+        with open(os.path.join(path, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def _write_manifest(path, manifest):
+    tmp = os.path.join(path, MANIFEST_FILE + '.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(path, MANIFEST_FILE))
+
+
+def _append_segments(path, manifest, f, start, end, chunksize):
+    """Parse CSV byte [start, end) per chunk dan simpan tiap chunk sebagai segmen .npy."""
+    columns = manifest['columns']
+    features = manifest['features']
+    label_column = manifest['config']['label_column']
+    f.seek(start)
+    reader = pd.read_csv(_BoundedReader(f, end), header=None, names=columns, chunksize=chunksize)
+    for chunk in reader:
+        index = len(manifest['segments'])
+        segment = {'rows': len(chunk)}
+        for name, arr in zip(_SEGMENT_ARRAYS, split_chunk(chunk, features, label_column)):
+            segment[name] = '{}_{:05d}.npy'.format(name.upper() if name == 'x' else name, index)
+            np.save(os.path.join(path, segment[name]), arr)
+        manifest['segments'].append(segment)
+
+
+def load(csv_path, cache_dir, label_column='label', drop_columns=DROP_COLUMNS,
+         chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Return CachedDataset untuk csv_path, membangun atau memperbarui cache bila perlu:
+      - ukuran dan mtime sama           -> langsung dipakai (tanpa membaca CSV)
+      - CSV bertambah, prefix hash sama -> hanya baris baru yang di-parse
+      - selain itu                      -> cache dibangun ulang
+    """
+    config = _config(label_column, drop_columns)
+    path = cache_path(csv_path, cache_dir, label_column, drop_columns)
+    stat = os.stat(csv_path)
+    manifest = _read_manifest(path)
+    if manifest is not None and manifest.get('config') != config:
+        manifest = None
+    if manifest is not None and manifest['size'] == stat.st_size and manifest['mtime'] == stat.st_mtime:
+        return CachedDataset(path, manifest)
+
+    with open(csv_path, 'rb') as f:
+        end = _last_line_end(f, stat.st_size)
+        digest = hashlib.sha1()
+        if manifest is not None:
+            if manifest['offset'] <= end:
+                _hash_range(f, 0, manifest['offset'], digest)
+            if manifest['offset'] > end or digest.hexdigest() != manifest['prefix_sha1']:
+                manifest = None
+                digest = hashlib.sha1()
+
+        if manifest is None:
+            shutil.rmtree(path, ignore_errors=True)
+            os.makedirs(path)
+            f.seek(0)
+            header = f.readline()
+            columns = [c.strip() for c in header.decode('utf-8').strip().split(',')]
+            if label_column not in columns:
+                raise ValueError("Kolom '{}' tidak ditemukan di {}".format(label_column, csv_path))
+            manifest = {
+                'config': config,
+                'csv': os.path.abspath(csv_path),
+                'columns': columns,
+                'features': [c for c in columns if c != label_column and c not in drop_columns],
+                'has_groups': any(c in columns for c in GROUP_COLUMNS),
+                'segments': [],
+                'offset': len(header),
+            }
+            digest.update(header)
+
+        start = manifest['offset']
+        if end > start:
+            _append_segments(path, manifest, f, start, end, chunksize)
+            _hash_range(f, start, end, digest)
+            manifest['offset'] = end
+
+    manifest['prefix_sha1'] = digest.hexdigest()
+    manifest['size'] = stat.st_size
+    manifest['mtime'] = stat.st_mtime
+    _write_manifest(path, manifest)
+    return CachedDataset(path, manifest)
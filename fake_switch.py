@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+fake_switch.py
+
+Switch OpenFlow 1.3 palsu (asyncio, tanpa OVS / Mininet / root) untuk uji
+beban SimpleMonitor13. Setiap switch membuka koneksi TCP ke controller,
+menyelesaikan handshake (HELLO, FEATURES, PORT_DESC, ECHO) dan menjawab
+OFPFlowStatsRequest dengan tabel flow sintetis (synthetic_flows.py) dalam
+reply multipart.
+
+Counter flow benign bertambah terus; flow flood hanya ada dan bertambah
+selama fase flood (--flood-after / --flood-duration). Rule drop dari
+mitigasi controller (FlowMod tanpa instruksi dengan match ipv4_src /
+ipv4_dst) menghentikan counter flow yang cocok sampai hard_timeout habis.
+
+Usage:
+  python3 fake_switch.py --switches 100 --flows 5000
+  python3 fake_switch.py --controller 127.0.0.1:6653 --switches 1 --flows 1000000 \\
+      --flood-after 30 --flood-duration 60
+
+Filter pada OFPFlowStatsRequest (table, match, cookie) diabaikan: semua flow
+tabel adalah flow IPv4 priority 1 yang sama dengan yang diminta controller.
+"""
+import argparse
+import asyncio
+import socket
+import struct
+import sys
+import time
+
+from synthetic_flows import (OF_HEADER, OFP_VERSION, OFPMPF_REPLY_MORE, MULTIPART_HEADER,
+                             SyntheticFlowTable)
+
+OFPT_HELLO = 0
+OFPT_ECHO_REQUEST = 2
+OFPT_ECHO_REPLY = 3
+OFPT_FEATURES_REQUEST = 5
+OFPT_FEATURES_REPLY = 6
+OFPT_GET_CONFIG_REQUEST = 7
+OFPT_GET_CONFIG_REPLY = 8
+OFPT_FLOW_MOD = 14
+OFPT_MULTIPART_REQUEST = 18
+OFPT_MULTIPART_REPLY = 19
+OFPT_BARRIER_REQUEST = 20
+OFPT_BARRIER_REPLY = 21
+OFPT_METER_MOD = 29
+
+OFPMP_DESC = 0
+OFPMP_FLOW = 1
+OFPMP_PORT_DESC = 13
+
+OFPFC_ADD = 0
+_OXM_IPV4_SRC = 11
+_OXM_IPV4_DST = 12
+
+_FEATURES = struct.Struct('!QIBB2xII')
+_PORT = struct.Struct('!I4x6s2x16sIIIIIIII')
+_DESC = struct.Struct('!256s256s256s32s256s')
+_FLOW_MOD = struct.Struct('!QQBBHHHIIIH2x')
+_MATCH_HEADER = struct.Struct('!HH')
+_OXM_HEADER = struct.Struct('!HBB')
+
+# kemampuan yang diiklankan: flow / table / port stats
+_CAPABILITIES = 0x1 | 0x2 | 0x4
+_PORT_SPEED_KBPS = 10000000
+
+
+def _message(msg_type, xid, body=b''):
+    return OF_HEADER.pack(OFP_VERSION, msg_type, OF_HEADER.size + len(body), xid) + body
+
+
+def _multipart_reply(mp_type, xid, body=b'', more=False):
+    return _message(OFPT_MULTIPART_REPLY, xid,
+                    MULTIPART_HEADER.pack(mp_type, OFPMPF_REPLY_MORE if more else 0) + body)
+
+
+def parse_flow_mod(body):
+    """Return (command, hard_timeout, ipv4_src, ipv4_dst, ada_instruksi) dari body OFPFlowMod."""
+    (_, _, _, command, _, hard_timeout, _, _, _, _, _) = _FLOW_MOD.unpack_from(body)
+    offset = _FLOW_MOD.size
+    _, match_len = _MATCH_HEADER.unpack_from(body, offset)
+    fields = {}
+    pos = offset + _MATCH_HEADER.size
+    end = offset + match_len
+    while pos + _OXM_HEADER.size <= end:
+        _, field, length = _OXM_HEADER.unpack_from(body, pos)
+        value = body[pos + _OXM_HEADER.size:pos + _OXM_HEADER.size + length]
+        if not field & 1 and length == 4:
+            fields[field >> 1] = struct.unpack('!I', value)[0]
+        pos += _OXM_HEADER.size + length
+    has_instructions = len(body) > offset + (match_len + 7) // 8 * 8
+    return command, hard_timeout, fields.get(_OXM_IPV4_SRC), fields.get(_OXM_IPV4_DST), has_instructions
+
+
+class FakeSwitch(object):
+    """Satu datapath palsu: satu koneksi TCP ke controller dan satu SyntheticFlowTable."""
+
+    def __init__(self, dpid, table, n_ports=4, flood_after=None, flood_duration=None):
+        self.dpid = dpid
+        self.table = table
+        self.n_ports = n_ports
+        self.flood_after = flood_after
+        self.flood_duration = flood_duration
+        self.connected_at = None
+        self._last_advance = None
+        self.stats = dict(stats_requests=0, reply_messages=0, reply_bytes=0, reply_seconds=0.0,
+                          flow_mods=0, drop_rules=0, meter_mods=0, echo=0, connects=0)
+
+    def _update_flood(self, now):
+        if self.flood_after is None:
+            return
+        elapsed = now - self.connected_at
+        flooding = elapsed >= self.flood_after
+        if self.flood_duration is not None:
+            flooding = flooding and elapsed < self.flood_after + self.flood_duration
+        self.table.flooding = flooding
+
+    def _advance(self):
+        now = time.time()
+        self._update_flood(now)
+        if self._last_advance is not None:
+            self.table.advance(now - self._last_advance)
+        self._last_advance = now
+
+    async def run(self, host, port, reconnect):
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(host, port)
+            except OSError as e:
+                if not reconnect:
+                    raise
+                print("dpid {:016x}: gagal connect ({}), coba lagi".format(self.dpid, e), file=sys.stderr)
+                await asyncio.sleep(reconnect)
+                continue
+            sock = writer.get_extra_info('socket')
+            if sock is not None:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.stats['connects'] += 1
+            self.connected_at = self._last_advance = time.time()
+            try:
+                await self._session(reader, writer)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                pass
+            finally:
+                writer.close()
+            if not reconnect:
+                return
+            await asyncio.sleep(reconnect)
+
+    async def _session(self, reader, writer):
+        writer.write(_message(OFPT_HELLO, 0))
+        await writer.drain()
+        while True:
+            header = await reader.readexactly(OF_HEADER.size)
+            _, msg_type, length, xid = OF_HEADER.unpack(header)
+            body = await reader.readexactly(length - OF_HEADER.size) if length > OF_HEADER.size else b''
+            for reply in self._handle(msg_type, xid, body):
+                writer.write(reply)
+                # drain per bagian: reply besar tidak ditumpuk di buffer memori
+                await writer.drain()
+
+    def _handle(self, msg_type, xid, body):
+        if msg_type == OFPT_ECHO_REQUEST:
+            self.stats['echo'] += 1
+            return [_message(OFPT_ECHO_REPLY, xid, body)]
+        if msg_type == OFPT_FEATURES_REQUEST:
+            return [_message(OFPT_FEATURES_REPLY, xid,
+                             _FEATURES.pack(self.dpid, 0, 254, 0, _CAPABILITIES, 0))]
+        if msg_type == OFPT_GET_CONFIG_REQUEST:
+            return [_message(OFPT_GET_CONFIG_REPLY, xid, struct.pack('!HH', 0, 0xffff))]
+        if msg_type == OFPT_BARRIER_REQUEST:
+            return [_message(OFPT_BARRIER_REPLY, xid)]
+        if msg_type == OFPT_FLOW_MOD:
+            self._flow_mod(body)
+            return []
+        if msg_type == OFPT_METER_MOD:
+            self.stats['meter_mods'] += 1
+            return []
+        if msg_type == OFPT_MULTIPART_REQUEST:
+            return self._multipart(xid, body)
+        # HELLO, SET_CONFIG, PACKET_OUT, ROLE, ... tidak perlu dijawab
+        return []
+
+    def _multipart(self, xid, body):
+        mp_type, _ = MULTIPART_HEADER.unpack_from(body)
+        if mp_type == OFPMP_FLOW:
+            start = time.time()
+            self._advance()
+            replies = self.table.replies(xid)
+            self.stats['stats_requests'] += 1
+            self.stats['reply_messages'] += len(replies)
+            self.stats['reply_bytes'] += sum(len(r) for r in replies)
+            self.stats['reply_seconds'] += time.time() - start
+            return replies
+        if mp_type == OFPMP_PORT_DESC:
+            ports = b''.join(
+                _PORT.pack(i, bytes([0x02, 0, 0, 0, self.dpid & 0xff, i]),
+                           's{}-eth{}'.format(self.dpid, i).encode('ascii'),
+                           0, 0x4, 0x2820, 0x2820, 0x2820, 0, _PORT_SPEED_KBPS, _PORT_SPEED_KBPS)
+                for i in range(1, self.n_ports + 1))
+            return [_multipart_reply(mp_type, xid, ports)]
+        if mp_type == OFPMP_DESC:
+            return [_multipart_reply(mp_type, xid, _DESC.pack(
+                b'fake_switch', b'fake_switch.py', b'1.0', b'dpid-%d' % self.dpid, b'synthetic flows'))]
+        return [_multipart_reply(mp_type, xid)]
+
+    def _flow_mod(self, body):
+        self.stats['flow_mods'] += 1
+        command, hard_timeout, ip_src, ip_dst, has_instructions = parse_flow_mod(body)
+        # rule drop mitigasi: match alamat IPv4 tanpa instruksi
+        if command == OFPFC_ADD and not has_instructions and (ip_src is not None or ip_dst is not None):
+            self.stats['drop_rules'] += 1
+            self._advance()
+            self.table.block(ip_src, ip_dst, hard_timeout)
+
+
+async def _report(switches, interval):
+    previous = None
+    while True:
+        await asyncio.sleep(interval)
+        total = dict((k, sum(s.stats[k] for s in switches)) for k in switches[0].stats)
+        if previous is not None:
+            requests = total['stats_requests'] - previous['stats_requests']
+            seconds = total['reply_seconds'] - previous['reply_seconds']
+            print("{:.0f}s: {} terhubung, {} stats request ({:.1f} ms/reply), {:.1f} MB reply, "
+                  "{} flow mod ({} drop), {} meter mod".format(
+                      interval, sum(1 for s in switches if s.stats['connects']), requests,
+                      seconds / requests * 1000 if requests else 0.0,
+                      (total['reply_bytes'] - previous['reply_bytes']) / (1024.0 * 1024.0),
+                      total['flow_mods'] - previous['flow_mods'], total['drop_rules'] - previous['drop_rules'],
+                      total['meter_mods'] - previous['meter_mods']))
+        previous = total
+
+
+async def run(args):
+    host, _, port = args.controller.rpartition(':')
+    switches = []
+    for i in range(args.switches):
+        table = SyntheticFlowTable(args.flows, args.flood_fraction, n_victims=args.victims, seed=args.seed + i)
+        switches.append(FakeSwitch(args.dpid_base + i, table, args.ports,
+                                   args.flood_after, args.flood_duration))
+    print("{} switch x {} flow siap, connect ke {}".format(args.switches, args.flows, args.controller))
+    tasks = [asyncio.ensure_future(s.run(host or '127.0.0.1', int(port), args.reconnect)) for s in switches]
+    if args.report:
+        tasks.append(asyncio.ensure_future(_report(switches, args.report)))
+    await asyncio.gather(*tasks)
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Switch OpenFlow 1.3 palsu untuk uji beban SimpleMonitor13")
+    p.add_argument("--controller", default="127.0.0.1:6653", help="host:port controller Ryu")
+    p.add_argument("--switches", type=int, default=1, help="jumlah switch (satu koneksi TCP per switch)")
+    p.add_argument("--flows", type=int, default=1000, help="jumlah flow per switch")
+    p.add_argument("--flood-fraction", type=float, default=0.2, help="fraksi flow flood di tabel")
+    p.add_argument("--victims", type=int, default=1, help="jumlah host tujuan flood")
+    p.add_argument("--flood-after", type=float, default=None,
+                   help="flood mulai N detik setelah connect (default: flood selalu aktif)")
+    p.add_argument("--flood-duration", type=float, default=None, help="lama flood (detik, default: terus)")
+    p.add_argument("--ports", type=int, default=4, help="jumlah port per switch")
+    p.add_argument("--dpid-base", type=int, default=1, help="datapath id switch pertama")
+    p.add_argument("--reconnect", type=float, default=1.0, help="jeda reconnect (detik, 0 = keluar)")
+    p.add_argument("--report", type=float, default=10.0, help="interval ringkasan (detik, 0 = diam)")
+    p.add_argument("--seed", type=int, default=0)
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
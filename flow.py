@@ -1,17 +1,13 @@
 from enum import Enum
 from typing import Any
 from decimal import Decimal
+from datetime import datetime
 import math
 
 from . import constants
 from .features.context import packet_flow_key
 from .features.context.packet_direction import PacketDirection
-from .features.flag_count import FlagCount
-from .features.flow_bytes import FlowBytes
-from .features.packet_count import PacketCount
-from .features.packet_length import PacketLength
-from .features.packet_time import PacketTime
-from .utils import get_statistics
+from .packet_decoder import get_record_flow_key
 
 
 def _to_float_safe(x, default=0.0):
@@ -26,8 +22,152 @@ def _to_float_safe(x, default=0.0):
         return float(default)
 
 
+# Bit flag TCP, indeks sesuai huruf pertama nama flag (FIN, SYN, RST, ...)
+TCP_FLAGS = ("FIN", "SYN", "RST", "PSH", "ACK", "URG", "ECE", "CWR")
+_FLAG_BIT = {name: bit for bit, name in enumerate(TCP_FLAGS)}
+
+
+class RunningStat:
+    """Running count/total/min/max and Welford mean/variance of a series.
+
+    Replaces keeping the whole list of values: memory is constant no
+    matter how many values are added.
+    """
+
+    __slots__ = ("count", "total", "min", "max", "mean", "m2")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, value) -> None:
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def get_mean(self) -> float:
+        return self.total / self.count if self.count else 0
+
+    def get_var(self) -> float:
+        """Population variance (numpy.var)."""
+        return self.m2 / self.count if self.count else 0
+
+    def get_std(self) -> float:
+        return math.sqrt(self.get_var())
+
+    def get_statistics(self) -> dict:
+        """Same result as utils.get_statistics on the list of values."""
+        if self.count > 1:
+            return {
+                "total": float(self.total),
+                "max": float(self.max),
+                "min": float(self.min),
+                "mean": self.get_mean(),
+                "std": self.get_std(),
+            }
+        return {"total": 0, "max": 0, "min": 0, "mean": 0, "std": 0}
+
+
+class DirectionStats:
+    """Per-direction accumulators of a flow (forward or reverse)."""
+
+    __slots__ = (
+        "packet_length",
+        "iat",
+        "last_time",
+        "header_total",
+        "header_min",
+        "payload_packets",
+        "flags",
+    )
+
+    def __init__(self):
+        self.packet_length = RunningStat()
+        self.iat = RunningStat()
+        self.last_time = None
+        self.header_total = 0
+        self.header_min = None
+        self.payload_packets = 0
+        self.flags = [0] * len(TCP_FLAGS)
+
+    @property
+    def packets(self) -> int:
+        return self.packet_length.count
+
+    def add(self, packet_time, length, header_size, payload_size, tcp_flags) -> None:
+        self.packet_length.add(length)
+        if self.last_time is not None:
+            self.iat.add(1e6 * float(packet_time - self.last_time))
+        self.last_time = packet_time
+        self.header_total += header_size
+        if self.header_min is None or header_size < self.header_min:
+            self.header_min = header_size
+        if payload_size > 0:
+            self.payload_packets += 1
+        if tcp_flags:
+            for bit in range(len(TCP_FLAGS)):
+                if tcp_flags & (1 << bit):
+                    self.flags[bit] += 1
+
+
 class Flow:
-    """This class summarizes the values of the features of the network flows"""
+    """This class summarizes the values of the features of the network flows.
+
+    Packets are not kept: every feature of get_data is derived from running
+    per-direction accumulators, so memory per flow is constant.
+    """
+
+    __slots__ = (
+        "protocol",
+        "dest_ip",
+        "src_ip",
+        "src_port",
+        "dest_port",
+        "src_mac",
+        "dest_mac",
+        "icmp_type",
+        "icmp_code",
+        "forward",
+        "backward",
+        "packet_length",
+        "flow_interarrival_time",
+        "first_timestamp",
+        "min_timestamp",
+        "max_timestamp",
+        "latest_timestamp",
+        "start_timestamp",
+        "init_window_size",
+        "start_active",
+        "last_active",
+        "active",
+        "idle",
+        "forward_bulk_last_timestamp",
+        "forward_bulk_start_tmp",
+        "forward_bulk_count",
+        "forward_bulk_count_tmp",
+        "forward_bulk_duration",
+        "forward_bulk_packet_count",
+        "forward_bulk_size",
+        "forward_bulk_size_tmp",
+        "backward_bulk_last_timestamp",
+        "backward_bulk_start_tmp",
+        "backward_bulk_count",
+        "backward_bulk_count_tmp",
+        "backward_bulk_duration",
+        "backward_bulk_packet_count",
+        "backward_bulk_size",
+        "backward_bulk_size_tmp",
+    )
 
     def __init__(self, packet: Any, direction: Enum):
         """This method initializes an object from the Flow class.
@@ -61,8 +201,41 @@ class Flow:
             print(f"Error creating flow key: {e}")
             raise ValueError(f"Cannot create flow from packet: {packet.summary()}")
 
-        self.packets = []
-        self.flow_interarrival_time = []
+        self._init_state()
+
+    @classmethod
+    def from_record(cls, record, direction: Enum) -> "Flow":
+        """Creates a flow from a packet_decoder.PacketRecord (no scapy).
+
+        Args:
+            record: The decoded first packet of the flow.
+            direction (Enum): The direction the packet is going ove the wire.
+        """
+        flow = cls.__new__(cls)
+        flow.protocol = record.protocol
+        (
+            flow.dest_ip,
+            flow.src_ip,
+            flow.src_port,
+            flow.dest_port,
+        ) = get_record_flow_key(record, direction)
+        flow.src_mac = record.src_mac
+        flow.dest_mac = record.dst_mac
+        flow.icmp_type = record.icmp_type
+        flow.icmp_code = record.icmp_code
+        flow._init_state()
+        return flow
+
+    def _init_state(self):
+        # Akumulator per arah dan seluruh flow (pengganti list self.packets)
+        self.forward = DirectionStats()
+        self.backward = DirectionStats()
+        self.packet_length = RunningStat()
+        self.flow_interarrival_time = RunningStat()
+        self.first_timestamp = None
+        self.min_timestamp = None
+        self.max_timestamp = None
+
         self.latest_timestamp = 0.0
         self.start_timestamp = 0.0
         self.init_window_size = {
@@ -72,8 +245,8 @@ class Flow:
 
         self.start_active = 0.0
         self.last_active = 0.0
-        self.active = []
-        self.idle = []
+        self.active = RunningStat()
+        self.idle = RunningStat()
 
         self.forward_bulk_last_timestamp = 0.0
         self.forward_bulk_start_tmp = 0.0
@@ -92,6 +265,34 @@ class Flow:
         self.backward_bulk_size = 0
         self.backward_bulk_size_tmp = 0
 
+    def _direction(self, direction) -> DirectionStats:
+        return self.forward if direction == PacketDirection.FORWARD else self.backward
+
+    def get_total(self, packet_direction=None) -> int:
+        """Packet count by direction (all packets if None)."""
+        if packet_direction is None:
+            return self.packet_length.count
+        return self._direction(packet_direction).packets
+
+    def get_flag_count(self, flag, packet_direction=None) -> int:
+        """Number of packets with the TCP flag (e.g. "PSH") set."""
+        bit = _FLAG_BIT[flag]
+        if packet_direction is None:
+            return self.forward.flags[bit] + self.backward.flags[bit]
+        return self._direction(packet_direction).flags[bit]
+
+    def get_duration(self) -> float:
+        if self.first_timestamp is None:
+            return 0.0
+        return float(self.max_timestamp - self.min_timestamp)
+
+    def get_timestamp(self) -> str:
+        time = float(self.first_timestamp)
+        return datetime.fromtimestamp(time).strftime("%Y-%m-%d %H:%M:%S")
+
+    def _rate(self, value, duration) -> float:
+        return value / duration if duration != 0 else 0
+
     def get_data(self) -> dict:
         """This method obtains the values of the features extracted from each flow.
 
@@ -103,16 +304,14 @@ class Flow:
         Returns:
            dict: returns a dict of values to be outputted into a csv file.
         """
-        flow_bytes = FlowBytes(self)
-        flag_count = FlagCount(self)
-        packet_count = PacketCount(self)
-        packet_length = PacketLength(self)
-        packet_time = PacketTime(self)
-        flow_iat = get_statistics(self.flow_interarrival_time)
-        forward_iat = get_statistics(packet_time.get_packet_iat(PacketDirection.FORWARD))
-        backward_iat = get_statistics(packet_time.get_packet_iat(PacketDirection.REVERSE))
-        active_stat = get_statistics(self.active)
-        idle_stat = get_statistics(self.idle)
+        forward, backward = self.forward, self.backward
+        fwd_length, bwd_length = forward.packet_length, backward.packet_length
+        duration = self.get_duration()
+        flow_iat = self.flow_interarrival_time.get_statistics()
+        forward_iat = forward.iat.get_statistics()
+        backward_iat = backward.iat.get_statistics()
+        active_stat = self.active.get_statistics()
+        idle_stat = self.idle.get_statistics()
 
         # Make sure numeric outputs are floats to avoid Decimal*float issues
         def _g(k, default=0.0):
@@ -128,35 +327,35 @@ class Flow:
             "dst_port": self.dest_port,
             "protocol": self.protocol,
             # Basic information from packet times
-            "timestamp": packet_time.get_time_stamp(),
-            "flow_duration": _g(packet_time.get_duration()),
-            "flow_byts_s": _g(flow_bytes.get_rate()),
-            "flow_pkts_s": _g(packet_count.get_rate()),
-            "fwd_pkts_s": _g(packet_count.get_rate(PacketDirection.FORWARD)),
-            "bwd_pkts_s": _g(packet_count.get_rate(PacketDirection.REVERSE)),
+            "timestamp": self.get_timestamp(),
+            "flow_duration": _g(duration),
+            "flow_byts_s": _g(self._rate(self.packet_length.total, duration)),
+            "flow_pkts_s": _g(self._rate(self.packet_length.count, duration)),
+            "fwd_pkts_s": _g(self._rate(forward.packets, duration)),
+            "bwd_pkts_s": _g(self._rate(backward.packets, duration)),
             # Count total packets by direction
-            "tot_fwd_pkts": _g(packet_count.get_total(PacketDirection.FORWARD)),
-            "tot_bwd_pkts": _g(packet_count.get_total(PacketDirection.REVERSE)),
+            "tot_fwd_pkts": _g(forward.packets),
+            "tot_bwd_pkts": _g(backward.packets),
             # Statistical info obtained from Packet lengths
-            "totlen_fwd_pkts": _g(packet_length.get_total(PacketDirection.FORWARD)),
-            "totlen_bwd_pkts": _g(packet_length.get_total(PacketDirection.REVERSE)),
-            "fwd_pkt_len_max": _g(packet_length.get_max(PacketDirection.FORWARD)),
-            "fwd_pkt_len_min": _g(packet_length.get_min(PacketDirection.FORWARD)),
-            "fwd_pkt_len_mean": _g(packet_length.get_mean(PacketDirection.FORWARD)),
-            "fwd_pkt_len_std": _g(packet_length.get_std(PacketDirection.FORWARD)),
-            "bwd_pkt_len_max": _g(packet_length.get_max(PacketDirection.REVERSE)),
-            "bwd_pkt_len_min": _g(packet_length.get_min(PacketDirection.REVERSE)),
-            "bwd_pkt_len_mean": _g(packet_length.get_mean(PacketDirection.REVERSE)),
-            "bwd_pkt_len_std": _g(packet_length.get_std(PacketDirection.REVERSE)),
-            "pkt_len_max": _g(packet_length.get_max()),
-            "pkt_len_min": _g(packet_length.get_min()),
-            "pkt_len_mean": _g(packet_length.get_mean()),
-            "pkt_len_std": _g(packet_length.get_std()),
-            "pkt_len_var": _g(packet_length.get_var()),
-            "fwd_header_len": _g(flow_bytes.get_forward_header_bytes()),
-            "bwd_header_len": _g(flow_bytes.get_reverse_header_bytes()),
-            "fwd_seg_size_min": _g(flow_bytes.get_min_forward_header_bytes()),
-            "fwd_act_data_pkts": packet_count.has_payload(PacketDirection.FORWARD),
+            "totlen_fwd_pkts": _g(fwd_length.total),
+            "totlen_bwd_pkts": _g(bwd_length.total),
+            "fwd_pkt_len_max": _g(fwd_length.max),
+            "fwd_pkt_len_min": _g(fwd_length.min),
+            "fwd_pkt_len_mean": _g(fwd_length.get_mean()),
+            "fwd_pkt_len_std": _g(fwd_length.get_std()),
+            "bwd_pkt_len_max": _g(bwd_length.max),
+            "bwd_pkt_len_min": _g(bwd_length.min),
+            "bwd_pkt_len_mean": _g(bwd_length.get_mean()),
+            "bwd_pkt_len_std": _g(bwd_length.get_std()),
+            "pkt_len_max": _g(self.packet_length.max),
+            "pkt_len_min": _g(self.packet_length.min),
+            "pkt_len_mean": _g(self.packet_length.get_mean()),
+            "pkt_len_std": _g(self.packet_length.get_std()),
+            "pkt_len_var": _g(self.packet_length.get_var()),
+            "fwd_header_len": _g(forward.header_total),
+            "bwd_header_len": _g(backward.header_total),
+            "fwd_seg_size_min": _g(forward.header_min),
+            "fwd_act_data_pkts": forward.payload_packets,
             # Flows Interarrival Time
             "flow_iat_mean": _g(flow_iat.get("mean", 0.0)),
             "flow_iat_max": _g(flow_iat.get("max", 0.0)),
@@ -173,20 +372,20 @@ class Flow:
             "bwd_iat_mean": _g(backward_iat.get("mean", 0.0)),
             "bwd_iat_std": _g(backward_iat.get("std", 0.0)),
             # Flags statistics
-            "fwd_psh_flags": flag_count.has_flag("PSH", PacketDirection.FORWARD),
-            "bwd_psh_flags": flag_count.has_flag("PSH", PacketDirection.REVERSE),
-            "fwd_urg_flags": flag_count.has_flag("URG", PacketDirection.FORWARD),
-            "bwd_urg_flags": flag_count.has_flag("URG", PacketDirection.REVERSE),
-            "fin_flag_cnt": flag_count.has_flag("FIN"),
-            "syn_flag_cnt": flag_count.has_flag("SYN"),
-            "rst_flag_cnt": flag_count.has_flag("RST"),
-            "psh_flag_cnt": flag_count.has_flag("PSH"),
-            "ack_flag_cnt": flag_count.has_flag("ACK"),
-            "urg_flag_cnt": flag_count.has_flag("URG"),
-            "ece_flag_cnt": flag_count.has_flag("ECE"),
+            "fwd_psh_flags": self.get_flag_count("PSH", PacketDirection.FORWARD),
+            "bwd_psh_flags": self.get_flag_count("PSH", PacketDirection.REVERSE),
+            "fwd_urg_flags": self.get_flag_count("URG", PacketDirection.FORWARD),
+            "bwd_urg_flags": self.get_flag_count("URG", PacketDirection.REVERSE),
+            "fin_flag_cnt": self.get_flag_count("FIN"),
+            "syn_flag_cnt": self.get_flag_count("SYN"),
+            "rst_flag_cnt": self.get_flag_count("RST"),
+            "psh_flag_cnt": self.get_flag_count("PSH"),
+            "ack_flag_cnt": self.get_flag_count("ACK"),
+            "urg_flag_cnt": self.get_flag_count("URG"),
+            "ece_flag_cnt": self.get_flag_count("ECE"),
             # Response Time
-            "down_up_ratio": packet_count.get_down_up_ratio(),
-            "pkt_size_avg": _g(packet_length.get_avg()),
+            "down_up_ratio": backward.packets / forward.packets if forward.packets > 0 else 0,
+            "pkt_size_avg": _g(self.packet_length.get_mean()),
             "init_fwd_win_byts": _g(self.init_window_size.get(PacketDirection.FORWARD, 0)),
             "init_bwd_win_byts": _g(self.init_window_size.get(PacketDirection.REVERSE, 0)),
             "active_max": _g(active_stat.get("max", 0.0)),
@@ -197,12 +396,12 @@ class Flow:
             "idle_min": _g(idle_stat.get("min", 0.0)),
             "idle_mean": _g(idle_stat.get("mean", 0.0)),
             "idle_std": _g(idle_stat.get("std", 0.0)),
-            "fwd_byts_b_avg": _g(flow_bytes.get_bytes_per_bulk(PacketDirection.FORWARD)),
-            "fwd_pkts_b_avg": _g(flow_bytes.get_packets_per_bulk(PacketDirection.FORWARD)),
-            "bwd_byts_b_avg": _g(flow_bytes.get_bytes_per_bulk(PacketDirection.REVERSE)),
-            "bwd_pkts_b_avg": _g(flow_bytes.get_packets_per_bulk(PacketDirection.REVERSE)),
-            "fwd_blk_rate_avg": _g(flow_bytes.get_bulk_rate(PacketDirection.FORWARD)),
-            "bwd_blk_rate_avg": _g(flow_bytes.get_bulk_rate(PacketDirection.REVERSE)),
+            "fwd_byts_b_avg": _g(self._rate(self.forward_bulk_size, self.forward_bulk_count)),
+            "fwd_pkts_b_avg": _g(self._rate(self.forward_bulk_packet_count, self.forward_bulk_count)),
+            "bwd_byts_b_avg": _g(self._rate(self.backward_bulk_size, self.backward_bulk_count)),
+            "bwd_pkts_b_avg": _g(self._rate(self.backward_bulk_packet_count, self.backward_bulk_count)),
+            "fwd_blk_rate_avg": _g(self._rate(self.forward_bulk_size, self.forward_bulk_duration)),
+            "bwd_blk_rate_avg": _g(self._rate(self.backward_bulk_size, self.backward_bulk_duration)),
         }
 
         # Set default untuk protokol non-TCP
@@ -238,113 +437,145 @@ class Flow:
         return data
 
     def add_packet(self, packet: Any, direction: Enum) -> None:
-        """Adds a packet to the current list of packets.
+        """Adds a packet to the flow statistics.
 
         Args:
             packet: Packet to be added to a flow
             direction: The direction the packet is going in that flow
         """
-        self.packets.append((packet, direction))
+        tcp_flags = 0
+        window = None
+        if packet.haslayer("TCP"):
+            layer = packet.getlayer("TCP")
+            tcp_flags = int(layer.flags)
+            window = layer.window
+            header_size = packet["IP"].ihl * 4
+        else:
+            layer = packet.getlayer("UDP") or packet.getlayer("ICMP")
+            header_size = 8
+        payload_size = len(layer.payload) if layer is not None else 0
+        # protocol might be None; keep previous if not present
+        protocol = packet.proto if hasattr(packet, "proto") else None
+
+        self._add(
+            packet.time,
+            direction,
+            len(packet),
+            header_size,
+            payload_size,
+            tcp_flags,
+            window,
+            protocol,
+        )
+
+    def add_record(self, record, direction: Enum) -> None:
+        """Adds a packet_decoder.PacketRecord, same as add_packet for the packet."""
+        self._add(
+            record.time,
+            direction,
+            record.length,
+            record.header_size,
+            record.payload_size,
+            record.tcp_flags,
+            record.window,
+            record.protocol,
+        )
+
+    def _add(self, packet_time, direction, length, header_size, payload_size,
+             tcp_flags, window, protocol) -> None:
+        """Update every accumulator with the fields of one packet.
+
+        packet_time is kept as given (float or scapy EDecimal from pcap) for
+        the inter-arrival and duration differences, like the packet list was.
+        """
+        self._direction(direction).add(
+            packet_time, length, header_size, payload_size, tcp_flags
+        )
+        self.packet_length.add(length)
+        if self.first_timestamp is None:
+            self.first_timestamp = self.min_timestamp = self.max_timestamp = packet_time
+        elif packet_time < self.min_timestamp:
+            self.min_timestamp = packet_time
+        elif packet_time > self.max_timestamp:
+            self.max_timestamp = packet_time
+        raw_time, packet_time = packet_time, _to_float_safe(packet_time)
 
         # Update flow dan subflow
-        self.update_flow_bulk(packet, direction)
-        self.update_subflow(packet)
+        self.update_flow_bulk(packet_time, payload_size, direction)
+        self.update_subflow(packet_time)
 
-        # Hitung interarrival time (safely)
+        # Hitung interarrival time
         if self.start_timestamp != 0:
-            try:
-                # ensure numeric values are floats
-                self.flow_interarrival_time.append(
-                    1e6 * float(packet.time - float(self.latest_timestamp))
-                )
-            except Exception as e:
-                # don't crash on a weird timestamp type
-                print("[Warning] flow interarrival calc error:", e)
-                self.flow_interarrival_time.append(0.0)
-
-        # latest timestamp (ensure float)
-        try:
-            self.latest_timestamp = max([float(packet.time), float(self.latest_timestamp)])
-        except Exception:
-            # fallback
-            self.latest_timestamp = float(packet.time)
+            self.flow_interarrival_time.add(1e6 * float(raw_time - self.latest_timestamp))
+
+        self.latest_timestamp = max(packet_time, self.latest_timestamp)
 
         # TCP window size init (kalau ada)
-        if packet.haslayer("TCP"):
-            tcp_layer = packet.getlayer("TCP")
+        if window is not None:
             if (
                 direction == PacketDirection.FORWARD
                 and self.init_window_size[direction] == 0
             ):
-                self.init_window_size[direction] = tcp_layer.window
+                self.init_window_size[direction] = window
             elif direction == PacketDirection.REVERSE:
-                self.init_window_size[direction] = tcp_layer.window
+                self.init_window_size[direction] = window
 
         # Tandai paket pertama
         if self.start_timestamp == 0:
-            self.start_timestamp = float(packet.time)
-            # protocol might be None; keep previous if not present
-            self.protocol = packet.proto if hasattr(packet, "proto") else self.protocol
+            self.start_timestamp = packet_time
+            if protocol is not None:
+                self.protocol = protocol
 
-    def update_subflow(self, packet):
+    def update_subflow(self, packet_time):
         """Update subflow
 
         Args:
-            packet: Packet to be parse as subflow
+            packet_time: Timestamp of the packet (float seconds)
         """
         last_timestamp = (
-            self.latest_timestamp if self.latest_timestamp != 0 else packet.time
+            self.latest_timestamp if self.latest_timestamp != 0 else packet_time
         )
-        try:
-            pkt_time = float(packet.time)
-            last_ts = float(last_timestamp)
-            if (pkt_time - (last_ts / 1e6)) > constants.CLUMP_TIMEOUT:
-                self.update_active_idle(pkt_time - last_ts)
-        except Exception as e:
-            print("[Warning] update_subflow error:", e)
+        if (packet_time - (last_timestamp / 1e6)) > constants.CLUMP_TIMEOUT:
+            self.update_active_idle(packet_time - last_timestamp)
 
     def update_active_idle(self, current_time):
-        """Adds a packet to the current list of packets.
+        """Update the active and idle statistics.
 
         Args:
             current_time: current timestamp value (float seconds)
         """
-        try:
-            cur = float(current_time)
-            last_act = float(self.last_active)
-            if (cur - last_act) > constants.ACTIVE_TIMEOUT:
-                duration = abs(float(self.last_active - self.start_active))
-                if duration > 0:
-                    self.active.append(1e6 * float(duration))
-                self.idle.append(1e6 * float(cur - last_act))
-                self.start_active = current_time
-                self.last_active = current_time
-            else:
-                self.last_active = current_time
-        except Exception as e:
-            print("[Warning] update_active_idle error:", e)
+        if (current_time - self.last_active) > constants.ACTIVE_TIMEOUT:
+            duration = abs(self.last_active - self.start_active)
+            if duration > 0:
+                self.active.add(1e6 * duration)
+            self.idle.add(1e6 * (current_time - self.last_active))
+            self.start_active = current_time
+            self.last_active = current_time
+        else:
+            self.last_active = current_time
 
-    def update_flow_bulk(self, packet, direction):
+    def update_flow_bulk(self, packet_time, payload_size, direction):
         """Update bulk flow
 
         Args:
-            packet: Packet to be parse as bulk
+            packet_time: Timestamp of the packet (float seconds)
+            payload_size: TCP / UDP / ICMP payload length of the packet
+            direction: The direction the packet is going in that flow
         """
-        payload_size = len(PacketCount.get_payload(packet))
         if payload_size == 0:
             return
         if direction == PacketDirection.FORWARD:
             if self.backward_bulk_last_timestamp > self.forward_bulk_start_tmp:
                 self.forward_bulk_start_tmp = 0
             if self.forward_bulk_start_tmp == 0:
-                self.forward_bulk_start_tmp = float(packet.time)
-                self.forward_bulk_last_timestamp = float(packet.time)
+                self.forward_bulk_start_tmp = packet_time
+                self.forward_bulk_last_timestamp = packet_time
                 self.forward_bulk_count_tmp = 1
                 self.forward_bulk_size_tmp = payload_size
             else:
-                if (float(packet.time) - float(self.forward_bulk_last_timestamp)) > constants.CLUMP_TIMEOUT:
-                    self.forward_bulk_start_tmp = float(packet.time)
-                    self.forward_bulk_last_timestamp = float(packet.time)
+                if (packet_time - self.forward_bulk_last_timestamp) > constants.CLUMP_TIMEOUT:
+                    self.forward_bulk_start_tmp = packet_time
+                    self.forward_bulk_last_timestamp = packet_time
                     self.forward_bulk_count_tmp = 1
                     self.forward_bulk_size_tmp = payload_size
                 else:  # Add to bulk
@@ -355,27 +586,27 @@ class Flow:
                         self.forward_bulk_packet_count += self.forward_bulk_count_tmp
                         self.forward_bulk_size += self.forward_bulk_size_tmp
                         self.forward_bulk_duration += (
-                            float(packet.time) - float(self.forward_bulk_start_tmp)
+                            packet_time - self.forward_bulk_start_tmp
                         )
                     elif self.forward_bulk_count_tmp > constants.BULK_BOUND:
                         self.forward_bulk_packet_count += 1
                         self.forward_bulk_size += payload_size
                         self.forward_bulk_duration += (
-                            float(packet.time) - float(self.forward_bulk_last_timestamp)
+                            packet_time - self.forward_bulk_last_timestamp
                         )
-                    self.forward_bulk_last_timestamp = float(packet.time)
+                    self.forward_bulk_last_timestamp = packet_time
         else:
             if self.forward_bulk_last_timestamp > self.backward_bulk_start_tmp:
                 self.backward_bulk_start_tmp = 0
             if self.backward_bulk_start_tmp == 0:
-                self.backward_bulk_start_tmp = float(packet.time)
-                self.backward_bulk_last_timestamp = float(packet.time)
+                self.backward_bulk_start_tmp = packet_time
+                self.backward_bulk_last_timestamp = packet_time
                 self.backward_bulk_count_tmp = 1
                 self.backward_bulk_size_tmp = payload_size
             else:
-                if (float(packet.time) - float(self.backward_bulk_last_timestamp)) > constants.CLUMP_TIMEOUT:
-                    self.backward_bulk_start_tmp = float(packet.time)
-                    self.backward_bulk_last_timestamp = float(packet.time)
+                if (packet_time - self.backward_bulk_last_timestamp) > constants.CLUMP_TIMEOUT:
+                    self.backward_bulk_start_tmp = packet_time
+                    self.backward_bulk_last_timestamp = packet_time
                     self.backward_bulk_count_tmp = 1
                     self.backward_bulk_size_tmp = payload_size
                 else:  # Add to bulk
@@ -386,15 +617,15 @@ class Flow:
                         self.backward_bulk_packet_count += self.backward_bulk_count_tmp
                         self.backward_bulk_size += self.backward_bulk_size_tmp
                         self.backward_bulk_duration += (
-                            float(packet.time) - float(self.backward_bulk_start_tmp)
+                            packet_time - self.backward_bulk_start_tmp
                         )
                     elif self.backward_bulk_count_tmp > constants.BULK_BOUND:
                         self.backward_bulk_packet_count += 1
                         self.backward_bulk_size += payload_size
                         self.backward_bulk_duration += (
-                            float(packet.time) - float(self.backward_bulk_last_timestamp)
+                            packet_time - self.backward_bulk_last_timestamp
                         )
-                    self.backward_bulk_last_timestamp = float(packet.time)
+                    self.backward_bulk_last_timestamp = packet_time
 
     @property
     def duration(self):
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+# flow_expiry.py
+# Tabel flow dengan deadline idle / active di hashed timer wheel, pengganti
+# garbage_collect FlowSession yang men-scan semua flow hidup.
+#
+# Deadline flow = min(paket terakhir + idle_timeout, paket pertama +
+# active_timeout). Setiap flow punya satu entri di slot tick deadline-nya
+# (tick = floor(waktu / resolution)). Deadline tidak dipindah saat paket baru
+# datang; saat slot-nya lewat, deadline dihitung ulang dan entri dijadwalkan
+# ulang jika flow masih aktif. Biaya per paket O(1), per flow yang kedaluwarsa
+# amortized O(1).
+#
+# Keputusan kedaluwarsa hanya bergantung pada waktu paket flow itu sendiri
+# (paket setelah deadline memulai flow baru, sama seperti jika wheel sudah
+# mengeluarkan flow lama), sehingga hasilnya sama berapa pun jumlah shard di
+# flow_meter.
+from .constants import EXPIRED_UPDATE
+
+# batas umur flow (detik), sama dengan batas durasi garbage collect FlowSession
+FLOW_ACTIVE_TIMEOUT = 90
+FLOW_IDLE_TIMEOUT = EXPIRED_UPDATE
+
+EXPIRE_REASONS = ('idle', 'active', 'fin', 'flush')
+
+
+class FlowTable(object):
+    """
+    Dict flow (kunci -> Flow) dengan timer wheel deadline. Flow yang
+    kedaluwarsa dikembalikan advance() / drain() sebagai list (flow, reason);
+    jumlahnya per alasan ada di expired.
+    """
+
+    def __init__(self, idle_timeout=FLOW_IDLE_TIMEOUT, active_timeout=FLOW_ACTIVE_TIMEOUT,
+                 resolution=1.0, slots=1024):
+        self.idle_timeout = idle_timeout
+        self.active_timeout = active_timeout
+        self.resolution = resolution
+        self.flows = {}
+        self.expired = dict.fromkeys(EXPIRE_REASONS, 0)
+        self._wheel = [[] for _ in range(slots)]
+        # tick terakhir yang slot-nya sudah diproses
+        self._tick = None
+
+    def __len__(self):
+        return len(self.flows)
+
+    def get(self, key):
+        return self.flows.get(key)
+
+    def _deadline(self, flow):
+        return min(flow.latest_timestamp + self.idle_timeout,
+                   flow.start_timestamp + self.active_timeout)
+
+    def _schedule(self, key, flow):
+        tick = int(self._deadline(flow) // self.resolution)
+        if self._tick is not None and tick <= self._tick:
+            tick = self._tick + 1
+        self._wheel[tick % len(self._wheel)].append((tick, key, flow))
+
+    def expire_reason(self, flow, now):
+        """Alasan flow sudah kedaluwarsa pada waktu now (deadline pertama yang lewat), atau None."""
+        idle_deadline = flow.latest_timestamp + self.idle_timeout
+        active_deadline = flow.start_timestamp + self.active_timeout
+        if now <= min(idle_deadline, active_deadline):
+            return None
+        return 'active' if active_deadline <= idle_deadline else 'idle'
+
+    def add(self, key, flow):
+        """Daftarkan flow baru (setelah paket pertamanya ditambahkan)."""
+        self.flows[key] = flow
+        self._schedule(key, flow)
+
+    def pop(self, key, reason):
+        """Keluarkan flow sebelum deadline-nya (mis. FIN, atau diperiksa saat lookup)."""
+        self.expired[reason] += 1
+        return self.flows.pop(key)
+
+    def advance(self, now):
+        """Majukan waktu ke now; return list (flow, reason) yang kedaluwarsa."""
+        # hanya tick yang sudah lewat seluruhnya (deadline < now) yang diproses
+        target = int(now // self.resolution) - 1
+        if self._tick is None:
+            self._tick = target
+            return []
+        if target <= self._tick:
+            return []
+        wheel = self._wheel
+        slots = len(wheel)
+        # lompatan lebih dari satu putaran cukup memproses setiap slot sekali
+        start = max(self._tick + 1, target - slots + 1)
+        self._tick = target
+        flows = self.flows
+        expired = []
+        for tick in range(start, target + 1):
+            slot = wheel[tick % slots]
+            if not slot:
+                continue
+            wheel[tick % slots] = []
+            for entry in slot:
+                entry_tick, key, flow = entry
+                if entry_tick > target:
+                    # putaran wheel berikutnya
+                    wheel[tick % slots].append(entry)
+                    continue
+                if flows.get(key) is not flow:
+                    # flow sudah dikeluarkan lewat pop()
+                    continue
+                if int(self._deadline(flow) // self.resolution) > target:
+                    self._schedule(key, flow)
+                    continue
+                # deadline < awal tick target + 1 <= now
+                reason = self.expire_reason(flow, now)
+                self.expired[reason] += 1
+                del flows[key]
+                expired.append((flow, reason))
+        return expired
+
+    def drain(self, reason='flush'):
+        """Keluarkan semua flow yang tersisa (akhir capture)."""
+        flows = list(self.flows.values())
+        self.expired[reason] += len(flows)
+        self.flows = {}
+        self._wheel = [[] for _ in range(len(self._wheel))]
+        return [(flow, reason) for flow in flows]
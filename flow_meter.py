@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+# flow_meter.py
+# Flow meter tanpa scapy di atas packet_decoder: FlowMeter = FlowSession untuk
+# PacketRecord (satu tabel flow), ShardedFlowMeter = N proses worker.
+#
+# Mode sharded: front end (proses capture) hanya menghitung kunci flow dua arah
+# kanonik (packet_decoder.flow_hash_key) lalu mengirim frame mentah per batch
+# ke worker crc32(kunci) % N. Paket forward dan reverse satu flow selalu ke
+# worker yang sama, sehingga tiap worker memiliki tabel Flow sendiri tanpa
+# sinkronisasi. Decode dan update Flow berjalan di worker; baris flow yang
+# selesai dikirim ke satu proses writer CSV.
+#
+#   sudo python3 -m cicflowmeter.flow_meter -i mon0 -w 4 flows.csv
+import argparse
+import csv
+import multiprocessing
+import os
+import signal
+import zlib
+
+from .features.context.packet_direction import PacketDirection
+from .flow import Flow
+from .flow_expiry import EXPIRE_REASONS, FLOW_ACTIVE_TIMEOUT, FLOW_IDLE_TIMEOUT, FlowTable
+from .packet_decoder import (IPPROTO_ICMP, capture_frames, decode_frame, flow_hash_key,
+                             get_record_flow_key)
+
+TCP_FIN = 0x01
+
+
+class FlowMeter(object):
+    """
+    Tabel flow dari PacketRecord. Flow kedaluwarsa lewat FlowTable
+    (flow_expiry): idle_timeout detik tanpa paket atau umur lebih dari
+    active_timeout; paket setelahnya memulai flow baru.
+    Paket ICMP dilewati kecuali icmp=True, sama seperti jalur scapy (sniffer
+    'ip and (tcp or udp)') yang hanya membuat flow TCP / UDP.
+    Baris flow yang selesai diberikan ke emit(data).
+    """
+
+    def __init__(self, emit, idle_timeout=FLOW_IDLE_TIMEOUT,
+                 active_timeout=FLOW_ACTIVE_TIMEOUT, expire_on_fin=False, icmp=False):
+        self.flows = FlowTable(idle_timeout, active_timeout)
+        self.emit = emit
+        self.expire_on_fin = expire_on_fin
+        self.icmp = icmp
+        self.packets_count = 0
+
+    @property
+    def expired(self):
+        """Jumlah flow yang sudah di-emit per alasan (idle, active, fin, flush)."""
+        return self.flows.expired
+
+    def _emit(self, expired):
+        for flow, _ in expired:
+            self.emit(flow.get_data())
+
+    def advance(self, now):
+        """Emit flow yang deadline-nya sudah lewat pada waktu now."""
+        self._emit(self.flows.advance(now))
+
+    def add_record(self, record):
+        if record.protocol == IPPROTO_ICMP and not self.icmp:
+            return
+        self.packets_count += 1
+        flows = self.flows
+        self._emit(flows.advance(record.time))
+
+        direction = PacketDirection.FORWARD
+        packet_flow_key = get_record_flow_key(record, direction)
+        flow = flows.get(packet_flow_key)
+
+        if flow is None:
+            direction = PacketDirection.REVERSE
+            packet_flow_key = get_record_flow_key(record, direction)
+            flow = flows.get(packet_flow_key)
+
+        if flow is not None:
+            reason = flows.expire_reason(flow, record.time)
+            if reason is None:
+                flow.add_record(record, direction)
+                if self.expire_on_fin and record.tcp_flags & TCP_FIN:
+                    self._emit([(flows.pop(packet_flow_key, 'fin'), 'fin')])
+                return
+            # deadline sudah lewat sebelum tick wheel-nya diproses
+            self._emit([(flows.pop(packet_flow_key, reason), reason)])
+
+        direction = PacketDirection.FORWARD
+        packet_flow_key = get_record_flow_key(record, direction)
+        flow = Flow.from_record(record, direction)
+        flow.add_record(record, direction)
+        flows.add(packet_flow_key, flow)
+
+    def flush(self):
+        """Emit semua flow yang tersisa (akhir capture)."""
+        self._emit(self.flows.drain())
+
+
+class CSVRowWriter(object):
+    """Tulis baris flow ke CSV (header dari kolom baris pertama), seperti CSVWriter."""
+
+    def __init__(self, output):
+        self.file = open(output, 'w', newline='')
+        self.writer = csv.writer(self.file)
+        self.rows = 0
+
+    def write(self, data):
+        if self.rows == 0:
+            self.writer.writerow(data.keys())
+        self.writer.writerow(data.values())
+        self.rows += 1
+
+    def close(self):
+        self.file.close()
+
+
+def _shard_main(frames, rows, flush_rows, meter_options):
+    # Ctrl-C ditangani front end, worker berhenti lewat sentinel None
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    pending = []
+    meter = FlowMeter(pending.append, **meter_options)
+    while True:
+        batch = frames.get()
+        if batch is None:
+            break
+        for timestamp, frame in batch:
+            record = decode_frame(frame, timestamp)
+            if record is not None:
+                meter.add_record(record)
+        if len(pending) >= flush_rows:
+            rows.put(pending[:])
+            del pending[:]
+    meter.flush()
+    if pending:
+        rows.put(pending)
+    # pesan terakhir worker: jumlah flow kedaluwarsa per alasan
+    rows.put(dict(meter.expired))
+
+
+def _writer_main(rows, output, workers, done):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    writer = CSVRowWriter(output)
+    expired = dict.fromkeys(EXPIRE_REASONS, 0)
+    try:
+        while workers:
+            batch = rows.get()
+            if isinstance(batch, dict):
+                for reason, count in batch.items():
+                    expired[reason] += count
+                workers -= 1
+                continue
+            for data in batch:
+                writer.write(data)
+    finally:
+        writer.close()
+        done.put(expired)
+
+
+class ShardedFlowMeter(object):
+    """
+    Front end mode sharded. add_frame(timestamp, frame) menaruh frame ke batch
+    worker sesuai hash kunci flow; batch dikirim saat penuh atau sudah lebih
+    dari flush_interval detik (waktu frame). close() mengirim sisa batch,
+    menunggu worker mem-flush semua flow, lalu menunggu writer selesai.
+    """
+
+    def __init__(self, output, workers=None, batch_size=256, flush_interval=0.5,
+                 flush_rows=64, queue_batches=1024, **meter_options):
+        self.output = output
+        self.workers = workers or os.cpu_count() or 1
+        self.meter_options = meter_options
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.flush_rows = flush_rows
+        self.queue_batches = queue_batches
+        self.frames = 0
+        self.skipped = 0
+        self._batches = [[] for _ in range(self.workers)]
+        self._last_flush = None
+        self._queues = []
+        self._processes = []
+        self._writer = None
+        self._done = None
+
+    def start(self):
+        rows = multiprocessing.Queue()
+        self._done = multiprocessing.Queue()
+        self._writer = multiprocessing.Process(
+            target=_writer_main, args=(rows, self.output, self.workers, self._done),
+            name='flow-writer')
+        self._writer.start()
+        for shard in range(self.workers):
+            frames = multiprocessing.Queue(self.queue_batches)
+            process = multiprocessing.Process(
+                target=_shard_main, args=(frames, rows, self.flush_rows, self.meter_options),
+                name='flow-shard-{}'.format(shard))
+            process.start()
+            self._queues.append(frames)
+            self._processes.append(process)
+        return self
+
+    def add_frame(self, timestamp, frame):
+        key = flow_hash_key(frame)
+        if key is None:
+            self.skipped += 1
+            return
+        self.frames += 1
+        shard = zlib.crc32(key) % self.workers
+        batch = self._batches[shard]
+        batch.append((timestamp, frame))
+        if len(batch) >= self.batch_size:
+            self._queues[shard].put(batch)
+            self._batches[shard] = []
+        if self._last_flush is None:
+            self._last_flush = timestamp
+        elif timestamp - self._last_flush > self.flush_interval:
+            self.flush_batches()
+            self._last_flush = timestamp
+
+    def flush_batches(self):
+        for shard, batch in enumerate(self._batches):
+            if batch:
+                self._queues[shard].put(batch)
+                self._batches[shard] = []
+
+    def run(self, frames):
+        """Proses iterable (timestamp, frame), mis. capture_frames('mon0')."""
+        for timestamp, frame in frames:
+            self.add_frame(timestamp, frame)
+
+    def close(self):
+        """Return jumlah flow kedaluwarsa per alasan dari semua worker."""
+        self.flush_batches()
+        for frames in self._queues:
+            frames.put(None)
+        for process in self._processes:
+            process.join()
+        expired = self._done.get()
+        self._writer.join()
+        return expired
+
+
+def meter_frames(frames, output, workers=0, **meter_options):
+    """
+    Ubah iterable (timestamp, frame) menjadi CSV flow. workers=0: satu proses
+    (FlowMeter langsung), selain itu ShardedFlowMeter dengan N worker.
+    meter_options diteruskan ke FlowMeter (idle_timeout, active_timeout,
+    expire_on_fin, icmp). Return jumlah flow kedaluwarsa per alasan.
+    """
+    if workers == 0:
+        writer = CSVRowWriter(output)
+        meter = FlowMeter(writer.write, **meter_options)
+        try:
+            for timestamp, frame in frames:
+                record = decode_frame(frame, timestamp)
+                if record is not None:
+                    meter.add_record(record)
+        finally:
+            meter.flush()
+            writer.close()
+        return dict(meter.expired)
+
+    sharded = ShardedFlowMeter(output, workers, **meter_options).start()
+    try:
+        sharded.run(frames)
+    finally:
+        expired = sharded.close()
+    return expired
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Flow meter multi-core (sharded per flow)')
+    parser.add_argument('-i', '--interface', required=True, help='interface capture, mis. mon0')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1,
+                        help='jumlah proses worker (0 = satu proses tanpa sharding)')
+    parser.add_argument('--idle-timeout', type=float, default=FLOW_IDLE_TIMEOUT,
+                        help='detik tanpa paket sebelum flow selesai')
+    parser.add_argument('--active-timeout', type=float, default=FLOW_ACTIVE_TIMEOUT,
+                        help='umur maksimum flow (detik)')
+    parser.add_argument('--expire-on-fin', action='store_true',
+                        help='selesaikan flow TCP saat paket FIN')
+    parser.add_argument('--icmp', action='store_true',
+                        help='buat juga flow ICMP (default hanya TCP / UDP seperti sniffer scapy)')
+    parser.add_argument('output', help='file CSV output')
+    args = parser.parse_args()
+
+    frames = capture_frames(args.interface)
+    try:
+        expired = meter_frames(frames, args.output, args.workers,
+                               idle_timeout=args.idle_timeout,
+                               active_timeout=args.active_timeout,
+                               expire_on_fin=args.expire_on_fin,
+                               icmp=args.icmp)
+    except KeyboardInterrupt:
+        return
+    print('flow selesai: ' + ', '.join('{}={}'.format(k, v) for k, v in expired.items()))
+
+
+if __name__ == '__main__':
+    main()
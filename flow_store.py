@@ -0,0 +1,475 @@
+# flow_store.py
+# Penyimpanan flow stats di memori (kolumnar) untuk SimpleMonitor13.
+# Reply handler mengubah body OFPFlowStatsReply menjadi kolom numpy dengan
+# stats_to_columns() dan mengisi FlowStatsStore, flow_predict membaca
+# snapshot-nya secara langsung tanpa lewat PredictFlowStatsfile.csv.
+import logging
+import queue
+import threading
+
+import numpy as np
+
+# urutan kolom sama persis dengan header PredictFlowStatsfile.csv lama
+BASE_COLUMNS = [
+    'timestamp', 'datapath_id', 'flow_id', 'ip_src', 'tp_src', 'ip_dst', 'tp_dst',
+    'ip_proto', 'icmp_code', 'icmp_type', 'flow_duration_sec', 'flow_duration_nsec',
+    'idle_timeout', 'hard_timeout', 'flags', 'packet_count', 'byte_count',
+    'packet_count_per_second', 'packet_count_per_nsecond',
+    'byte_count_per_second', 'byte_count_per_nsecond',
+]
+
+# rate per interval polling (delta counter terhadap poll sebelumnya), lihat FlowRateCache
+INTERVAL_COLUMNS = ['interval_packet_count_per_second', 'interval_byte_count_per_second']
+
+STATS_COLUMNS = BASE_COLUMNS + INTERVAL_COLUMNS
+
+# identitas flow (datapath_id, table_id, priority, field match) per baris snapshot,
+# dipakai sebagai key FlowRateCache dan buffer sekuens; tidak ditulis ke CSV
+KEY_COLUMN = 'flow_key'
+
+# kolom non-numerik yang di-drop sebelum training / prediksi
+DROP_COLUMNS = ['timestamp', 'datapath_id', 'flow_id', 'ip_src', 'ip_dst', 'flags']
+
+# kolom fitur default model, urutannya sama dengan hasil drop pada DataFrame CSV lama.
+# Model yang dilatih dengan kolom INTERVAL_COLUMNS memilih fiturnya lewat daftar
+# fitur ModelBundle (lihat model_bundle).
+FEATURE_COLUMNS = [c for c in BASE_COLUMNS if c not in DROP_COLUMNS]
+
+# kolom yang disimpan sebagai object array (string) / uint64 (dpid 64-bit), sisanya float64
+_OBJECT_COLUMNS = ('flow_id', 'ip_src', 'ip_dst', KEY_COLUMN)
+_UINT64_COLUMNS = ('datapath_id',)
+
+# kolom float64 snapshot, disimpan sebagai satu matriks (n_rows, len(NUMERIC_COLUMNS))
+# sehingga fitur model cukup diambil dengan index kolom (lihat feature_index)
+NUMERIC_COLUMNS = [c for c in STATS_COLUMNS if c not in _OBJECT_COLUMNS + _UINT64_COLUMNS]
+_NUMERIC_INDEX = dict((name, i) for i, name in enumerate(NUMERIC_COLUMNS))
+# key matriks numerik di dict kolom hasil stats_to_columns
+_NUMERIC = '__numeric__'
+
+
+# kolom numerik yang diambil langsung dari match / counter OFPFlowStats,
+# urutannya sama dengan tuple yang dibangun di stats_to_columns()
+_RAW_COLUMNS = [
+    'tp_src', 'tp_dst', 'ip_proto', 'icmp_code', 'icmp_type',
+    'flow_duration_sec', 'flow_duration_nsec', 'idle_timeout', 'hard_timeout',
+    'flags', 'packet_count', 'byte_count',
+]
+
+# field port L4 di OFPMatch per ip_proto
+_PORT_FIELDS = {
+    6: ('tcp_src', 'tcp_dst'),
+    17: ('udp_src', 'udp_dst'),
+}
+
+
+def feature_index(columns):
+    """
+    Index kolom fitur di matriks numerik snapshot (urutan sesuai columns),
+    dihitung sekali saat model di-load lalu dipakai FlowStatsSnapshot.features().
+    """
+    missing = [name for name in columns if name not in _NUMERIC_INDEX]
+    if missing:
+        raise ValueError("Fitur model tidak ada di snapshot flow stats: {}".format(', '.join(missing)))
+    return np.array([_NUMERIC_INDEX[name] for name in columns], dtype=np.intp)
+
+
+FEATURE_INDEX = feature_index(FEATURE_COLUMNS)
+_RAW_INDEX = feature_index(_RAW_COLUMNS)
+
+
+def _numeric_views(numeric):
+    # kolom numerik berupa view kolom matriks (tanpa copy)
+    columns = dict((name, numeric[:, i]) for i, name in enumerate(NUMERIC_COLUMNS))
+    columns[_NUMERIC] = numeric
+    return columns
+
+
+def _empty_columns():
+    columns = _numeric_views(np.empty((0, len(NUMERIC_COLUMNS)), dtype=np.float64))
+    for name in STATS_COLUMNS + [KEY_COLUMN]:
+        if name not in columns:
+            columns[name] = np.empty(0, dtype=_column_dtype(name))
+    return columns
+
+
+def _column_dtype(name):
+    if name in _OBJECT_COLUMNS:
+        return object
+    if name in _UINT64_COLUMNS:
+        return np.uint64
+    return np.float64
+
+
+def _object_array(values):
+    arr = np.empty(len(values), dtype=object)
+    arr[:] = values
+    return arr
+
+
+def _key_array(keys):
+    # isi satu per satu: numpy akan mencoba membongkar tuple jika di-assign sekaligus
+    arr = np.empty(len(keys), dtype=object)
+    for i, key in enumerate(keys):
+        arr[i] = key
+    return arr
+
+
+def _safe_rate(count, duration, valid):
+    # pembagian vektor, baris dengan durasi 0 bernilai 0 (sama seperti try/except lama)
+    return np.divide(count, duration, out=np.zeros_like(count), where=valid)
+
+
+def stats_to_columns(stats, timestamp, datapath_id, priority, rate_cache=None):
+    """
+    Ubah list OFPFlowStats dari satu reply menjadi dict kolom numpy.
+
+    Field match dan counter diambil dalam satu pass (satu dict per match,
+    bukan OFPMatch.get() berulang yang membangun dict setiap panggilan),
+    lalu semua rate dihitung dengan pembagian vektor. Hanya flow dengan
+    priority yang dimonitor yang diambil. Flow non-ICMP selalu bernilai
+    icmp_code/icmp_type -1 dan flow non-TCP/UDP bernilai tp_src/tp_dst 0.
+
+    Jika rate_cache (FlowRateCache) diberikan, kolom INTERVAL_COLUMNS diisi
+    dari delta counter terhadap poll sebelumnya. Kolom KEY_COLUMN berisi
+    identitas flow yang sama dengan key rate_cache. Kolom NUMERIC_COLUMNS
+    adalah view dari satu matriks float64 (key _NUMERIC).
+    """
+    ip_src = []
+    ip_dst = []
+    raw = []
+    keys = []
+    for stat in stats:
+        if stat.priority != priority:
+            continue
+        items = stat.match.items()
+        match = dict(items)
+        ip_proto = match.get('ip_proto', 0)
+        port_fields = _PORT_FIELDS.get(ip_proto)
+        if port_fields is not None:
+            tp_src = match.get(port_fields[0], 0)
+            tp_dst = match.get(port_fields[1], 0)
+        else:
+            tp_src = tp_dst = 0
+        if ip_proto == 1:
+            icmp_code = match.get('icmpv4_code', -1)
+            icmp_type = match.get('icmpv4_type', -1)
+        else:
+            icmp_code = icmp_type = -1
+
+        ip_src.append(match.get('ipv4_src', '0.0.0.0'))
+        ip_dst.append(match.get('ipv4_dst', '0.0.0.0'))
+        raw.append((tp_src, tp_dst, ip_proto, icmp_code, icmp_type,
+                    stat.duration_sec, stat.duration_nsec,
+                    stat.idle_timeout, stat.hard_timeout,
+                    getattr(stat, 'flags', 0), stat.packet_count, stat.byte_count))
+        keys.append((datapath_id, stat.table_id, stat.priority, tuple(items)))
+
+    n = len(raw)
+    if n == 0:
+        columns = _empty_columns()
+        del columns['flow_id']
+        return columns
+
+    numeric = np.empty((n, len(NUMERIC_COLUMNS)), dtype=np.float64)
+    numeric[:, _RAW_INDEX] = np.array(raw, dtype=np.float64).reshape(n, len(_RAW_COLUMNS))
+    columns = _numeric_views(numeric)
+    columns['timestamp'][:] = timestamp
+    columns['datapath_id'] = np.full(n, datapath_id, dtype=np.uint64)
+    columns['ip_src'] = _object_array(ip_src)
+    columns['ip_dst'] = _object_array(ip_dst)
+    columns[KEY_COLUMN] = _key_array(keys)
+
+    duration_sec = columns['flow_duration_sec']
+    duration_nsec = columns['flow_duration_nsec']
+    packet_count = columns['packet_count']
+    byte_count = columns['byte_count']
+    # kode lama menghitung keempat rate dalam satu try: durasi sec ATAU nsec 0 -> semuanya 0
+    valid = (duration_sec != 0) & (duration_nsec != 0)
+    columns['packet_count_per_second'][:] = _safe_rate(packet_count, duration_sec, valid)
+    columns['packet_count_per_nsecond'][:] = _safe_rate(packet_count, duration_nsec, valid)
+    columns['byte_count_per_second'][:] = _safe_rate(byte_count, duration_sec, valid)
+    columns['byte_count_per_nsecond'][:] = _safe_rate(byte_count, duration_nsec, valid)
+
+    if rate_cache is not None:
+        pps, bps = rate_cache.update_many(keys, packet_count, byte_count,
+                                          duration_sec + duration_nsec * 1e-9)
+    else:
+        pps = bps = 0.0
+    columns['interval_packet_count_per_second'][:] = pps
+    columns['interval_byte_count_per_second'][:] = bps
+    return columns
+
+
+def _flow_ids(columns):
+    # flow_id = ip_src + tp_src + ip_dst + tp_dst + ip_proto (format CSV lama)
+    as_int = lambda name: columns[name].astype(np.int64).tolist()
+    return _object_array([
+        '%s%d%s%d%d' % row for row in zip(columns['ip_src'].tolist(), as_int('tp_src'),
+                                         columns['ip_dst'].tolist(), as_int('tp_dst'),
+                                         as_int('ip_proto'))
+    ])
+
+
+class FlowStatsSnapshot(object):
+    """
+    Snapshot kolumnar (satu numpy array per kolom) dari satu siklus polling.
+    Snapshot bersifat read-only sehingga aman dibaca thread lain (mis. CSV sink).
+    Kolom flow_id (string) hanya dibangun saat diminta, mis. oleh CSV sink.
+    """
+
+    def __init__(self, columns, n_rows):
+        self._columns = columns
+        self._n_rows = n_rows
+
+    def __len__(self):
+        return self._n_rows
+
+    @classmethod
+    def empty(cls):
+        return cls(_empty_columns(), 0)
+
+    @classmethod
+    def concat(cls, parts):
+        """Gabungkan list dict kolom (hasil stats_to_columns) menjadi satu snapshot."""
+        parts = [p for p in parts if len(p['timestamp'])]
+        if not parts:
+            return cls.empty()
+        if len(parts) == 1:
+            columns = dict(parts[0])
+        else:
+            # matriks numerik digabung sekali, kolomnya tetap berupa view
+            columns = _numeric_views(np.concatenate([p[_NUMERIC] for p in parts]))
+            for name in parts[0]:
+                if name not in columns:
+                    columns[name] = np.concatenate([p[name] for p in parts])
+        return cls(columns, len(columns['timestamp']))
+
+    def column(self, name):
+        if name == 'flow_id' and name not in self._columns:
+            self._columns[name] = _flow_ids(self._columns)
+        return self._columns[name]
+
+    def features(self, index=None):
+        """
+        Matriks fitur float64 (n_rows, n_features) siap untuk scaler.transform.
+        index: hasil feature_index() untuk fitur model (default FEATURE_COLUMNS).
+        """
+        return self._columns[_NUMERIC][:, FEATURE_INDEX if index is None else index]
+
+    def iter_rows(self):
+        """Iterasi baris dalam urutan STATS_COLUMNS (dipakai oleh CSV sink)."""
+        return zip(*[self.column(name) for name in STATS_COLUMNS])
+
+
+class FlowStatsStore(object):
+    """
+    Buffer flow stats per siklus polling, dikunci dengan (poll epoch, datapath_id).
+
+    _monitor membuka epoch baru dengan begin_epoch() untuk semua datapath
+    terdaftar dan mencatat xid tiap OFPFlowStatsRequest lewat expect_reply().
+    Reply handler mencari epoch dari xid, menambahkan kolom tiap bagian reply
+    (hasil stats_to_columns) dengan append(),
+    lalu memanggil finish_reply() ketika reply terakhir (tanpa OFPMPF_REPLY_MORE)
+    diterima. take() menggabungkan bagian semua datapath yang sudah selesai
+    menjadi satu snapshot; bagian dari straggler (belum selesai saat timeout)
+    dibuang bersama epoch.
+    """
+
+    def __init__(self):
+        self.epoch = 0
+        self._parts = {}      # (epoch, datapath_id) -> list dict kolom per bagian reply
+        self._expected = {}   # epoch -> set datapath_id yang diminta
+        self._pending = {}    # epoch -> set datapath_id yang belum selesai
+        self._xids = {}       # (datapath_id, xid) -> epoch
+
+    def begin_epoch(self, datapath_ids):
+        self.epoch += 1
+        self._expected[self.epoch] = set(datapath_ids)
+        self._pending[self.epoch] = set(datapath_ids)
+        return self.epoch
+
+    def expect_reply(self, epoch, datapath_id, xid):
+        self._xids[(datapath_id, xid)] = epoch
+
+    def epoch_of(self, datapath_id, xid):
+        """Epoch untuk reply ini, None jika reply tidak dikenal atau sudah terlambat."""
+        return self._xids.get((datapath_id, xid))
+
+    def append(self, epoch, datapath_id, columns):
+        """columns: dict kolom numpy dari satu bagian reply (lihat stats_to_columns)."""
+        key = (epoch, datapath_id)
+        part = self._parts.get(key)
+        if part is None:
+            part = self._parts[key] = []
+        part.append(columns)
+
+    def finish_reply(self, epoch, datapath_id):
+        """Tandai reply datapath selesai. Return True jika epoch sudah lengkap."""
+        pending = self._pending.get(epoch)
+        if pending is None:
+            return False
+        pending.discard(datapath_id)
+        return not pending
+
+    def forget_datapath(self, datapath_id):
+        """Datapath putus: jangan ditunggu lagi di epoch yang masih berjalan."""
+        for pending in self._pending.values():
+            pending.discard(datapath_id)
+
+    def is_complete(self, epoch):
+        return not self._pending.get(epoch)
+
+    def completed(self, epoch):
+        """Datapath pada epoch yang reply-nya sudah selesai."""
+        return sorted(self._expected.get(epoch, set()) - self._pending.get(epoch, set()))
+
+    def missing(self, epoch):
+        return sorted(self._pending.get(epoch, ()))
+
+    def straggler_rows(self, epoch):
+        """Jumlah baris yang sudah diterima dari datapath yang belum selesai."""
+        pending = self._pending.get(epoch, ())
+        return sum(len(columns['timestamp'])
+                   for d in pending for columns in self._parts.get((epoch, d), ()))
+
+    def take(self, epoch):
+        """
+        Gabungkan bagian datapath yang sudah selesai pada epoch menjadi satu
+        FlowStatsSnapshot (urut berdasarkan datapath_id) dan hapus state epoch tersebut.
+        """
+        expected = self._expected.pop(epoch, set())
+        pending = self._pending.pop(epoch, set())
+        for key in [k for k, e in self._xids.items() if e == epoch]:
+            del self._xids[key]
+
+        parts = []
+        for datapath_id in sorted(expected - pending):
+            parts.extend(self._parts.pop((epoch, datapath_id), ()))
+        # bagian dari straggler / datapath yang sudah tidak terdaftar dibuang bersama epoch
+        for key in [k for k in self._parts if k[0] == epoch]:
+            del self._parts[key]
+        return FlowStatsSnapshot.concat(parts)
+
+
+_NO_PREVIOUS = (np.nan, np.nan, np.nan)
+
+
+class FlowRateCache(object):
+    """
+    Cache counter poll sebelumnya per flow (key: datapath + match flow) untuk
+    menghitung pps/bps per interval polling, bukan rata-rata kumulatif sejak
+    flow dibuat. Biaya per flow O(1): satu lookup dict dan satu insert.
+
+    Counter disimpan per datapath (key[0]). Flow yang di-update pada epoch
+    berjalan ditulis ke dict baru; commit(datapath_ids) hanya menukar dict
+    datapath yang di-poll epoch ini, sehingga flow yang tidak muncul lagi di
+    stats reply kadaluarsa tanpa scan, dan datapath dengan interval polling
+    lebih panjang tetap menyimpan counter poll terakhirnya.
+    """
+
+    def __init__(self):
+        self._prev = {}      # datapath_id -> {key -> (packet_count, byte_count, duration)}
+        self._current = {}
+
+    def __len__(self):
+        return sum(len(flows) for flows in self._prev.values())
+
+    def update_many(self, keys, packet_count, byte_count, duration):
+        """
+        Simpan counter tiap flow (array sejajar dengan keys) dan kembalikan
+        array (pps, bps) sejak poll sebelumnya. Flow baru atau flow yang
+        counter-nya reset (dipasang ulang) seluruh umurnya ada di dalam interval
+        ini, sehingga memakai rate sejak flow dibuat (counter / durasi); 0 hanya
+        jika durasinya 0.
+        """
+        prev_flows = self._prev
+        no_flows = {}
+        prev = np.array([prev_flows.get(key[0], no_flows).get(key, _NO_PREVIOUS) for key in keys],
+                        dtype=np.float64).reshape(len(keys), 3)
+        current = self._current
+        for key, counters in zip(keys, zip(packet_count.tolist(), byte_count.tolist(),
+                                           duration.tolist())):
+            flows = current.get(key[0])
+            if flows is None:
+                flows = current[key[0]] = {}
+            flows[key] = counters
+
+        interval = duration - prev[:, 2]
+        packets = packet_count - prev[:, 0]
+        # NaN (flow baru) otomatis gagal di kedua perbandingan
+        valid = (interval > 0) & (packets >= 0)
+        pps = _safe_rate(packets, interval, valid)
+        bps = _safe_rate(byte_count - prev[:, 1], interval, valid)
+        lifetime = ~valid & (duration > 0)
+        pps[lifetime] = packet_count[lifetime] / duration[lifetime]
+        bps[lifetime] = byte_count[lifetime] / duration[lifetime]
+        return pps, bps
+
+    def commit(self, datapath_ids):
+        """
+        Akhiri epoch untuk datapath yang reply-nya lengkap: flow datapath itu
+        yang tidak terlihat di epoch ini dihapus dari cache. Counter datapath
+        lain (tidak di-poll, atau straggler yang reply-nya dibuang) tidak berubah.
+        """
+        current = self._current
+        for datapath_id in datapath_ids:
+            self._prev[datapath_id] = current.pop(datapath_id, {})
+        # bagian reply straggler tidak dipakai sebagai counter sebelumnya
+        current.clear()
+
+    def forget_datapath(self, datapath_id):
+        """Datapath putus: buang counter flow-nya."""
+        self._prev.pop(datapath_id, None)
+        self._current.pop(datapath_id, None)
+
+
+class CsvDebugSink(object):
+    """
+    Sink opsional untuk debug: menulis snapshot ke file CSV di OS thread
+    terpisah sehingga formatting teks dan disk I/O tidak memblok event loop.
+    Jika antrian penuh, snapshot dibuang (submit() mengembalikan False).
+    Error saat menulis dicatat ke logger (default logger modul ini).
+    """
+
+    def __init__(self, path, max_pending=4, logger=None):
+        self.path = path
+        self.logger = logger or logging.getLogger(__name__)
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name='csv-debug-sink')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def submit(self, snapshot):
+        try:
+            self._queue.put_nowait(snapshot)
+            return True
+        except queue.Full:
+            return False
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            snapshot = self._queue.get()
+            if snapshot is None:
+                return
+            try:
+                self._write(snapshot)
+            except Exception:
+                # jangan sampai thread sink mati karena satu snapshot gagal ditulis
+                self.logger.exception("Gagal menulis snapshot ke %s", self.path)
+
+    def _write(self, snapshot):
+        with open(self.path, 'w') as f:
+            f.write(','.join(STATS_COLUMNS) + '\n')
+            for row in snapshot.iter_rows():
+                f.write(','.join(_format_value(v) for v in row) + '\n')
+
+
+def _format_value(value):
+    # angka bulat yang tersimpan sebagai float ditulis tanpa ".0" seperti format CSV lama
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
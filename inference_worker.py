@@ -0,0 +1,102 @@
+# inference_worker.py
+# Worker inferensi LSTM di OS thread terpisah agar model.predict tidak
+# memblok event loop (green thread hub) Ryu.
+import queue
+import threading
+import time
+import traceback
+from collections import namedtuple
+
+import numpy as np
+
+from sequence_buffer import scale_windows
+
+# satu job inferensi: snapshot satu epoch beserta model / scaler yang berlaku saat submit,
+# sehingga hasilnya konsisten walaupun model diganti di tengah jalan.
+# feature_index: index kolom fitur model di snapshot (ModelBundle.feature_index).
+# sequences: None (timesteps=1) atau (windows, lengths) mentah dari FlowSequenceBuffer;
+# prepare_seconds: waktu menyiapkan job di event loop (mis. update FlowSequenceBuffer)
+InferenceJob = namedtuple('InferenceJob',
+                          'epoch snapshot datapath_ids model scaler feature_index submitted '
+                          'sequences prepare_seconds')
+# hasil predict_snapshot: kelas per flow, waktu mulai diproses worker, durasi preprocessing / predict (detik)
+InferenceResult = namedtuple('InferenceResult', 'preds started preprocess_seconds inference_seconds')
+
+
+def predict_snapshot(job):
+    """Preprocessing + predict satu snapshot. Return InferenceResult (kelas prediksi per flow + timing)."""
+    started = time.time()
+    if job.sequences is not None:
+        X_lstm = scale_windows(job.sequences[0], job.sequences[1], job.scaler)
+    else:
+        X_predict = job.snapshot.features(job.feature_index)
+        X_scaled = job.scaler.transform(X_predict)
+        X_lstm = X_scaled.reshape((X_scaled.shape[0], 1, X_scaled.shape[1]))
+    predict_start = time.time()
+    preds_proba = job.model.predict(X_lstm, verbose=0)
+    return InferenceResult(np.argmax(preds_proba, axis=1), started,
+                           predict_start - started, time.time() - predict_start)
+
+
+class InferenceWorker(object):
+    """
+    Menjalankan predict_fn(job) di OS thread dengan antrian job berukuran tetap.
+
+    submit() tidak pernah memblok: jika antrian penuh, job tertua yang belum
+    diproses dibuang (snapshot terbaru lebih penting saat serangan) dan dihitung
+    di self.dropped. Hasil diambil dari event loop lewat results(), berupa list
+    tuple (job, hasil, error) dengan error berisi traceback string jika gagal.
+
+    Ryu menjalankan eventlet tanpa monkey patch thread, sehingga threading dan
+    queue di sini adalah OS thread sungguhan.
+    """
+
+    def __init__(self, predict_fn=predict_snapshot, max_pending=2, name='lstm-inference'):
+        self._predict_fn = predict_fn
+        self._jobs = queue.Queue(maxsize=max_pending)
+        self._results = queue.Queue()
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name=name)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def submit(self, job):
+        """Masukkan job tanpa blocking. Return False jika ada job lama yang dibuang."""
+        accepted = True
+        while True:
+            try:
+                self._jobs.put_nowait(job)
+                return accepted
+            except queue.Full:
+                try:
+                    self._jobs.get_nowait()
+                    self.dropped += 1
+                    accepted = False
+                except queue.Empty:
+                    pass
+
+    def pending(self):
+        return self._jobs.qsize()
+
+    def results(self):
+        """Ambil semua hasil yang sudah selesai tanpa blocking."""
+        done = []
+        while True:
+            try:
+                done.append(self._results.get_nowait())
+            except queue.Empty:
+                return done
+
+    def close(self):
+        self._jobs.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            try:
+                self._results.put((job, self._predict_fn(job), None))
+            except Exception:
+                self._results.put((job, None, traceback.format_exc()))
@@ -1,82 +1,70 @@
 # -*- coding: utf-8 -*-
 
-import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder, MinMaxScaler
-from tensorflow.keras.models import Sequential, load_model
-from tensorflow.keras.layers import LSTM, Dense, Dropout
+import pandas as pd
+from tensorflow.keras.models import load_model
 import matplotlib.pyplot as plt
 import seaborn as sns
-from sklearn.metrics import classification_report, confusion_matrix
-
-# === 1. Load Dataset ===
-df = pd.read_csv("FlowStatsfile.csv")
-
-print(df.head())
-print("Dataset shape:", df.shape)
+from sklearn.metrics import confusion_matrix
+import joblib
 
-# === 2. Drop kolom non-numerik yang tidak relevan ===
-drop_cols = ['timestamp', 'datapath_id', 'flow_id', 'ip_src', 'ip_dst', 'flags']
-df = df.drop(columns=drop_cols, errors='ignore')
+import model_bundle
 
-# Handle missing values
-df = df.fillna(0)
+from training_pipeline import DEFAULT_CACHE_DIR, StreamingDataset, build_lstm_model
 
-# === 3. Encode label ===
-le = LabelEncoder()
-df['label'] = le.fit_transform(df['label'])
+# panjang sekuens: T poll terakhir per flow (datapath_id + flow_id), urut timestamp
+TIMESTEPS = 5
 
-# === 4. Pisahkan fitur dan target ===
-X = df.drop(columns=['label'])
-y = df['label']
+# === 1. Load Dataset (streaming per chunk, tidak dimuat sekaligus ke memori) ===
+print(pd.read_csv("FlowStatsfile.csv", nrows=5))
 
-# Normalisasi fitur numerik
-scaler = MinMaxScaler()
-X_scaled = scaler.fit_transform(X)
+# === 2-4. Drop kolom non-numerik, fillna, encode label, normalisasi fitur ===
+# pass pertama: MinMaxScaler.partial_fit dan kumpulan label per chunk;
+# hasil preprocessing di-cache (.npy) sehingga run berikutnya tidak parse CSV lagi
+dataset = StreamingDataset("FlowStatsfile.csv", batch_size=64, cache_dir=DEFAULT_CACHE_DIR,
+                           timesteps=TIMESTEPS).fit()
+print("Dataset shape: ({}, {})".format(dataset.n_train + dataset.n_val, dataset.n_features + 1))
+print("Train: {} baris, Test: {} baris".format(dataset.n_train, dataset.n_val))
 
-# === 5. Reshape ke 3D untuk LSTM ===
-# Bentuk: [samples, timesteps, features]
-X_lstm = X_scaled.reshape((X_scaled.shape[0], 1, X_scaled.shape[1]))
-print("Shape data untuk LSTM:", X_lstm.shape)
-
-# === 6. Train-test split ===
-X_train, X_test, y_train, y_test = train_test_split(
-    X_lstm, y, test_size=0.2, random_state=42
-)
+# === 5-6. Window sekuens 3D untuk LSTM + train-test split ===
+# Bentuk: [samples, timesteps, features], dibangun per chunk oleh generator
+train_data = dataset.dataset('train', shuffle=True)
+test_data = dataset.dataset('val', shuffle=False)
+print("Shape data untuk LSTM: (None, {}, {})".format(TIMESTEPS, dataset.n_features))
 
 # === 7. Bangun Model LSTM ===
-model = Sequential()
-model.add(LSTM(128, input_shape=(X_train.shape[1], X_train.shape[2]), return_sequences=False))
-model.add(Dropout(0.3))
-model.add(Dense(64, activation='relu'))
-model.add(Dropout(0.3))
-model.add(Dense(len(y.unique()), activation='softmax'))  # output multi-class
-
-model.compile(optimizer='adam', loss='sparse_categorical_crossentropy', metrics=['accuracy'])
+n_classes = len(dataset.le.classes_)
+model = build_lstm_model(TIMESTEPS, dataset.n_features, n_classes)  # output multi-class
 
 # === 8. Training ===
 history = model.fit(
-    X_train, y_train,
+    train_data,
     epochs=50,
-    batch_size=64,
-    validation_data=(X_test, y_test),
+    validation_data=test_data,
     verbose=1
 )
 
 # === 9. Evaluasi ===
-loss, acc = model.evaluate(X_test, y_test, verbose=0)
+loss, acc = model.evaluate(test_data, verbose=0)
 print(f"Akurasi Test: {acc*100:.2f}%")
 
-# Prediksi
-y_pred_encoded = model.predict(X_test)
-y_pred = np.argmax(y_pred_encoded, axis=1)
-
-# Classification Report
-print(classification_report(y_test, y_pred))
+# Prediksi per batch; confusion matrix diakumulasi agar memori tetap terbatas
+labels = np.arange(max(n_classes, 2))
+cm = np.zeros((len(labels), len(labels)), dtype=np.int64)
+for X_batch, y_batch in dataset.batches('val', shuffle=False):
+    y_pred = np.argmax(model.predict(X_batch, verbose=0), axis=1)
+    cm += confusion_matrix(y_batch, y_pred, labels=labels)
+
+# Classification Report (dihitung dari confusion matrix)
+print("{:>12} {:>10} {:>10} {:>10} {:>10}".format("", "precision", "recall", "f1-score", "support"))
+for i, name in enumerate(dataset.le.classes_):
+    tp = cm[i, i]
+    precision = tp / cm[:, i].sum() if cm[:, i].sum() else 0.0
+    recall = tp / cm[i, :].sum() if cm[i, :].sum() else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if (precision + recall) else 0.0
+    print("{:>12} {:>10.2f} {:>10.2f} {:>10.2f} {:>10d}".format(str(name), precision, recall, f1, cm[i, :].sum()))
 
 # Confusion Matrix
-cm = confusion_matrix(y_test, y_pred)
 sns.heatmap(cm, annot=True, fmt='d', cmap="Blues")
 plt.xlabel("Predicted")
 plt.ylabel("True")
@@ -101,13 +89,18 @@ plt.legend()
 plt.show()
 
 # === 10. Save Model ===
-# Assign model ke atribut set.flow_model
-set.flow_model = model
 model.save("flow_model.h5")
-print("Model berhasil disimpan sebagai flow_model.h5")
+joblib.dump(dataset.scaler, "flow_scaler.save")
+joblib.dump(dataset.le, "flow_le.save")
+# bundle inferensi controller: bobot + scaler + label + urutan fitur dalam satu file
+model_bundle.save("flow_model.bundle.npz", "flow_model.h5", dataset.scaler, dataset.le,
+                  features=dataset.features, timesteps=TIMESTEPS)
+print("Model berhasil disimpan sebagai flow_model.h5 (scaler: flow_scaler.save, label encoder: flow_le.save)")
+print("Bundle inferensi: flow_model.bundle.npz")
 
 # === 11. Load model untuk prediksi ulang (opsional) ===
+X_sample, y_sample = next(dataset.batches('val', shuffle=False))
 loaded_model = load_model("flow_model.h5")
-sample_pred = loaded_model.predict(X_test[:5])  # contoh 5 data
+sample_pred = loaded_model.predict(X_sample[:5])  # contoh 5 data
 print("Hasil prediksi sample:", np.argmax(sample_pred, axis=1))
-print("Label asli:", y_test[:5].values)
+print("Label asli:", y_sample[:5])
@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+# metrics.py
+# Metrik siklus monitor SimpleMonitor13 (_monitor -> _request_stats ->
+# _flow_stats_reply_handler -> flow_predict -> inferensi) dalam format teks
+# Prometheus, dilayani endpoint HTTP lokal dari green thread hub:
+#
+#   curl http://127.0.0.1:9108/metrics
+#
+# Semua update dilakukan dari green thread event loop Ryu (tidak ada OS thread
+# yang menulis), sehingga registry tidak butuh lock.
+import time
+from collections import OrderedDict
+
+from ryu.lib import hub
+
+# bucket histogram (detik) untuk latensi reply / preprocessing / inferensi
+DEFAULT_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# bucket histogram jumlah flow per reply / snapshot / batch
+DEFAULT_SIZE_BUCKETS = (10, 100, 1000, 5000, 10000, 50000, 100000, 500000, 1000000)
+
+_MAX_REQUEST = 8192
+
+
+class _Histogram(object):
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ''
+    return '{' + ','.join('{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"'))
+                          for k, v in items) + '}'
+
+
+def _format_number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class MetricsRegistry(object):
+    """
+    Counter, gauge dan histogram berlabel. Metrik didaftarkan sekali
+    (counter() / gauge() / histogram()), lalu diisi dengan inc() / set() / observe().
+    Collector (fungsi tanpa argumen) dipanggil tepat sebelum render(), untuk
+    gauge yang dihitung saat scrape (mis. waktu sejak siklus terakhir).
+    """
+
+    def __init__(self, prefix=''):
+        self.prefix = prefix
+        self._metrics = OrderedDict()   # nama -> [tipe, help, {labels: nilai}, buckets]
+        self._collectors = []
+
+    def _register(self, kind, name, help_text, buckets=None):
+        self._metrics[name] = [kind, help_text, {}, buckets]
+
+    def counter(self, name, help_text):
+        self._register('counter', name, help_text)
+
+    def gauge(self, name, help_text):
+        self._register('gauge', name, help_text)
+
+    def histogram(self, name, help_text, buckets=DEFAULT_TIME_BUCKETS):
+        self._register('histogram', name, help_text, tuple(buckets))
+
+    def add_collector(self, fn):
+        self._collectors.append(fn)
+
+    def _series(self, name, labels):
+        return self._metrics[name][2], tuple(sorted(labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        series, key = self._series(name, labels)
+        series[key] = series.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        series, key = self._series(name, labels)
+        series[key] = value
+
+    def observe(self, name, value, **labels):
+        series, key = self._series(name, labels)
+        hist = series.get(key)
+        if hist is None:
+            hist = series[key] = _Histogram(self._metrics[name][3])
+        hist.observe(value)
+
+    def remove(self, **labels):
+        """Hapus semua seri yang labelnya mengandung labels (mis. datapath yang putus)."""
+        wanted = set(labels.items())
+        for _, _, series, _ in self._metrics.values():
+            for key in [k for k in series if wanted.issubset(k)]:
+                del series[key]
+
+    def clear(self, name):
+        """Hapus semua seri satu metrik (untuk gauge yang diisi ulang tiap scrape)."""
+        self._metrics[name][2].clear()
+
+    def render(self):
+        for fn in self._collectors:
+            fn()
+        lines = []
+        for name, (kind, help_text, series, _) in self._metrics.items():
+            full = self.prefix + name
+            lines.append('# HELP {} {}'.format(full, help_text))
+            lines.append('# TYPE {} {}'.format(full, kind))
+            for labels, value in sorted(series.items()):
+                if kind != 'histogram':
+                    lines.append('{}{} {}'.format(full, _format_labels(labels), _format_number(value)))
+                    continue
+                for bound, count in zip(value.buckets, value.counts):
+                    lines.append('{}_bucket{} {}'.format(full, _format_labels(labels, ('le', _format_number(bound))),
+                                                         count))
+                lines.append('{}_bucket{} {}'.format(full, _format_labels(labels, ('le', '+Inf')), value.count))
+                lines.append('{}_sum{} {}'.format(full, _format_labels(labels), repr(value.sum)))
+                lines.append('{}_count{} {}'.format(full, _format_labels(labels), value.count))
+        return '\n'.join(lines) + '\n'
+
+
+def _response(status, body, content_type='text/plain; charset=utf-8'):
+    body = body.encode('utf-8')
+    header = 'HTTP/1.0 {}\r\nContent-Type: {}\r\nContent-Length: {}\r\nConnection: close\r\n\r\n'.format(
+        status, content_type, len(body))
+    return header.encode('ascii') + body
+
+
+class MetricsServer(object):
+    """Endpoint HTTP minimal (GET /metrics) di atas hub.StreamServer, tanpa dependensi tambahan."""
+
+    def __init__(self, registry, host='127.0.0.1', port=9108):
+        self.registry = registry
+        self.address = (host, port)
+        self._server = None
+
+    def start(self):
+        self._server = hub.StreamServer(self.address, self._handle)
+        return hub.spawn(self._server.serve_forever)
+
+    def _handle(self, sock, address):
+        try:
+            request = b''
+            while b'\r\n\r\n' not in request and b'\n\n' not in request and len(request) < _MAX_REQUEST:
+                data = sock.recv(1024)
+                if not data:
+                    break
+                request += data
+            parts = request.split(b'\n', 1)[0].split()
+            if len(parts) < 2 or parts[0] != b'GET':
+                sock.sendall(_response('405 Method Not Allowed', 'GET /metrics\n'))
+            elif parts[1].split(b'?', 1)[0] != b'/metrics':
+                sock.sendall(_response('404 Not Found', 'GET /metrics\n'))
+            else:
+                sock.sendall(_response('200 OK', self.registry.render(),
+                                       'text/plain; version=0.0.4; charset=utf-8'))
+        finally:
+            sock.close()
+
+
+class MonitorMetrics(object):
+    """
+    Metrik per tahap siklus monitor. Controller memanggil:
+      stats_request()   saat request flow stats dikirim ke datapath
+      stats_reply()     setiap bagian reply multipart (last=True untuk bagian terakhir)
+      snapshot()        saat snapshot epoch diambil (jumlah baris)
+      prediction()      saat hasil inferensi satu epoch dilaporkan
+      success()         saat epoch tanpa flow selesai (prediction() juga menandai sukses)
+    """
+
+    def __init__(self, registry=None):
+        self.registry = registry or MetricsRegistry('ddos_monitor_')
+        self._sent = {}                 # datapath_id -> waktu request flow stats terakhir
+        self._reply_flows = {}          # datapath_id -> jumlah flow reply berjalan
+        self._reply_bytes = {}          # datapath_id -> ukuran (byte) reply berjalan
+        self.last_success = None
+        self._started = time.time()
+
+        r = self.registry
+        r.counter('stats_requests_total', 'Request flow stats yang dikirim per datapath.')
+        r.counter('stats_reply_parts_total', 'Bagian reply multipart flow stats per datapath.')
+        r.histogram('stats_reply_latency_seconds',
+                    'Waktu dari request flow stats sampai bagian reply terakhir per datapath.')
+        r.histogram('stats_reply_flows', 'Jumlah flow per reply flow stats (semua bagian) per datapath.',
+                    DEFAULT_SIZE_BUCKETS)
+        r.gauge('stats_reply_last_flows', 'Jumlah flow reply flow stats terakhir per datapath.')
+        r.gauge('stats_reply_last_bytes', 'Ukuran (byte OpenFlow) reply flow stats terakhir per datapath.')
+        r.gauge('stats_reply_last_latency_seconds', 'Latensi reply flow stats terakhir per datapath.')
+        r.histogram('snapshot_rows', 'Jumlah baris per snapshot epoch.', DEFAULT_SIZE_BUCKETS)
+        r.gauge('snapshot_last_rows', 'Jumlah baris snapshot epoch terakhir.')
+        r.histogram('preprocess_seconds',
+                    'Preprocessing per epoch (sekuens di event loop + fitur / scaling di worker).')
+        r.histogram('inference_seconds', 'Waktu model.predict per epoch.')
+        r.histogram('inference_queue_seconds', 'Waktu job menunggu di antrian worker inferensi.')
+        r.histogram('inference_batch_size', 'Jumlah flow per batch inferensi.', DEFAULT_SIZE_BUCKETS)
+        r.histogram('cycle_latency_seconds', 'Waktu dari submit job inferensi sampai hasil dilaporkan.')
+        r.gauge('ddos_ratio', 'Rasio flow berprediksi ddos pada epoch terakhir.')
+        r.counter('predictions_total', 'Flow yang diklasifikasi per kelas (legitimate / ddos).')
+        r.counter('epochs_total', 'Epoch yang selesai diklasifikasi.')
+        r.counter('inference_errors_total', 'Job inferensi yang gagal.')
+        r.counter('inference_dropped_total', 'Snapshot yang dibuang karena worker inferensi tertinggal.')
+        r.gauge('seconds_since_last_success',
+                'Waktu sejak siklus polling -> prediksi terakhir yang berhasil (sejak start jika belum ada).')
+        r.gauge('poll_interval_seconds', 'Interval polling adaptif per datapath.')
+
+    def stats_request(self, datapath_id, now=None):
+        self._sent[datapath_id] = time.time() if now is None else now
+        self._reply_flows[datapath_id] = 0
+        self._reply_bytes[datapath_id] = 0
+        self.registry.inc('stats_requests_total', datapath=_dpid(datapath_id))
+
+    def stats_reply(self, datapath_id, n_flows, n_bytes, last, now=None):
+        dp = _dpid(datapath_id)
+        self.registry.inc('stats_reply_parts_total', datapath=dp)
+        self._reply_flows[datapath_id] = self._reply_flows.get(datapath_id, 0) + n_flows
+        self._reply_bytes[datapath_id] = self._reply_bytes.get(datapath_id, 0) + n_bytes
+        if not last:
+            return
+        flows = self._reply_flows.pop(datapath_id)
+        self.registry.observe('stats_reply_flows', flows, datapath=dp)
+        self.registry.set('stats_reply_last_flows', flows, datapath=dp)
+        self.registry.set('stats_reply_last_bytes', self._reply_bytes.pop(datapath_id), datapath=dp)
+        sent = self._sent.pop(datapath_id, None)
+        if sent is not None:
+            latency = (time.time() if now is None else now) - sent
+            self.registry.observe('stats_reply_latency_seconds', latency, datapath=dp)
+            self.registry.set('stats_reply_last_latency_seconds', latency, datapath=dp)
+
+    def forget_datapath(self, datapath_id):
+        for store in (self._sent, self._reply_flows, self._reply_bytes):
+            store.pop(datapath_id, None)
+        self.registry.remove(datapath=_dpid(datapath_id))
+
+    def snapshot(self, n_rows):
+        self.registry.observe('snapshot_rows', n_rows)
+        self.registry.set('snapshot_last_rows', n_rows)
+
+    def success(self, now=None):
+        """Siklus selesai tanpa error (termasuk epoch tanpa flow)."""
+        self.last_success = time.time() if now is None else now
+
+    def prediction(self, job, result, now=None):
+        """Hasil inferensi satu epoch (InferenceJob + InferenceResult dari inference_worker)."""
+        now = time.time() if now is None else now
+        preds = result.preds
+        r = self.registry
+        r.observe('preprocess_seconds', job.prepare_seconds + result.preprocess_seconds)
+        r.observe('inference_seconds', result.inference_seconds)
+        r.observe('inference_queue_seconds', max(0.0, result.started - job.submitted))
+        r.observe('inference_batch_size', len(preds))
+        r.observe('cycle_latency_seconds', now - job.submitted)
+        n_ddos = int((preds != 0).sum())
+        r.set('ddos_ratio', float(n_ddos) / len(preds) if len(preds) else 0.0)
+        r.inc('predictions_total', len(preds) - n_ddos, **{'class': 'legitimate'})
+        r.inc('predictions_total', n_ddos, **{'class': 'ddos'})
+        r.inc('epochs_total')
+        self.success(now)
+
+    def inference_error(self):
+        self.registry.inc('inference_errors_total')
+
+    def collect(self, inference_worker=None, poll_scheduler=None):
+        """Gauge yang dihitung saat scrape; didaftarkan sebagai collector registry."""
+        r = self.registry
+        r.set('seconds_since_last_success', time.time() - (self.last_success or self._started))
+        if inference_worker is not None:
+            r.set('inference_dropped_total', inference_worker.dropped)
+        if poll_scheduler is not None:
+            r.clear('poll_interval_seconds')
+            for datapath_id, status in poll_scheduler.status().items():
+                r.set('poll_interval_seconds', status['interval'], datapath=_dpid(datapath_id))
+
+
+def _dpid(datapath_id):
+    return '%016x' % datapath_id
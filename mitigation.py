@@ -0,0 +1,252 @@
+# mitigation.py
+# Mitigasi DDoS otomatis untuk SimpleMonitor13: sumber serangan per victim
+# (diurutkan oleh victims.rank_victims), lalu rule drop (atau meter) dipasang
+# di datapath tempat flow serangan terlihat.
+#
+# - Rule dipasang per batch per datapath dan diakhiri satu OFPBarrierRequest;
+#   rule dianggap terpasang setelah barrier reply datang.
+# - Setiap rule punya hard_timeout: ketika traffic normal lagi (tidak ada
+#   prediksi ddos baru), rule hilang sendiri dari switch tanpa FlowMod delete.
+#   Rule yang masih aktif tidak dipasang ulang sampai mendekati timeout.
+# - Jumlah FlowMod / MeterMod per datapath dibatasi token bucket; sisa rule
+#   menunggu giliran di antrian (sumber dengan rate terbesar lebih dulu).
+import time
+from collections import namedtuple
+
+MODE_DROP = 'drop'
+MODE_METER = 'meter'
+
+# cookie penanda rule mitigasi (untuk filter stats / hapus massal)
+MITIGATION_COOKIE = 0xdd05
+
+# satu sumber serangan terhadap satu victim, terlihat di datapath tertentu
+Offender = namedtuple('Offender', 'datapath_id ip_src ip_dst pps flows')
+
+
+def offenders(victims, max_sources):
+    """
+    Return list Offender dari hasil victims.rank_victims: maksimum max_sources
+    sumber per victim, satu Offender per datapath tempat pasangan terlihat.
+    """
+    result = []
+    for victim in victims:
+        for source in victim.sources[:max_sources]:
+            for dpid in source.datapath_ids:
+                result.append(Offender(dpid, source.ip_src, victim.ip_dst, source.pps, source.flows))
+    return result
+
+
+class TokenBucket(object):
+    """Batas laju sederhana: `rate` token per detik, kapasitas `burst`."""
+
+    def __init__(self, rate, burst, now=None):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = float(burst)
+        self._updated = time.time() if now is None else now
+
+    def available(self, now):
+        """Isi ulang sesuai waktu berjalan dan return jumlah token utuh yang tersedia."""
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        return int(self._tokens)
+
+    def consume(self, count):
+        self._tokens -= count
+
+
+class MitigationManager(object):
+    """
+    Rencanakan (plan) dan pasang (flush) rule mitigasi.
+
+    plan() dipanggil dengan hasil prediksi satu epoch; flush() mengirim rule
+    yang menunggu ke datapath sesuai token bucket masing-masing dan dipanggil
+    setiap siklus _monitor. barrier_reply() dipanggil dari handler
+    EventOFPBarrierReply controller.
+    """
+
+    def __init__(self, mode=MODE_DROP, priority=100, hard_timeout=60, max_sources=20,
+                 flowmods_per_second=50, burst=100, meter_rate_kbps=1000,
+                 refresh_margin=10, cookie=MITIGATION_COOKIE):
+        if mode not in (MODE_DROP, MODE_METER):
+            raise ValueError("Mode mitigasi tidak dikenal: {}".format(mode))
+        self.mode = mode
+        self.priority = priority
+        self.hard_timeout = hard_timeout
+        self.max_sources = max_sources
+        self.flowmods_per_second = flowmods_per_second
+        self.burst = burst
+        self.meter_rate_kbps = meter_rate_kbps
+        self.refresh_margin = refresh_margin
+        self.cookie = cookie
+
+        self._pending = {}     # (dpid, ip_src, ip_dst) -> Offender yang menunggu token
+        self._installed = {}   # (dpid, ip_src, ip_dst) -> waktu rule habis (hard_timeout)
+        self._buckets = {}     # dpid -> TokenBucket
+        self._barriers = {}    # (dpid, xid) -> jumlah rule dalam batch
+        self._meters = {}      # (dpid, ip_dst) -> [meter_id, waktu habis rule terakhir]
+        self._next_meter = {}  # dpid -> meter_id berikutnya
+        self.installed_total = 0
+        self.confirmed_total = 0
+
+    def plan(self, victims, now=None):
+        """Tambahkan sumber serangan epoch ini (list VictimSummary) ke antrian. Return jumlah rule baru."""
+        now = time.time() if now is None else now
+        added = 0
+        for offender in offenders(victims, self.max_sources):
+            key = (offender.datapath_id, offender.ip_src, offender.ip_dst)
+            expires = self._installed.get(key)
+            if expires is not None and expires - now > self.refresh_margin:
+                continue
+            if key not in self._pending:
+                added += 1
+            self._pending[key] = offender
+        return added
+
+    def pending(self):
+        return len(self._pending)
+
+    def active(self, now=None):
+        now = time.time() if now is None else now
+        return sum(1 for expires in self._installed.values() if expires > now)
+
+    def forget_datapath(self, datapath_id):
+        for store in (self._pending, self._installed):
+            for key in [k for k in store if k[0] == datapath_id]:
+                del store[key]
+        for key in [k for k in self._meters if k[0] == datapath_id]:
+            del self._meters[key]
+        self._buckets.pop(datapath_id, None)
+        self._next_meter.pop(datapath_id, None)
+
+    def flush(self, datapaths, now=None):
+        """
+        Kirim rule yang menunggu ke datapath (dict dpid -> datapath) sesuai sisa
+        token. Return dict dpid -> jumlah pesan yang dikirim.
+        """
+        now = time.time() if now is None else now
+        self._expire(now)
+        by_datapath = {}
+        for key, offender in sorted(self._pending.items(), key=lambda item: (-item[1].pps, -item[1].flows)):
+            by_datapath.setdefault(key[0], []).append(offender)
+
+        sent = {}
+        for dpid, offenders in by_datapath.items():
+            datapath = datapaths.get(dpid)
+            if datapath is None:
+                for o in offenders:
+                    del self._pending[(dpid, o.ip_src, o.ip_dst)]
+                continue
+            bucket = self._bucket(dpid, now)
+            messages, rules = self._build(datapath, offenders, bucket.available(now), now)
+            if messages:
+                bucket.consume(len(messages))
+                self._send_batch(datapath, messages, rules)
+                self.installed_total += rules
+                sent[dpid] = len(messages)
+        if self._meters:
+            self._delete_idle_meters(datapaths, now)
+        return sent
+
+    def _bucket(self, dpid, now):
+        bucket = self._buckets.get(dpid)
+        if bucket is None:
+            bucket = self._buckets[dpid] = TokenBucket(self.flowmods_per_second, self.burst, now)
+        return bucket
+
+    def _expire(self, now):
+        for key in [k for k, expires in self._installed.items() if expires <= now]:
+            del self._installed[key]
+
+    def _build(self, datapath, offenders, budget, now):
+        """FlowMod (dan MeterMod baru) untuk offender sebanyak budget pesan. Return (pesan, jumlah rule)."""
+        messages = []
+        rules = 0
+        for offender in offenders:
+            meter_id = None
+            if self.mode == MODE_METER:
+                meter_key = (datapath.id, offender.ip_dst)
+                meter = self._meters.get(meter_key)
+                if meter is None:
+                    if budget < 2:
+                        break
+                    meter_id = self._next_meter.get(datapath.id, 1)
+                    self._next_meter[datapath.id] = meter_id + 1
+                    meter = self._meters[meter_key] = [meter_id, now]
+                    messages.append(self._meter_mod(datapath, meter_id, datapath.ofproto.OFPMC_ADD))
+                    budget -= 1
+                meter_id = meter[0]
+                meter[1] = now + self.hard_timeout
+            if budget < 1:
+                break
+            messages.append(self._flow_mod(datapath, offender, meter_id))
+            budget -= 1
+            rules += 1
+            key = (datapath.id, offender.ip_src, offender.ip_dst)
+            del self._pending[key]
+            self._installed[key] = now + self.hard_timeout
+        return messages, rules
+
+    def _flow_mod(self, datapath, offender, meter_id):
+        ofproto = datapath.ofproto
+        parser = datapath.ofproto_parser
+        match = parser.OFPMatch(eth_type=0x0800, ipv4_src=offender.ip_src, ipv4_dst=offender.ip_dst)
+        if meter_id is None:
+            # tanpa instruksi = paket di-drop
+            instructions = []
+        else:
+            # traffic sumber ini dibatasi meter victim, sisanya diteruskan lewat
+            # pipeline normal switch (OFPP_NORMAL, didukung OVS)
+            instructions = [parser.OFPInstructionMeter(meter_id),
+                            parser.OFPInstructionActions(ofproto.OFPIT_APPLY_ACTIONS,
+                                                         [parser.OFPActionOutput(ofproto.OFPP_NORMAL)])]
+        return parser.OFPFlowMod(datapath=datapath, cookie=self.cookie, command=ofproto.OFPFC_ADD,
+                                 hard_timeout=self.hard_timeout, priority=self.priority,
+                                 match=match, instructions=instructions)
+
+    def _meter_mod(self, datapath, meter_id, command):
+        ofproto = datapath.ofproto
+        parser = datapath.ofproto_parser
+        bands = [parser.OFPMeterBandDrop(rate=self.meter_rate_kbps, burst_size=0)]
+        if command == ofproto.OFPMC_DELETE:
+            bands = []
+        return parser.OFPMeterMod(datapath, command, ofproto.OFPMF_KBPS, meter_id, bands)
+
+    def _delete_idle_meters(self, datapaths, now):
+        # meter tidak punya timeout di OpenFlow: hapus setelah rule terakhirnya habis
+        for key, (meter_id, expires) in list(self._meters.items()):
+            datapath = datapaths.get(key[0])
+            if expires > now or datapath is None:
+                continue
+            bucket = self._bucket(key[0], now)
+            if bucket.available(now) >= 1:
+                bucket.consume(1)
+                self._send_batch(datapath, [self._meter_mod(datapath, meter_id, datapath.ofproto.OFPMC_DELETE)], 0)
+                del self._meters[key]
+
+    def _send_batch(self, datapath, messages, rules):
+        for msg in messages:
+            datapath.send_msg(msg)
+        barrier = datapath.ofproto_parser.OFPBarrierRequest(datapath)
+        datapath.set_xid(barrier)
+        datapath.send_msg(barrier)
+        self._barriers[(datapath.id, barrier.xid)] = rules
+
+    def barrier_reply(self, datapath_id, xid):
+        """Batch rule sampai di switch. Return jumlah rule yang terkonfirmasi, None jika bukan milik mitigasi."""
+        rules = self._barriers.pop((datapath_id, xid), None)
+        if rules is not None:
+            self.confirmed_total += rules
+        return rules
+
+    def clear(self, datapaths):
+        """Hapus semua rule mitigasi (berdasarkan cookie) dari semua datapath."""
+        for datapath in datapaths.values():
+            ofproto = datapath.ofproto
+            parser = datapath.ofproto_parser
+            datapath.send_msg(parser.OFPFlowMod(
+                datapath=datapath, cookie=self.cookie, cookie_mask=0xffffffffffffffff,
+                table_id=ofproto.OFPTT_ALL, command=ofproto.OFPFC_DELETE,
+                out_port=ofproto.OFPP_ANY, out_group=ofproto.OFPG_ANY))
+        self._pending.clear()
+        self._installed.clear()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# model_artifacts.py
+# Direktori artefak model berversi untuk SimpleMonitor13:
+#
+#   models/
+#     CURRENT                  <- nama versi aktif (diganti atomik dengan os.replace)
+#     20250101-120000-1234/    <- satu versi lengkap
+#       flow_model.bundle.npz  <- bobot + scaler + label + fitur (lihat model_bundle.py)
+#       flow_model.h5          <- model Keras asli, untuk dianalisis / dilatih lanjut
+#
+# Versi ditulis dulu ke direktori sementara lalu di-rename, baru setelah itu
+# CURRENT dipindah ke versi baru. Pembaca tidak pernah melihat set file yang
+# setengah jadi atau campuran model lama dengan scaler baru.
+import os
+import shutil
+import time
+
+import model_bundle
+
+DEFAULT_ROOT = "models"
+CURRENT_FILE = "CURRENT"
+MODEL_H5 = "flow_model.h5"
+BUNDLE_FILE = "flow_model.bundle.npz"
+# jumlah versi yang disimpan di disk (versi aktif tidak pernah dihapus)
+DEFAULT_KEEP = 3
+
+_TMP_PREFIX = '.tmp-'
+
+
+def current_version(root=DEFAULT_ROOT):
+    """Nama versi aktif, atau None jika belum pernah ada model yang dipublikasikan."""
+    try:
+        with open(os.path.join(root, CURRENT_FILE)) as f:
+            version = f.read().strip()
+    except (IOError, OSError):
+        return None
+    return version or None
+
+
+def version_path(version, root=DEFAULT_ROOT):
+    return os.path.join(root, version)
+
+
+def load_version(version, root=DEFAULT_ROOT):
+    """Muat ModelBundle satu versi (NumPy saja, tanpa TensorFlow / sklearn)."""
+    return model_bundle.ModelBundle.load(os.path.join(version_path(version, root), BUNDLE_FILE))
+
+
+def _write_current(root, version):
+    tmp = os.path.join(root, '{}{}.{}'.format(_TMP_PREFIX, CURRENT_FILE, os.getpid()))
+    with open(tmp, 'w') as f:
+        f.write(version + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, os.path.join(root, CURRENT_FILE))
+
+
+def publish(keras_model, scaler, le, meta=None, root=DEFAULT_ROOT, keep=DEFAULT_KEEP,
+            features=None, timesteps=None, sequence_max_idle=None):
+    """
+    Simpan model Keras + scaler + label encoder sebagai versi baru (satu bundle)
+    lalu jadikan versi aktif. Return nama versi baru.
+    """
+    if not os.path.isdir(root):
+        os.makedirs(root)
+    version = '{}-{}'.format(time.strftime('%Y%m%d-%H%M%S'), os.getpid())
+    tmp_dir = os.path.join(root, _TMP_PREFIX + version)
+    os.makedirs(tmp_dir)
+    try:
+        h5_path = os.path.join(tmp_dir, MODEL_H5)
+        keras_model.save(h5_path)
+        meta = dict(meta or {}, version=version, created=time.time())
+        kwargs = {} if sequence_max_idle is None else {'sequence_max_idle': sequence_max_idle}
+        model_bundle.save(os.path.join(tmp_dir, BUNDLE_FILE), h5_path, scaler, le,
+                          features=features, timesteps=timesteps, meta=meta, **kwargs)
+        os.rename(tmp_dir, version_path(version, root))
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    _write_current(root, version)
+    prune(root, keep)
+    return version
+
+
+def prune(root=DEFAULT_ROOT, keep=DEFAULT_KEEP):
+    """Hapus versi lama, sisakan `keep` versi terbaru dan versi aktif."""
+    active = current_version(root)
+    versions = sorted(name for name in os.listdir(root)
+                      if not name.startswith(_TMP_PREFIX) and os.path.isdir(os.path.join(root, name)))
+    for name in versions[:-keep] if keep > 0 else versions:
+        if name != active:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
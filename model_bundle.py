@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+# model_bundle.py
+# Satu file .npz berisi semua yang dibutuhkan inferensi:
+#
+#   __bundle__        JSON: format, fitur (urutan input model), timesteps,
+#                     max_idle sekuens, spesifikasi layer, input shape, meta
+#   model/<layer>/..  bobot LSTM / Dense (lihat numpy_lstm.read_h5)
+#   scaler/min        MinMaxScaler.min_   (X * scale + min)
+#   scaler/scale      MinMaxScaler.scale_
+#   labels/classes    LabelEncoder.classes_
+#
+# Skema fitur divalidasi dan diubah menjadi index kolom matriks numerik snapshot
+# FlowStatsStore sekali saat load, sehingga flow_predict tidak lagi baru tahu
+# kolomnya salah saat transform gagal dan tidak mencari kolom per nama.
+# Load hanya butuh NumPy (tanpa joblib / sklearn / TensorFlow).
+import json
+
+import numpy as np
+
+from flow_store import FEATURE_COLUMNS, feature_index
+from numpy_lstm import NumpyLSTMModel, read_h5
+from sequence_buffer import DEFAULT_MAX_IDLE
+
+BUNDLE_FORMAT = 1
+
+
+class BundleScaler(object):
+    """
+    Parameter MinMaxScaler dari bundle. Atribut dan transform() sama dengan
+    sklearn (feature_names_in_, scale_, min_) sehingga bisa dipakai di
+    InferenceJob / scale_windows sebagai pengganti scaler joblib.
+    """
+
+    def __init__(self, features, scale, min_):
+        self.feature_names_in_ = np.array(features, dtype=object)
+        self.scale_ = scale
+        self.min_ = min_
+        self.n_features_in_ = len(features)
+
+    def transform(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.shape[-1] != self.n_features_in_:
+            raise ValueError("Jumlah fitur {} tidak sesuai scaler ({})".format(X.shape[-1], self.n_features_in_))
+        return X * self.scale_ + self.min_
+
+
+class BundleLabels(object):
+    """Kelas label dari bundle (pengganti LabelEncoder untuk inverse_transform)."""
+
+    def __init__(self, classes):
+        self.classes_ = classes
+
+    def inverse_transform(self, y):
+        return self.classes_[np.asarray(y)]
+
+
+class ModelBundle(object):
+    """Model NumPy + scaler + label + skema fitur dari satu file bundle."""
+
+    def __init__(self, model, scaler, labels, features, timesteps=1,
+                 sequence_max_idle=DEFAULT_MAX_IDLE, meta=None):
+        self.model = model
+        self.scaler = scaler
+        self.le = labels
+        self.features = tuple(features)
+        self.timesteps = timesteps
+        self.sequence_max_idle = sequence_max_idle
+        self.meta = meta or {}
+        self._validate()
+
+    def _validate(self):
+        # index kolom fitur untuk FlowStatsSnapshot.features(), ValueError jika fitur tidak ada
+        self.feature_index = feature_index(self.features)
+        n = len(self.features)
+        if self.model.n_features != n or len(self.scaler.scale_) != n or len(self.scaler.min_) != n:
+            raise ValueError("Bundle tidak konsisten: {} fitur, model {} input, scaler {} kolom".format(
+                n, self.model.n_features, len(self.scaler.scale_)))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            header = json.loads(str(data['__bundle__']))
+            if header.get('format') != BUNDLE_FORMAT:
+                raise ValueError("Format bundle {} tidak didukung".format(header.get('format')))
+            weights = dict((k[len('model/'):], data[k]) for k in data.files if k.startswith('model/'))
+            scaler = BundleScaler(header['features'], data['scaler/scale'], data['scaler/min'])
+            labels = BundleLabels(data['labels/classes'])
+        model = NumpyLSTMModel(header['spec'], weights, header.get('input_shape'))
+        return cls(model, scaler, labels, header['features'], header.get('timesteps', 1),
+                   header.get('sequence_max_idle', DEFAULT_MAX_IDLE), header.get('meta'))
+
+
+def save(path, h5_path, scaler, le, features=None, timesteps=None,
+         sequence_max_idle=DEFAULT_MAX_IDLE, meta=None):
+    """
+    Tulis bundle dari model Keras .h5 + MinMaxScaler + LabelEncoder hasil training.
+    features default: scaler.feature_names_in_, atau FEATURE_COLUMNS untuk scaler
+    yang di-fit dengan array (flow_training lama); timesteps default: input shape model.
+    """
+    spec, weights, input_shape = read_h5(h5_path)
+    if features is None:
+        names = getattr(scaler, 'feature_names_in_', None)
+        features = FEATURE_COLUMNS if names is None else [str(name) for name in names]
+    if timesteps is None:
+        timesteps = input_shape[1] if input_shape and input_shape[1] else 1
+    header = {
+        'format': BUNDLE_FORMAT,
+        'features': list(features),
+        'timesteps': int(timesteps),
+        'sequence_max_idle': float(sequence_max_idle),
+        'spec': spec,
+        'input_shape': input_shape,
+        'meta': meta or {},
+    }
+    arrays = dict(('model/' + name, arr) for name, arr in weights.items())
+    arrays['scaler/min'] = np.asarray(scaler.min_, dtype=np.float64)
+    arrays['scaler/scale'] = np.asarray(scaler.scale_, dtype=np.float64)
+    classes = np.asarray(le.classes_)
+    # label string disimpan sebagai array unicode (np.load tanpa pickle)
+    arrays['labels/classes'] = classes.astype(str) if classes.dtype == object else classes
+    with open(path, 'wb') as f:
+        np.savez(f, __bundle__=np.array(json.dumps(header)), **arrays)
+    # validasi sebelum dipakai controller: gagal di sini, bukan saat prediksi
+    ModelBundle.load(path)
+    return path
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+# numpy_lstm.py
+# Inferensi flow_model.h5 (Sequential LSTM -> Dense -> Dense softmax) dengan NumPy
+# saja, tanpa import TensorFlow / Keras.
+#
+# Ekspor bobot (cukup h5py, tidak perlu TensorFlow):
+#   python numpy_lstm.py export flow_model.h5 flow_model.npz
+# Cek keluaran terhadap Keras (butuh TensorFlow):
+#   python numpy_lstm.py verify flow_model.h5 flow_model.npz
+import json
+import sys
+
+import numpy as np
+
+# layer Keras yang didukung forward pass NumPy; Dropout hanya aktif saat training
+SUPPORTED_LAYERS = ('LSTM', 'Dense', 'Dropout')
+
+
+def _decode(value):
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+def read_h5(h5_path):
+    """
+    Baca arsitektur (model_config) dan bobot dari file .h5 Keras. Return
+    (spec layer, dict array bobot 'layer/kernel', input shape atau None).
+    """
+    import h5py
+
+    with h5py.File(h5_path, 'r') as f:
+        model_config = json.loads(_decode(f.attrs['model_config']))
+        weights_group = f['model_weights'] if 'model_weights' in f else f
+        layer_configs = dict((layer['config']['name'], layer)
+                             for layer in model_config['config']['layers'])
+
+        spec = []
+        arrays = {}
+        input_shape = None
+        for layer in model_config['config']['layers']:
+            if layer['class_name'] == 'InputLayer':
+                config = layer['config']
+                input_shape = config.get('batch_shape', config.get('batch_input_shape'))
+        for name in weights_group.attrs['layer_names']:
+            name = _decode(name)
+            layer = layer_configs.get(name)
+            if layer is None or layer['class_name'] == 'InputLayer':
+                continue
+            class_name = layer['class_name']
+            if class_name not in SUPPORTED_LAYERS:
+                raise ValueError("Layer {} ({}) tidak didukung".format(name, class_name))
+            config = layer['config']
+            entry = {'name': name, 'class_name': class_name}
+            if class_name == 'LSTM':
+                entry['activation'] = config.get('activation', 'tanh')
+                entry['recurrent_activation'] = config.get('recurrent_activation', 'sigmoid')
+                entry['return_sequences'] = config.get('return_sequences', False)
+                keys = ('kernel', 'recurrent_kernel', 'bias')
+            elif class_name == 'Dense':
+                entry['activation'] = config.get('activation', 'linear')
+                keys = ('kernel', 'bias')
+            else:
+                keys = ()
+
+            # urutan weight_names sama dengan urutan get_weights() Keras
+            weight_names = [_decode(w) for w in weights_group[name].attrs['weight_names']]
+            if len(weight_names) != len(keys):
+                raise ValueError("Jumlah bobot layer {} tidak sesuai".format(name))
+            for key, weight_name in zip(keys, weight_names):
+                arrays['{}/{}'.format(name, key)] = np.asarray(weights_group[name][weight_name], dtype=np.float32)
+            spec.append(entry)
+    return spec, arrays, input_shape
+
+
+def export_h5(h5_path, npz_path):
+    """Simpan model .h5 sebagai .npz ringkas: satu array per bobot + spesifikasi layer dalam JSON."""
+    spec, arrays, input_shape = read_h5(h5_path)
+    if input_shape is not None:
+        # (batch, timesteps, features); timesteps None = panjang sekuens bebas
+        arrays['__input_shape__'] = np.array([-1 if d is None else d for d in input_shape])
+    np.savez(npz_path, __spec__=np.array(json.dumps(spec)), **arrays)
+    return npz_path
+
+
+def _sigmoid(x):
+    # exp(-x) overflow ke inf untuk x negatif besar, hasilnya tetap benar (0)
+    with np.errstate(over='ignore'):
+        return 1.0 / (1.0 + np.exp(-x))
+
+
+def _hard_sigmoid(x):
+    return np.clip(0.2 * x + 0.5, 0.0, 1.0)
+
+
+def _relu(x):
+    return np.maximum(x, 0.0)
+
+
+def _softmax(x):
+    e = np.exp(x - x.max(axis=-1, keepdims=True))
+    return e / e.sum(axis=-1, keepdims=True)
+
+
+def _linear(x):
+    return x
+
+
+_ACTIVATIONS = {
+    'sigmoid': _sigmoid,
+    'hard_sigmoid': _hard_sigmoid,
+    'tanh': np.tanh,
+    'relu': _relu,
+    'softmax': _softmax,
+    'linear': _linear,
+}
+
+
+class NumpyLSTMModel(object):
+    """
+    Forward pass NumPy untuk model Sequential hasil export_h5().
+
+    predict() mengikuti signature Keras (input (n, timesteps, features),
+    output probabilitas (n, n_classes)) sehingga bisa menggantikan model
+    Keras di worker inferensi tanpa perubahan lain.
+    """
+
+    def __init__(self, spec, weights, input_shape=None):
+        self._layers = []
+        for entry in spec:
+            name = entry['name']
+            if entry['class_name'] == 'LSTM':
+                self._layers.append(('LSTM', (
+                    weights[name + '/kernel'], weights[name + '/recurrent_kernel'], weights[name + '/bias'],
+                    _ACTIVATIONS[entry['activation']], _ACTIVATIONS[entry['recurrent_activation']],
+                    entry.get('return_sequences', False))))
+            elif entry['class_name'] == 'Dense':
+                self._layers.append(('Dense', (
+                    weights[name + '/kernel'], weights[name + '/bias'], _ACTIVATIONS[entry['activation']])))
+        if not self._layers or self._layers[0][0] != 'LSTM':
+            raise ValueError("Layer pertama harus LSTM")
+        kernel = self._layers[0][1][0]
+        self.n_features = kernel.shape[0]
+        # panjang sekuens input model (None jika tidak tercatat / bebas)
+        self.timesteps = None
+        if input_shape is not None and len(input_shape) == 3 and input_shape[1] is not None and input_shape[1] > 0:
+            self.timesteps = int(input_shape[1])
+
+    @classmethod
+    def load(cls, npz_path):
+        with np.load(npz_path) as data:
+            spec = json.loads(str(data['__spec__']))
+            input_shape = data['__input_shape__'].tolist() if '__input_shape__' in data.files else None
+            weights = dict((k, data[k]) for k in data.files if not k.startswith('__'))
+        return cls(spec, weights, input_shape)
+
+    @staticmethod
+    def _lstm(x, kernel, recurrent_kernel, bias, activation, recurrent_activation, return_sequences):
+        n, timesteps, _ = x.shape
+        units = recurrent_kernel.shape[0]
+        # proyeksi input semua timestep sekaligus, hanya bagian rekuren yang berurutan
+        z_input = np.matmul(x, kernel) + bias
+        h = np.zeros((n, units), dtype=x.dtype)
+        c = np.zeros((n, units), dtype=x.dtype)
+        outputs = []
+        for t in range(timesteps):
+            z = z_input[:, t, :] if t == 0 else z_input[:, t, :] + h.dot(recurrent_kernel)
+            # urutan gate Keras: input, forget, cell, output
+            i = recurrent_activation(z[:, :units])
+            f = recurrent_activation(z[:, units:2 * units])
+            g = activation(z[:, 2 * units:3 * units])
+            o = recurrent_activation(z[:, 3 * units:])
+            c = f * c + i * g
+            h = o * activation(c)
+            if return_sequences:
+                outputs.append(h)
+        return np.stack(outputs, axis=1) if return_sequences else h
+
+    def predict(self, x, verbose=0, batch_size=None):
+        out = np.asarray(x, dtype=np.float32)
+        if out.ndim == 2:
+            out = out.reshape((out.shape[0], 1, out.shape[1]))
+        for kind, params in self._layers:
+            if kind == 'LSTM':
+                out = self._lstm(out, *params)
+            else:
+                kernel, bias, activation = params
+                out = activation(out.dot(kernel) + bias)
+        return out
+
+
+def verify(h5_path, npz_path, n_samples=1000, atol=1e-5):
+    """Bandingkan keluaran NumpyLSTMModel dengan Keras pada input acak [0, 1]."""
+    from tensorflow.keras.models import load_model
+
+    keras_model = load_model(h5_path)
+    numpy_model = NumpyLSTMModel.load(npz_path)
+    timesteps, n_features = keras_model.input_shape[1], keras_model.input_shape[2]
+    x = np.random.RandomState(0).rand(n_samples, timesteps, n_features).astype(np.float32)
+    expected = keras_model.predict(x, verbose=0)
+    actual = numpy_model.predict(x)
+    max_diff = float(np.max(np.abs(expected - actual)))
+    same_class = float(np.mean(np.argmax(expected, axis=1) == np.argmax(actual, axis=1)))
+    return max_diff <= atol, max_diff, same_class
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 4 or sys.argv[1] not in ('export', 'verify'):
+        print("Usage: python numpy_lstm.py export|verify flow_model.h5 flow_model.npz")
+        sys.exit(1)
+    if sys.argv[1] == 'export':
+        export_h5(sys.argv[2], sys.argv[3])
+        print("Bobot {} diekspor ke {}".format(sys.argv[2], sys.argv[3]))
+    else:
+        ok, max_diff, same_class = verify(sys.argv[2], sys.argv[3])
+        print("max |keras - numpy| = {:.2e}, kelas sama = {:.2f}%".format(max_diff, same_class * 100))
+        sys.exit(0 if ok else 1)
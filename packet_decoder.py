@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+# packet_decoder.py
+# Decoder frame Ethernet/IPv4/TCP/UDP/ICMP mentah tanpa scapy. Hanya field
+# yang dipakai Flow (flow.py) yang diambil, lihat Flow.from_record / add_record.
+#
+# Nilai field mengikuti hasil dissect scapy pada frame yang sama:
+#   - length       : panjang frame yang ter-capture (len(packet))
+#   - header_size  : ihl * 4 untuk TCP, 8 untuk selainnya (FlowBytes._header_size)
+#   - payload_size : sisa frame setelah header L4, termasuk padding Ethernet
+#                    (len(packet["TCP"].payload) di scapy ikut menghitung Padding)
+# Fragmen IPv4 selain fragmen pertama dan protokol lain dilewati (None), sama
+# seperti packet_flow_key yang gagal pada paket tanpa layer TCP / UDP / ICMP.
+import socket
+import struct
+import time
+from collections import namedtuple
+
+from .features.context.packet_direction import PacketDirection
+
+ETH_P_ALL = 0x0003
+ETH_P_IP = 0x0800
+_VLAN_TYPES = (0x8100, 0x88a8)
+
+IPPROTO_ICMP = 1
+IPPROTO_TCP = 6
+IPPROTO_UDP = 17
+
+_TCP = struct.Struct('!HHIIHH')
+_UDP = struct.Struct('!HH')
+# panjang header ICMP per tipe (timestamp 20 byte, address mask 12 byte)
+_ICMP_HEADER = {13: 20, 14: 20, 17: 12, 18: 12}
+
+PacketRecord = namedtuple('PacketRecord', [
+    'time', 'length', 'src_mac', 'dst_mac', 'src_ip', 'dst_ip', 'protocol',
+    'src_port', 'dst_port', 'header_size', 'payload_size', 'tcp_flags', 'window',
+    'icmp_type', 'icmp_code',
+])
+
+_inet_ntoa = socket.inet_ntoa
+
+
+def _ip_offset(frame, n):
+    """Offset header IPv4 dalam frame, -1 jika bukan IPv4 atau fragmen lanjutan."""
+    if n < 34:
+        return -1
+    eth_type = (frame[12] << 8) | frame[13]
+    ip = 14
+    while eth_type in _VLAN_TYPES and n >= ip + 4:
+        eth_type = (frame[ip + 2] << 8) | frame[ip + 3]
+        ip += 4
+    if eth_type != ETH_P_IP or n < ip + 20 or frame[ip] >> 4 != 4:
+        return -1
+    # fragmen lanjutan tidak membawa header L4
+    if ((frame[ip + 6] & 0x1f) << 8) | frame[ip + 7]:
+        return -1
+    return ip
+
+
+def decode_frame(frame, timestamp):
+    """
+    Decode satu frame Ethernet (bytes) menjadi PacketRecord, atau None jika
+    bukan IPv4 TCP / UDP / ICMP atau terpotong sebelum header L4 selesai.
+    """
+    n = len(frame)
+    ip = _ip_offset(frame, n)
+    if ip < 0:
+        return None
+    ihl = (frame[ip] & 0x0f) * 4
+    protocol = frame[ip + 9]
+    l4 = ip + ihl
+
+    if protocol == IPPROTO_TCP:
+        if n < l4 + 20:
+            return None
+        src_port, dst_port, _, _, offset_flags, window = _TCP.unpack_from(frame, l4)
+        header_size = ihl
+        payload = l4 + (offset_flags >> 12) * 4
+        tcp_flags = offset_flags & 0xff
+        icmp_type = icmp_code = None
+    elif protocol == IPPROTO_UDP:
+        if n < l4 + 8:
+            return None
+        src_port, dst_port = _UDP.unpack_from(frame, l4)
+        header_size = 8
+        payload = l4 + 8
+        tcp_flags = 0
+        window = icmp_type = icmp_code = None
+    elif protocol == IPPROTO_ICMP:
+        if n < l4 + 8:
+            return None
+        src_port = dst_port = 0
+        icmp_type, icmp_code = frame[l4], frame[l4 + 1]
+        header_size = 8
+        payload = l4 + _ICMP_HEADER.get(icmp_type, 8)
+        tcp_flags = 0
+        window = None
+    else:
+        return None
+
+    return PacketRecord(
+        timestamp, n, frame[6:12].hex(':'), frame[0:6].hex(':'),
+        _inet_ntoa(frame[ip + 12:ip + 16]), _inet_ntoa(frame[ip + 16:ip + 20]),
+        protocol, src_port, dst_port, header_size, max(0, n - payload),
+        tcp_flags, window, icmp_type, icmp_code,
+    )
+
+
+def flow_hash_key(frame):
+    """
+    Kunci flow dua arah kanonik (bytes) langsung dari frame, tanpa decode
+    penuh: (ip, port) kedua ujung diurutkan sehingga paket forward dan reverse
+    satu flow menghasilkan kunci yang sama. Field sama dengan packet_flow_key
+    (port 0 untuk ICMP). None jika frame akan dilewati decode_frame.
+    """
+    n = len(frame)
+    ip = _ip_offset(frame, n)
+    if ip < 0:
+        return None
+    protocol = frame[ip + 9]
+    src, dst = frame[ip + 12:ip + 16], frame[ip + 16:ip + 20]
+    if protocol == IPPROTO_TCP or protocol == IPPROTO_UDP:
+        l4 = ip + (frame[ip] & 0x0f) * 4
+        if n < l4 + 4:
+            return None
+        src += frame[l4:l4 + 2]
+        dst += frame[l4 + 2:l4 + 4]
+    elif protocol != IPPROTO_ICMP:
+        return None
+    return src + dst if src <= dst else dst + src
+
+
+def get_record_flow_key(record, direction):
+    """Kunci flow (dest_ip, src_ip, src_port, dest_port) seperti packet_flow_key."""
+    if direction == PacketDirection.FORWARD:
+        return record.dst_ip, record.src_ip, record.src_port, record.dst_port
+    return record.src_ip, record.dst_ip, record.dst_port, record.src_port
+
+
+def capture_frames(iface, snaplen=65535):
+    """
+    Yield (timestamp, frame) dari interface (mis. mon0) lewat socket AF_PACKET
+    (Linux, butuh root). Timestamp = waktu frame diterima dari kernel.
+    """
+    sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ALL))
+    try:
+        sock.bind((iface, 0))
+        recv = sock.recv
+        while True:
+            frame = recv(snaplen)
+            yield time.time(), frame
+    finally:
+        sock.close()
+
+
+def sniff_records(iface, snaplen=65535):
+    """Yield PacketRecord untuk setiap frame IPv4 TCP / UDP / ICMP di interface."""
+    for timestamp, frame in capture_frames(iface, snaplen):
+        record = decode_frame(frame, timestamp)
+        if record is not None:
+            yield record
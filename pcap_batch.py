@@ -0,0 +1,427 @@
+# -*- coding: utf-8 -*-
+# pcap_batch.py
+# Mode batch offline: file pcap / pcapng rekaman -> CSV flow (kolom flows.csv)
+# dengan process pool, tanpa scapy.
+#
+#   1. index  : proses utama membaca header record file yang di-mmap dan
+#               memecahnya menjadi chunk berurutan waktu (chunk_packets paket).
+#               Setiap chunk di-scan paralel: kunci flow dua arah kanonik
+#               (packet_decoder.flow_hash_key) menentukan partisi crc32 % P;
+#               offset paket dan waktu maksimum sejauh ini (jam tabel flow)
+#               ditulis per (chunk, partisi).
+#   2. meter  : setiap partisi diproses satu worker melewati semua chunk
+#               berurutan, sehingga flow yang melintasi batas chunk tetap
+#               dirakit utuh oleh satu FlowMeter (tidak ada flow yang dipotong
+#               lalu disambung). Wheel expiry dimajukan dengan jam global pada
+#               paket itu, sama seperti saat semua paket diproses satu proses.
+#   3. merge  : baris diurutkan per (waktu paket pertama flow, baris CSV),
+#               di-spill ke file run terurut, lalu di-merge k-way ke output.
+#
+# Hasil tiap flow hanya bergantung pada paket flow itu sendiri (flow_expiry),
+# dan urutan baris tidak bergantung pada pembagian kerja, sehingga output byte
+# demi byte sama untuk berapa pun worker, termasuk --workers 0 (satu proses).
+#
+#   python3 -m cicflowmeter.pcap_batch capture.pcap flows.csv -w 8
+import argparse
+import csv
+import heapq
+import io
+import mmap
+import multiprocessing
+import os
+import shutil
+import struct
+import tempfile
+import time
+import zlib
+from array import array
+from collections import namedtuple
+
+from .flow_expiry import EXPIRE_REASONS, FLOW_ACTIVE_TIMEOUT, FLOW_IDLE_TIMEOUT
+from .flow_meter import FlowMeter
+from .packet_decoder import decode_frame, flow_hash_key
+
+LINKTYPE_ETHERNET = 1
+
+_PCAP_MAGIC = {0xa1b2c3d4: 10 ** 6, 0xa1b23c4d: 10 ** 9}
+_PCAPNG_SHB = 0x0a0d0d0a
+_PCAPNG_BYTE_ORDER = 0x1a2b3c4d
+_PCAPNG_IDB = 1
+_PCAPNG_EPB = 6
+_IF_TSRESOL = 9
+
+# Satu chunk: rentang byte [start, end) berisi record paket satu section file.
+# linktypes / divisors per interface (pcap: satu), timestamp = ticks / divisor.
+Chunk = namedtuple('Chunk', ['index', 'start', 'end', 'pcapng', 'endian',
+                             'linktypes', 'divisors', 'clock'])
+
+
+def _tsresol_divisor(value):
+    # bit tertinggi 0: 10^-v detik, 1: 2^-v detik
+    return 2 ** (value & 0x7f) if value & 0x80 else 10 ** value
+
+
+def _pcapng_interface(buf, offset, length, endian):
+    linktype, = struct.unpack_from(endian + 'H', buf, offset + 8)
+    divisor = 10 ** 6
+    pos, end = offset + 16, offset + length - 4
+    while pos + 4 <= end:
+        code, size = struct.unpack_from(endian + 'HH', buf, pos)
+        if code == 0:
+            break
+        if code == _IF_TSRESOL and size >= 1:
+            divisor = _tsresol_divisor(buf[pos + 4])
+        pos += 4 + (size + 3) // 4 * 4
+    return linktype, divisor
+
+
+def _iter_records(buf, chunk):
+    """Yield (offset, timestamp, frame) paket Ethernet dalam chunk, urut file."""
+    endian = chunk.endian
+    offset, end = chunk.start, chunk.end
+    if not chunk.pcapng:
+        if chunk.linktypes[0] != LINKTYPE_ETHERNET:
+            return
+        header = struct.Struct(endian + 'IIII')
+        divisor = chunk.divisors[0]
+        while offset < end:
+            sec, frac, caplen, _ = header.unpack_from(buf, offset)
+            data = offset + 16
+            yield offset, (sec * divisor + frac) / divisor, buf[data:data + caplen]
+            offset = data + caplen
+        return
+    block = struct.Struct(endian + 'II')
+    packet = struct.Struct(endian + 'IIII')
+    while offset < end:
+        block_type, length = block.unpack_from(buf, offset)
+        if block_type == _PCAPNG_EPB and length >= 32:
+            interface, high, low, caplen = packet.unpack_from(buf, offset + 8)
+            if interface < len(chunk.linktypes) and chunk.linktypes[interface] == LINKTYPE_ETHERNET:
+                data = offset + 28
+                yield (offset, ((high << 32) | low) / chunk.divisors[interface],
+                       buf[data:data + caplen])
+        offset += length
+
+
+def _record_at(buf, chunk, offset):
+    """(timestamp, frame) paket di offset (hasil _iter_records)."""
+    if not chunk.pcapng:
+        sec, frac, caplen, _ = struct.unpack_from(chunk.endian + 'IIII', buf, offset)
+        divisor = chunk.divisors[0]
+        return (sec * divisor + frac) / divisor, buf[offset + 16:offset + 16 + caplen]
+    interface, high, low, caplen = struct.unpack_from(chunk.endian + 'IIII', buf, offset + 8)
+    return ((high << 32) | low) / chunk.divisors[interface], buf[offset + 28:offset + 28 + caplen]
+
+
+def split_capture(path, chunk_packets=200000):
+    """
+    Baca header record pcap / pcapng dan pecah menjadi list Chunk. clock tiap
+    chunk = waktu paket terbesar sebelum chunk (jam awal tabel flow).
+    """
+    chunks = []
+    clock = float('-inf')
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        size = len(buf)
+        if size < 24:
+            raise ValueError('{}: bukan file pcap / pcapng'.format(path))
+        magic_le, = struct.unpack_from('<I', buf, 0)
+        magic_be, = struct.unpack_from('>I', buf, 0)
+
+        def add(start, end, pcapng, endian, linktypes, divisors, start_clock):
+            chunks.append(Chunk(len(chunks), start, end, pcapng, endian,
+                                tuple(linktypes), tuple(divisors), start_clock))
+
+        if magic_le in _PCAP_MAGIC or magic_be in _PCAP_MAGIC:
+            endian = '<' if magic_le in _PCAP_MAGIC else '>'
+            divisor = _PCAP_MAGIC[magic_le if endian == '<' else magic_be]
+            linktype, = struct.unpack_from(endian + 'I', buf, 20)
+            header = struct.Struct(endian + 'IIII')
+            offset = start = 24
+            start_clock = clock
+            count = 0
+            while offset + 16 <= size:
+                sec, frac, caplen, _ = header.unpack_from(buf, offset)
+                if offset + 16 + caplen > size:
+                    # record terakhir terpotong
+                    break
+                if count == chunk_packets:
+                    add(start, offset, False, endian, [linktype], [divisor], start_clock)
+                    start, start_clock, count = offset, clock, 0
+                clock = max(clock, (sec * divisor + frac) / divisor)
+                offset += 16 + caplen
+                count += 1
+            if count:
+                add(start, offset, False, endian, [linktype], [divisor], start_clock)
+            return chunks
+
+        if magic_le != _PCAPNG_SHB:
+            raise ValueError('{}: bukan file pcap / pcapng'.format(path))
+        offset = 0
+        start = start_clock = None
+        count = 0
+        endian = '<'
+        linktypes, divisors = [], []
+        while offset + 12 <= size:
+            if struct.unpack_from('<I', buf, offset)[0] == _PCAPNG_SHB:
+                # section baru: byte order dan daftar interface diulang
+                if start is not None and count:
+                    add(start, offset, True, endian, linktypes, divisors, start_clock)
+                order, = struct.unpack_from('<I', buf, offset + 8)
+                endian = '<' if order == _PCAPNG_BYTE_ORDER else '>'
+                linktypes, divisors = [], []
+                start, count = None, 0
+            block_type, length = struct.unpack_from(endian + 'II', buf, offset)
+            if length < 12 or offset + length > size:
+                break
+            if block_type == _PCAPNG_IDB:
+                linktype, divisor = _pcapng_interface(buf, offset, length, endian)
+                linktypes.append(linktype)
+                divisors.append(divisor)
+            elif block_type == _PCAPNG_EPB and length >= 32:
+                interface, high, low = struct.unpack_from(endian + 'III', buf, offset + 8)
+                if interface >= len(divisors):
+                    # interface tidak dideklarasikan, paket dilewati
+                    offset += length
+                    continue
+                if count == chunk_packets:
+                    add(start, offset, True, endian, linktypes, divisors, start_clock)
+                    start, count = None, 0
+                if start is None:
+                    start, start_clock = offset, clock
+                clock = max(clock, ((high << 32) | low) / divisors[interface])
+                count += 1
+            offset += length
+        if start is not None and count:
+            add(start, offset, True, endian, linktypes, divisors, start_clock)
+    return chunks
+
+
+def _index_path(workdir, chunk, partition):
+    return os.path.join(workdir, 'index-{}-{}'.format(chunk.index, partition))
+
+
+def index_chunk(path, chunk, partitions, workdir):
+    """
+    Tahap 1: untuk setiap paket chunk, tulis offset (uint64) dan jam tabel
+    flow (float64, waktu terbesar sejauh ini) ke file index partisinya.
+    Return (jumlah paket yang di-index, jam di akhir chunk).
+    """
+    offsets = [array('Q') for _ in range(partitions)]
+    clocks = [array('d') for _ in range(partitions)]
+    clock = chunk.clock
+    packets = 0
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        for offset, timestamp, frame in _iter_records(buf, chunk):
+            if timestamp > clock:
+                clock = timestamp
+            key = flow_hash_key(frame)
+            if key is None:
+                continue
+            partition = zlib.crc32(key) % partitions
+            offsets[partition].append(offset)
+            clocks[partition].append(clock)
+            packets += 1
+    for partition in range(partitions):
+        with open(_index_path(workdir, chunk, partition), 'wb') as f:
+            f.write(struct.pack('<Q', len(offsets[partition])))
+            offsets[partition].tofile(f)
+            clocks[partition].tofile(f)
+    return packets, clock
+
+
+def _read_index(filename):
+    with open(filename, 'rb') as f:
+        count, = struct.unpack('<Q', f.read(8))
+        offsets, clocks = array('Q'), array('d')
+        offsets.fromfile(f, count)
+        clocks.fromfile(f, count)
+    return offsets, clocks
+
+
+class _SortedRows(object):
+    """Baris CSV (waktu paket pertama flow, baris) yang di-spill ke file run terurut."""
+
+    def __init__(self, workdir, prefix, run_rows):
+        self.workdir = workdir
+        self.prefix = prefix
+        self.run_rows = run_rows
+        self.header = None
+        self.runs = []
+        self.rows = 0
+        self._pending = []
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+
+    def _line(self, values):
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._writer.writerow(values)
+        return self._buffer.getvalue()
+
+    def add(self, first_timestamp, data):
+        if self.header is None:
+            self.header = self._line(data.keys())
+        self._pending.append((first_timestamp, self._line(data.values())))
+        self.rows += 1
+        if len(self._pending) >= self.run_rows:
+            self.spill()
+
+    def spill(self):
+        if not self._pending:
+            return
+        self._pending.sort()
+        filename = os.path.join(self.workdir, '{}-{}'.format(self.prefix, len(self.runs)))
+        with open(filename, 'w', newline='') as f:
+            for first_timestamp, line in self._pending:
+                f.write(repr(first_timestamp))
+                f.write('\t')
+                f.write(line)
+        self.runs.append(filename)
+        self._pending = []
+
+
+class _BatchFlowMeter(FlowMeter):
+    # emit menerima (waktu paket pertama flow, data) untuk pengurutan output
+    def _emit(self, expired):
+        for flow, _ in expired:
+            self.emit(flow.first_timestamp, flow.get_data())
+
+
+def meter_partition(path, chunks, partition, workdir, meter_options, end_clock=None,
+                    run_rows=200000):
+    """
+    Tahap 2: rakit flow satu partisi dari semua chunk berurutan. end_clock =
+    jam di akhir capture (paket terakhir partisi lain bisa lebih baru). Return
+    (file run terurut, baris header CSV atau None, jumlah flow per alasan).
+    """
+    rows = _SortedRows(workdir, 'run-{}'.format(partition), run_rows)
+    meter = _BatchFlowMeter(rows.add, **meter_options)
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        for chunk in chunks:
+            offsets, clocks = _read_index(_index_path(workdir, chunk, partition))
+            for offset, clock in zip(offsets, clocks):
+                timestamp, frame = _record_at(buf, chunk, offset)
+                record = decode_frame(frame, timestamp)
+                if record is None:
+                    continue
+                # jam global pada paket ini: flow partisi lain yang lebih baru
+                # ikut memajukan wheel saat diproses dalam satu proses
+                meter.advance(clock)
+                meter.add_record(record)
+    if end_clock is not None:
+        meter.advance(end_clock)
+    meter.flush()
+    rows.spill()
+    return rows.runs, rows.header, dict(meter.expired)
+
+
+def _read_run(filename):
+    with open(filename, newline='') as f:
+        for entry in f:
+            first_timestamp, line = entry.split('\t', 1)
+            yield float(first_timestamp), line
+
+
+def merge_runs(runs, header, output):
+    """Tahap 3: merge k-way file run terurut ke CSV output. Return jumlah baris."""
+    count = 0
+    with open(output, 'w', newline='') as f:
+        if header is not None:
+            f.write(header)
+        for _, line in heapq.merge(*[_read_run(filename) for filename in runs]):
+            f.write(line)
+            count += 1
+    return count
+
+
+def _index_task(args):
+    return index_chunk(*args)
+
+
+def _meter_task(args):
+    return meter_partition(*args)
+
+
+def batch_pcap(path, output, workers=None, chunk_packets=200000, run_rows=200000,
+               workdir=None, **meter_options):
+    """
+    Ubah file pcap / pcapng menjadi CSV flow. workers=0: semua tahap di proses
+    ini; selain itu pool N proses dengan N partisi flow. meter_options
+    diteruskan ke FlowMeter (idle_timeout, active_timeout, expire_on_fin, icmp).
+    Return dict ringkasan (paket, flow, chunk, jumlah flow per alasan, waktu).
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    partitions = max(1, workers)
+    started = time.time()
+    chunks = split_capture(path, chunk_packets)
+    tmp = tempfile.mkdtemp(prefix='pcap-batch-', dir=workdir)
+    try:
+        index_tasks = [(path, chunk, partitions, tmp) for chunk in chunks]
+        pool = multiprocessing.Pool(workers) if workers else None
+        try:
+            if pool is None:
+                indexed = list(map(_index_task, index_tasks))
+            else:
+                indexed = pool.map(_index_task, index_tasks, chunksize=1)
+            packets = sum(count for count, _ in indexed)
+            end_clock = max((clock for count, clock in indexed if count), default=None)
+            meter_tasks = [(path, chunks, partition, tmp, meter_options, end_clock, run_rows)
+                           for partition in range(partitions)]
+            if pool is None:
+                results = list(map(_meter_task, meter_tasks))
+            else:
+                results = pool.map(_meter_task, meter_tasks, chunksize=1)
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        runs = [filename for result in results for filename in result[0]]
+        header = next((result[1] for result in results if result[1] is not None), None)
+        flows = merge_runs(runs, header, output)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    expired = dict.fromkeys(EXPIRE_REASONS, 0)
+    for result in results:
+        for reason, count in result[2].items():
+            expired[reason] += count
+    return {
+        'packets': packets,
+        'flows': flows,
+        'chunks': len(chunks),
+        'expired': expired,
+        'seconds': time.time() - started,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Featurize ulang pcap / pcapng ke CSV flow')
+    parser.add_argument('capture', help='file pcap / pcapng')
+    parser.add_argument('output', help='file CSV output')
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1,
+                        help='jumlah proses (0 = satu proses)')
+    parser.add_argument('--chunk-packets', type=int, default=200000,
+                        help='paket per chunk tahap index')
+    parser.add_argument('--idle-timeout', type=float, default=FLOW_IDLE_TIMEOUT,
+                        help='detik tanpa paket sebelum flow selesai')
+    parser.add_argument('--active-timeout', type=float, default=FLOW_ACTIVE_TIMEOUT,
+                        help='umur maksimum flow (detik)')
+    parser.add_argument('--expire-on-fin', action='store_true',
+                        help='selesaikan flow TCP saat paket FIN')
+    parser.add_argument('--icmp', action='store_true',
+                        help='buat juga flow ICMP (default hanya TCP / UDP seperti sniffer scapy)')
+    parser.add_argument('--tmpdir', default=None, help='direktori file index / run sementara')
+    args = parser.parse_args()
+
+    summary = batch_pcap(args.capture, args.output, args.workers, args.chunk_packets,
+                         workdir=args.tmpdir, idle_timeout=args.idle_timeout,
+                         active_timeout=args.active_timeout,
+                         expire_on_fin=args.expire_on_fin, icmp=args.icmp)
+    print('{packets} paket, {flows} flow, {chunks} chunk dalam {seconds:.1f} s'.format(**summary))
+    print('flow selesai: ' + ', '.join('{}={}'.format(k, v) for k, v in summary['expired'].items()))
+
+
+if __name__ == '__main__':
+    main()
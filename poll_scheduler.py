@@ -0,0 +1,114 @@
+# poll_scheduler.py
+# Interval polling flow stats yang adaptif per datapath untuk SimpleMonitor13.
+import time
+from collections import deque
+
+
+class AdaptivePollScheduler(object):
+    """
+    Menyimpan interval polling dan waktu poll berikutnya untuk tiap datapath.
+
+    Setelah setiap prediksi, update() dipanggil dengan rasio ddos dan jumlah
+    flow datapath tersebut:
+      - rasio ddos >= ddos_threshold atau pertumbuhan jumlah flow >= growth_threshold
+        -> interval dikali speedup (lebih cepat), minimal min_interval
+      - selain itu (traffic legitimate) -> interval dikali backoff, maksimal max_interval
+
+    Interval sekarang dan alasan tiap perubahan bisa dilihat lewat status()
+    dan history (deque berisi perubahan terakhir).
+    """
+
+    def __init__(self, min_interval=2.0, max_interval=30.0, initial_interval=10.0,
+                 speedup=0.5, backoff=1.5, ddos_threshold=0.2, growth_threshold=0.5,
+                 history_size=100):
+        if not 0 < min_interval <= max_interval:
+            raise ValueError("butuh 0 < min_interval <= max_interval")
+        self.min_interval = float(min_interval)
+        self.max_interval = float(max_interval)
+        self.initial_interval = min(max(float(initial_interval), self.min_interval), self.max_interval)
+        self.speedup = speedup
+        self.backoff = backoff
+        self.ddos_threshold = ddos_threshold
+        self.growth_threshold = growth_threshold
+
+        self._interval = {}     # datapath_id -> interval (detik)
+        self._next_due = {}     # datapath_id -> timestamp poll berikutnya
+        self._flow_count = {}   # datapath_id -> jumlah flow pada poll terakhir
+        self._reason = {}       # datapath_id -> alasan perubahan terakhir
+        self.history = deque(maxlen=history_size)
+
+    def register(self, datapath_id, now=None):
+        """Datapath baru langsung jatuh tempo untuk dipoll."""
+        now = time.time() if now is None else now
+        self._interval.setdefault(datapath_id, self.initial_interval)
+        self._next_due[datapath_id] = now
+        self._reason.setdefault(datapath_id, 'initial')
+
+    def unregister(self, datapath_id):
+        for d in (self._interval, self._next_due, self._flow_count, self._reason):
+            d.pop(datapath_id, None)
+
+    def interval(self, datapath_id):
+        return self._interval.get(datapath_id, self.initial_interval)
+
+    def due(self, now=None):
+        """Datapath yang sudah jatuh tempo untuk dipoll."""
+        now = time.time() if now is None else now
+        return [d for d, t in self._next_due.items() if t <= now]
+
+    def mark_polled(self, datapath_id, now=None):
+        now = time.time() if now is None else now
+        self._next_due[datapath_id] = now + self.interval(datapath_id)
+
+    def next_wakeup(self, now=None):
+        """Detik sampai datapath berikutnya jatuh tempo (min_interval jika belum ada datapath)."""
+        now = time.time() if now is None else now
+        if not self._next_due:
+            return self.min_interval
+        return max(0.0, min(self._next_due.values()) - now)
+
+    def update(self, datapath_id, ddos_ratio, flow_count, now=None):
+        """
+        Sesuaikan interval datapath dari hasil prediksi terakhir.
+        Return tuple (interval_lama, interval_baru, alasan) jika interval berubah, else None.
+        """
+        if datapath_id not in self._interval:
+            return None
+        now = time.time() if now is None else now
+        old = self._interval[datapath_id]
+        prev_count = self._flow_count.get(datapath_id)
+        self._flow_count[datapath_id] = flow_count
+        growth = 0.0 if prev_count is None else (flow_count - prev_count) / float(max(prev_count, 1))
+
+        if ddos_ratio >= self.ddos_threshold:
+            new = max(self.min_interval, old * self.speedup)
+            reason = 'ddos ratio {:.2f}'.format(ddos_ratio)
+        elif growth >= self.growth_threshold:
+            new = max(self.min_interval, old * self.speedup)
+            reason = 'flow count growth {:+.0%} ({} -> {})'.format(growth, prev_count, flow_count)
+        else:
+            new = min(self.max_interval, old * self.backoff)
+            reason = 'legitimate (ddos ratio {:.2f})'.format(ddos_ratio)
+
+        if new == old:
+            return None
+        self._interval[datapath_id] = new
+        self._reason[datapath_id] = reason
+        # jadwal poll berikutnya ikut dimajukan / dimundurkan
+        if datapath_id in self._next_due:
+            self._next_due[datapath_id] += new - old
+        self.history.append((now, datapath_id, old, new, reason))
+        return old, new, reason
+
+    def status(self, now=None):
+        """Ringkasan per datapath: interval, sisa waktu ke poll berikutnya, jumlah flow, alasan."""
+        now = time.time() if now is None else now
+        return dict(
+            (d, {
+                'interval': self._interval[d],
+                'next_poll_in': max(0.0, self._next_due.get(d, now) - now),
+                'flow_count': self._flow_count.get(d),
+                'reason': self._reason.get(d),
+            })
+            for d in self._interval
+        )
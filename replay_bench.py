@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+replay_bench.py
+
+Benchmark SimpleMonitor13 tanpa Mininet / OVS: rekaman reply flow stats
+(stats_record.py) di-replay ke handler controller dengan datapath palsu, lalu
+dilaporkan throughput (flow/detik), persentil latensi per siklus polling dan
+memori.
+
+Rekaman didapat dari:
+  - controller: set STATS_RECORD_PATH di controller.py lalu jalankan seperti biasa
+  - sintetis  : python3 replay_bench.py synth stats.ofsr --flows 100000 --cycles 10
+
+Usage:
+  python3 replay_bench.py replay stats.ofsr --speed 4      (4x lebih cepat dari rekaman)
+  python3 replay_bench.py replay stats.ofsr --speed 0      (secepat mungkin)
+  python3 replay_bench.py sweep --sizes 1000,10000,100000,1000000
+
+Satu siklus = request stats ke semua datapath, parse + reply handler untuk
+setiap bagian multipart, flow_predict, sampai _report_prediction selesai
+(termasuk antrian worker inferensi dan mitigasi). Timestamp reply diambil
+dari jam saat replay (seperti controller asli), sehingga rate per interval
+ikut terskala dengan --speed.
+"""
+import argparse
+import collections
+import json
+import os
+import resource
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# batas waktu menunggu hasil inferensi satu siklus (detik)
+RESULT_TIMEOUT = 120.0
+
+
+def _rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024.0 * 1024.0)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def _peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def _percentiles(values):
+    if not values:
+        return dict((k, None) for k in ('p50', 'p90', 'p99', 'max'))
+    arr = np.asarray(values) * 1000.0
+    return {'p50': float(np.percentile(arr, 50)), 'p90': float(np.percentile(arr, 90)),
+            'p99': float(np.percentile(arr, 99)), 'max': float(arr.max())}
+
+
+def synth(path, flows, datapaths, cycles, interval, flood_fraction, flood_start, seed):
+    """Tulis rekaman sintetis: `flows` flow dibagi rata ke `datapaths` switch."""
+    from stats_record import StatsRecorder
+    from synthetic_flows import SyntheticFlowTable
+
+    per_dp = [flows // datapaths + (1 if i < flows % datapaths else 0) for i in range(datapaths)]
+    tables = [SyntheticFlowTable(n, flood_fraction, seed=seed + i) for i, n in enumerate(per_dp)]
+    recorder = StatsRecorder(path)
+    timestamp = time.time()
+    for cycle in range(1, cycles + 1):
+        for dpid, table in enumerate(tables, 1):
+            table.flooding = flood_fraction > 0 and cycle > flood_start
+            table.advance(interval)
+            for buf in table.replies(cycle):
+                recorder.write(timestamp, cycle, dpid, buf)
+        timestamp += interval
+    recorder.close()
+    return recorder.records
+
+
+class FakeDatapath(object):
+    """Datapath tanpa socket: pesan dari controller hanya dihitung per tipe."""
+
+    def __init__(self, dpid):
+        from ryu.ofproto import ofproto_v1_3, ofproto_v1_3_parser
+        self.id = dpid
+        self.ofproto = ofproto_v1_3
+        self.ofproto_parser = ofproto_v1_3_parser
+        self.xid = 0
+        self.sent = collections.Counter()
+        self.last_request = None
+        self.barriers = []
+
+    def set_xid(self, msg):
+        self.xid = (self.xid + 1) & self.ofproto.MAX_XID
+        msg.set_xid(self.xid)
+        return self.xid
+
+    def send_msg(self, msg):
+        parser = self.ofproto_parser
+        self.sent[type(msg).__name__] += 1
+        if isinstance(msg, parser.OFPFlowStatsRequest):
+            self.last_request = msg
+        elif isinstance(msg, parser.OFPBarrierRequest):
+            self.barriers.append(msg.xid)
+
+
+def _prepare_models(bundle_path, workdir):
+    """
+    MODEL_DIR sementara dengan satu versi berisi bundle. Tanpa bundle, bobot
+    flow_model.h5 dipakai dengan scaler identitas (hanya untuk ukur performa).
+    """
+    import model_artifacts
+    import model_bundle
+    from flow_store import FEATURE_COLUMNS
+
+    root = os.path.join(workdir, 'models')
+    version_dir = os.path.join(root, 'replay')
+    os.makedirs(version_dir)
+    target = os.path.join(version_dir, model_artifacts.BUNDLE_FILE)
+    if bundle_path:
+        shutil.copy(bundle_path, target)
+    else:
+        n = len(FEATURE_COLUMNS)
+        scaler = model_bundle.BundleScaler(FEATURE_COLUMNS, np.ones(n), np.zeros(n))
+        labels = model_bundle.BundleLabels(np.array(['0', '1']))
+        model_bundle.save(target, os.path.join(HERE, 'flow_model.h5'), scaler, labels,
+                          meta={'note': 'replay_bench: scaler identitas'})
+    with open(os.path.join(root, model_artifacts.CURRENT_FILE), 'w') as f:
+        f.write('replay\n')
+    return root
+
+
+def replay(path, speed=1.0, bundle_path=None, metrics_port=None, max_cycles=None, verbose=False):
+    """Replay rekaman ke SimpleMonitor13. Return dict ringkasan hasil."""
+    from ryu.lib import hub
+    from ryu.controller import ofp_event
+    from ryu.ofproto import ofproto_parser
+
+    import controller
+    from stats_record import read_cycles
+
+    workdir = tempfile.mkdtemp(prefix='replay-')
+    try:
+        controller.MODEL_DIR = _prepare_models(bundle_path, workdir)
+        controller.PREDICT_CSV_DEBUG = False
+        controller.STATS_RECORD_PATH = None
+        controller.METRICS_ENABLED = metrics_port is not None
+        if metrics_port is not None:
+            controller.METRICS_PORT = metrics_port
+
+        app = controller.SimpleMonitor13()
+        # siklus polling dijalankan oleh harness, bukan _monitor
+        hub.kill(app.monitor_thread)
+        if not verbose:
+            app.logger.setLevel('WARNING')
+        deadline = time.time() + 30
+        while app.flow_model is None and time.time() < deadline:
+            hub.sleep(0.01)
+        if app.flow_model is None:
+            raise RuntimeError("model replay tidak ter-load")
+
+        reported = {}
+        report_prediction = app._report_prediction
+
+        def _report(job, preds):
+            report_prediction(job, preds)
+            reported[job.epoch] = time.perf_counter()
+        app._report_prediction = _report
+
+        datapaths = {}
+        cycles = []
+        rss_start = _rss_mb()
+        wall_start = time.perf_counter()
+        previous = None
+        for timestamp, parts in read_cycles(path):
+            if max_cycles is not None and len(cycles) >= max_cycles:
+                break
+            if speed > 0 and previous is not None:
+                wait = (timestamp - previous[0]) / speed - (time.perf_counter() - previous[1])
+                if wait > 0:
+                    hub.sleep(wait)
+            previous = (timestamp, time.perf_counter())
+
+            dpids = list(collections.OrderedDict.fromkeys(d for d, _ in parts))
+            for dpid in dpids:
+                if dpid not in datapaths:
+                    datapaths[dpid] = app.datapaths[dpid] = FakeDatapath(dpid)
+                    app.poll_scheduler.register(dpid)
+
+            start = time.perf_counter()
+            epoch = app.flow_store.begin_epoch(dpids)
+            app.epoch_complete.clear()
+            for dpid in dpids:
+                app._request_stats(datapaths[dpid], epoch)
+
+            parse_seconds = handler_seconds = 0.0
+            n_flows = 0
+            for dpid, buf in parts:
+                dp = datapaths[dpid]
+                # xid reply disamakan dengan request siklus ini
+                buf = bytearray(buf)
+                struct.pack_into('!I', buf, 4, dp.last_request.xid)
+                t0 = time.perf_counter()
+                version, msg_type, msg_len, xid = ofproto_parser.header(buf)
+                msg = ofproto_parser.msg(dp, version, msg_type, msg_len, xid, bytes(buf))
+                t1 = time.perf_counter()
+                app._flow_stats_reply_handler(ofp_event.EventOFPFlowStatsReply(msg))
+                t2 = time.perf_counter()
+                parse_seconds += t1 - t0
+                handler_seconds += t2 - t1
+                n_flows += len(msg.body)
+
+            predict_start = time.perf_counter()
+            app.flow_predict(epoch)
+            predict_end = time.perf_counter()
+            while epoch not in reported and n_flows and time.perf_counter() - start < RESULT_TIMEOUT:
+                hub.sleep(0.001)
+            done = reported.get(epoch, time.perf_counter())
+            if app.mitigation is not None:
+                for dp in datapaths.values():
+                    for xid in dp.barriers:
+                        app.mitigation.barrier_reply(dp.id, xid)
+                    del dp.barriers[:]
+            cycles.append({
+                'flows': n_flows,
+                'parse': parse_seconds,
+                'handler': handler_seconds,
+                'flow_predict': predict_end - predict_start,
+                'total': done - start,
+                'reported': epoch in reported,
+            })
+        wall = time.perf_counter() - wall_start
+        app.inference_worker.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    flows = sum(c['flows'] for c in cycles)
+    reply_seconds = sum(c['parse'] + c['handler'] for c in cycles)
+    cycle_seconds = sum(c['total'] for c in cycles)
+    sent = collections.Counter()
+    for dp in datapaths.values():
+        sent.update(dp.sent)
+    return {
+        'cycles': len(cycles),
+        'datapaths': len(datapaths),
+        'flows': flows,
+        'flows_per_cycle': flows / float(len(cycles)) if cycles else 0.0,
+        'reply_flows_per_second': flows / reply_seconds if reply_seconds else None,
+        'cycle_flows_per_second': flows / cycle_seconds if cycle_seconds else None,
+        'parse_seconds': sum(c['parse'] for c in cycles),
+        'handler_seconds': sum(c['handler'] for c in cycles),
+        'flow_predict_seconds': sum(c['flow_predict'] for c in cycles),
+        'cycle_latency_ms': _percentiles([c['total'] for c in cycles]),
+        'reply_latency_ms': _percentiles([c['parse'] + c['handler'] for c in cycles]),
+        'unreported_cycles': sum(1 for c in cycles if c['flows'] and not c['reported']),
+        'wall_seconds': wall,
+        'rss_start_mb': rss_start,
+        'rss_end_mb': _rss_mb(),
+        'max_rss_mb': _peak_rss_mb(),
+        'messages_sent': dict(sent),
+    }
+
+
+def print_summary(result):
+    fmt = lambda v, spec: '-' if v is None else format(v, spec)
+    print("siklus            : {} ({} datapath, {:.0f} flow/siklus)".format(
+        result['cycles'], result['datapaths'], result['flows_per_cycle']))
+    print("throughput        : {} flow/s reply handler (parse + handler), {} flow/s end-to-end".format(
+        fmt(result['reply_flows_per_second'], ',.0f'), fmt(result['cycle_flows_per_second'], ',.0f')))
+    for key, label in (('reply_latency_ms', 'latensi reply'), ('cycle_latency_ms', 'latensi siklus')):
+        p = result[key]
+        print("{:<18}: p50 {} ms, p90 {} ms, p99 {} ms, max {} ms".format(
+            label, fmt(p['p50'], '.1f'), fmt(p['p90'], '.1f'), fmt(p['p99'], '.1f'), fmt(p['max'], '.1f')))
+    print("waktu total       : parse {:.2f}s, handler {:.2f}s, flow_predict {:.2f}s, wall {:.2f}s".format(
+        result['parse_seconds'], result['handler_seconds'], result['flow_predict_seconds'],
+        result['wall_seconds']))
+    print("memori (RSS)      : awal {} MB, akhir {} MB, puncak {} MB".format(
+        fmt(result['rss_start_mb'], '.1f'), fmt(result['rss_end_mb'], '.1f'), fmt(result['max_rss_mb'], '.1f')))
+    if result['messages_sent']:
+        print("pesan ke switch   : {}".format(', '.join(
+            '{} {}'.format(n, name) for name, n in sorted(result['messages_sent'].items()))))
+    if result['unreported_cycles']:
+        print("PERINGATAN        : {} siklus tanpa hasil prediksi".format(result['unreported_cycles']))
+
+
+def sweep(sizes, datapaths, cycles, interval, flood_fraction, bundle_path):
+    """Satu proses replay per jumlah flow (RSS terukur dari nol), hasil dalam satu tabel."""
+    workdir = tempfile.mkdtemp(prefix='replay-sweep-')
+    try:
+        print("{:>9} {:>7} {:>16} {:>16} {:>10} {:>10} {:>12}".format(
+            "flows", "siklus", "reply flow/s", "e2e flow/s", "p50(ms)", "p99(ms)", "max RSS(MB)"))
+        for size in sizes:
+            path = os.path.join(workdir, 'stats-{}.ofsr'.format(size))
+            synth(path, size, datapaths, cycles, interval, flood_fraction, cycles // 2, 0)
+            cmd = [sys.executable, os.path.abspath(__file__), 'replay', path, '--speed', '0', '--json']
+            if bundle_path:
+                cmd += ['--bundle', bundle_path]
+            out = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+            os.remove(path)
+            if out.returncode != 0:
+                lines = out.stderr.strip().splitlines()
+                print("{:>9} gagal: {}".format(size, lines[-1] if lines else 'exit %d' % out.returncode))
+                continue
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            print("{:>9} {:>7} {:>16,.0f} {:>16,.0f} {:>10.1f} {:>10.1f} {:>12.1f}".format(
+                size, r['cycles'], r['reply_flows_per_second'] or 0, r['cycle_flows_per_second'] or 0,
+                r['cycle_latency_ms']['p50'] or 0, r['cycle_latency_ms']['p99'] or 0, r['max_rss_mb']))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Replay flow stats ke SimpleMonitor13 dan ukur performanya")
+    sub = p.add_subparsers(dest='command')
+    sub.required = True
+
+    def synth_options(q):
+        q.add_argument("--datapaths", type=int, default=1, help="jumlah switch (flow dibagi rata)")
+        q.add_argument("--cycles", type=int, default=10, help="jumlah siklus polling")
+        q.add_argument("--interval", type=float, default=10.0, help="jarak antar siklus di rekaman (detik)")
+        q.add_argument("--flood-fraction", type=float, default=0.2, help="fraksi flow flood")
+
+    q = sub.add_parser('synth', help="buat rekaman sintetis")
+    q.add_argument("output")
+    q.add_argument("--flows", type=int, default=10000)
+    synth_options(q)
+    q.add_argument("--flood-start", type=int, default=None,
+                   help="flood mulai setelah siklus ke-N (default: separuh siklus)")
+    q.add_argument("--seed", type=int, default=0)
+
+    q = sub.add_parser('replay', help="replay rekaman ke SimpleMonitor13")
+    q.add_argument("recording")
+    q.add_argument("--speed", type=float, default=1.0, help="kelipatan kecepatan rekaman (0 = secepatnya)")
+    q.add_argument("--bundle", default=None, help="flow_model.bundle.npz (default: flow_model.h5 + scaler identitas)")
+    q.add_argument("--cycles", type=int, default=None, help="maksimum siklus yang di-replay")
+    q.add_argument("--metrics-port", type=int, default=None, help="aktifkan endpoint /metrics selama replay")
+    q.add_argument("--json", action="store_true", help="cetak hasil sebagai satu baris JSON")
+    q.add_argument("--verbose", action="store_true", help="tampilkan log controller")
+
+    q = sub.add_parser('sweep', help="synth + replay untuk beberapa jumlah flow")
+    q.add_argument("--sizes", default="1000,10000,100000,1000000")
+    synth_options(q)
+    q.set_defaults(cycles=5)
+    q.add_argument("--bundle", default=None)
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    sys.path.insert(0, HERE)
+    if args.command == 'synth':
+        flood_start = args.cycles // 2 if args.flood_start is None else args.flood_start
+        records = synth(args.output, args.flows, args.datapaths, args.cycles, args.interval,
+                        args.flood_fraction, flood_start, args.seed)
+        print("{} pesan reply ditulis ke {} ({:.1f} MB)".format(
+            records, args.output, os.path.getsize(args.output) / (1024.0 * 1024.0)))
+    elif args.command == 'replay':
+        result = replay(args.recording, args.speed, args.bundle, args.metrics_port, args.cycles, args.verbose)
+        if args.json:
+            print(json.dumps(result))
+        else:
+            print_summary(result)
+    else:
+        sizes = [int(s) for s in args.sizes.split(',') if s]
+        sweep(sizes, args.datapaths, args.cycles, args.interval, args.flood_fraction, args.bundle)
+
+
+if __name__ == "__main__":
+    main()
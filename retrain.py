@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+retrain.py
+
+Training LSTM di proses terpisah dari controller. Hasilnya dipublikasikan
+sebagai versi baru di direktori artefak (lihat model_artifacts.py); controller
+yang sedang berjalan mendeteksi perubahan CURRENT dan mengganti model di antara
+siklus polling, sementara prediksi tetap memakai model lama selama training.
+
+Usage:
+  python3 retrain.py
+  python3 retrain.py --csv FlowStatsfile.csv --models models --epochs 30
+  python3 retrain.py --timesteps 5 --max-idle 90
+  python3 retrain.py --no-cache
+"""
+import argparse
+import os
+import sys
+
+import model_artifacts
+
+
+def train(csv_path, root=model_artifacts.DEFAULT_ROOT, epochs=30, batch_size=64, verbose=2,
+          cache_dir=None, timesteps=1, max_idle=None):
+    """Training streaming dari csv_path lalu publish. Return nama versi, atau None jika dibatalkan."""
+    from training_pipeline import StreamingDataset, build_lstm_model
+    from sequence_buffer import DEFAULT_MAX_IDLE
+
+    max_idle = DEFAULT_MAX_IDLE if max_idle is None else max_idle
+    dataset = StreamingDataset(csv_path, batch_size=batch_size, cache_dir=cache_dir,
+                               timesteps=timesteps, max_idle=max_idle)
+    try:
+        dataset.fit()
+    except ValueError as e:
+        print("{}. Training dibatalkan.".format(e))
+        return None
+    print("Dataset: {} baris train, {} baris validasi, {} fitur".format(
+        dataset.n_train, dataset.n_val, dataset.n_features))
+
+    model = build_lstm_model(timesteps, dataset.n_features, len(dataset.le.classes_))
+    validation = dataset.dataset('val', shuffle=False) if dataset.n_val else None
+    model.fit(dataset.dataset('train', shuffle=True), epochs=epochs,
+              validation_data=validation, verbose=verbose)
+
+    meta = {
+        'csv': os.path.abspath(csv_path),
+        'n_train': dataset.n_train,
+        'n_val': dataset.n_val,
+        'epochs': epochs,
+    }
+    if validation is not None:
+        loss_val, acc_val = model.evaluate(validation, verbose=0)
+        meta['val_loss'] = float(loss_val)
+        meta['val_accuracy'] = float(acc_val)
+        print("Akurasi Test (LSTM): {:.2f}%".format(acc_val * 100))
+
+    return model_artifacts.publish(model, dataset.scaler, dataset.le, meta, root=root,
+                                   features=dataset.features, timesteps=timesteps,
+                                   sequence_max_idle=max_idle)
+
+
+def parse_args():
+    p = argparse.ArgumentParser(description="Training LSTM di background dan publish versi model baru")
+    p.add_argument("--csv", default="FlowStatsfile.csv")
+    p.add_argument("--models", default=model_artifacts.DEFAULT_ROOT, help="direktori artefak model")
+    p.add_argument("--epochs", type=int, default=30)
+    p.add_argument("--batch-size", type=int, default=64)
+    p.add_argument("--timesteps", type=int, default=1,
+                   help="panjang sekuens poll per flow (1 = tanpa sekuens)")
+    p.add_argument("--max-idle", type=float, default=None,
+                   help="jeda (detik) yang memutus sekuens sebuah flow")
+    p.add_argument("--cache-dir", default=".dataset_cache",
+                   help="cache hasil preprocessing CSV (lihat dataset_cache.py)")
+    p.add_argument("--no-cache", action="store_true", help="selalu parse ulang CSV")
+    p.add_argument("--nice", type=int, default=10,
+                   help="turunkan prioritas CPU proses training agar controller tidak tersendat")
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.nice and hasattr(os, 'nice'):
+        os.nice(args.nice)
+    cache_dir = None if args.no_cache else args.cache_dir
+    version = train(args.csv, args.models, args.epochs, args.batch_size, cache_dir=cache_dir,
+                    timesteps=args.timesteps, max_idle=args.max_idle)
+    if version is None:
+        sys.exit(1)
+    print("Model versi {} dipublikasikan di {}".format(version, args.models))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+# sequence_buffer.py
+# Sekuens multi-timestep per flow untuk input LSTM (n, timesteps, features).
+#
+# Controller: FlowSequenceBuffer menyimpan T observasi poll terakhir tiap flow
+# dalam ring buffer berkapasitas tetap; push() menulis observasi satu epoch
+# dan mengembalikan window (flows, T, features) dengan fancy indexing numpy.
+# Training: SequenceWindower membangun window yang sama dari FlowStatsfile.csv
+# (urut timestamp) per chunk secara vektor, dengan konteks dibawa antar chunk.
+#
+# Keduanya memakai aturan yang sama: window berisi observasi terlama -> terbaru,
+# posisi awal yang belum terisi di-padding 0 (setelah scaling), dan flow yang
+# tidak terlihat lebih lama dari max_idle detik dimulai ulang dari kosong.
+import numpy as np
+
+DEFAULT_CAPACITY = 100000
+DEFAULT_MAX_IDLE = 90.0
+
+
+def padding_mask(lengths, timesteps):
+    """True untuk posisi padding (sebelum observasi pertama) di tiap window."""
+    return np.arange(timesteps)[None, :] < (timesteps - np.asarray(lengths))[:, None]
+
+
+def scale_windows(windows, lengths, scaler):
+    """
+    MinMaxScaler per fitur pada window (n, T, F) lalu posisi padding di-set 0.
+    Sama dengan scaler.transform baris per baris, tanpa reshape ke 2D.
+    """
+    scaled = (windows * scaler.scale_ + scaler.min_).astype(np.float32)
+    scaled[padding_mask(lengths, windows.shape[1])] = 0
+    return scaled
+
+
+class FlowSequenceBuffer(object):
+    """
+    Ring buffer T observasi terakhir per flow (key: flow_key snapshot).
+
+    Memori tetap capacity * T * features float32. Flow yang tidak muncul lebih
+    dari max_idle detik dibuang oleh expire(); jika kapasitas penuh, flow yang
+    paling lama tidak terlihat digusur. Flow yang tetap tidak mendapat slot
+    (lebih banyak flow baru dalam satu epoch dari kapasitas) diprediksi dengan
+    window berisi observasi saat ini saja dan dihitung di self.overflow.
+    """
+
+    def __init__(self, timesteps, n_features, capacity=DEFAULT_CAPACITY, max_idle=DEFAULT_MAX_IDLE):
+        self.timesteps = timesteps
+        self.n_features = n_features
+        self.capacity = capacity
+        self.max_idle = max_idle
+        self._data = np.zeros((capacity, timesteps, n_features), dtype=np.float32)
+        self._head = np.zeros(capacity, dtype=np.int64)       # posisi tulis berikutnya (= observasi terlama)
+        self._length = np.zeros(capacity, dtype=np.int64)     # jumlah observasi tersimpan (<= T)
+        self._last_seen = np.full(capacity, -np.inf)
+        self._slots = {}                                      # flow key -> slot
+        self._keys = [None] * capacity
+        self._free = list(range(capacity - 1, -1, -1))
+        self.evicted_idle = 0
+        self.evicted_capacity = 0
+        self.overflow = 0
+
+    def __len__(self):
+        return len(self._slots)
+
+    def _release(self, slots):
+        for slot in slots.tolist():
+            del self._slots[self._keys[slot]]
+            self._keys[slot] = None
+            self._free.append(slot)
+        self._data[slots] = 0
+        self._head[slots] = 0
+        self._length[slots] = 0
+        self._last_seen[slots] = -np.inf
+
+    def expire(self, now):
+        """Buang flow yang tidak terlihat lebih dari max_idle detik. Return jumlahnya."""
+        stale = np.flatnonzero((self._length > 0) & (self._last_seen < now - self.max_idle))
+        if len(stale):
+            self._release(stale)
+            self.evicted_idle += len(stale)
+        return len(stale)
+
+    def _evict_lru(self, count, now):
+        # hanya flow yang belum disentuh di push() ini yang boleh digusur
+        candidates = np.flatnonzero((self._length > 0) & (self._last_seen < now))
+        if len(candidates) > count:
+            candidates = candidates[np.argpartition(self._last_seen[candidates], count)[:count]]
+        if len(candidates):
+            self._release(candidates)
+            self.evicted_capacity += len(candidates)
+
+    def _slots_for(self, keys, now):
+        get = self._slots.get
+        slots = np.array([get(key, -1) for key in keys], dtype=np.int64)
+        known = slots >= 0
+        self._last_seen[slots[known]] = now
+        missing = np.flatnonzero(~known)
+        if len(missing) > len(self._free):
+            self._evict_lru(len(missing) - len(self._free), now)
+        for i in missing.tolist():
+            if not self._free:
+                break
+            slot = self._free.pop()
+            self._slots[keys[i]] = slot
+            self._keys[slot] = keys[i]
+            slots[i] = slot
+        self._last_seen[slots[slots >= 0]] = now
+        return slots
+
+    def push(self, keys, X, now):
+        """
+        Tambahkan satu observasi per flow (keys unik, X (n, features)) dan kembalikan
+        (windows (n, T, features) fitur mentah, lengths (n,)) termasuk observasi ini.
+        """
+        T = self.timesteps
+        X = np.asarray(X, dtype=np.float32)
+        n = len(X)
+        windows = np.zeros((n, T, self.n_features), dtype=np.float32)
+        lengths = np.ones(n, dtype=np.int64)
+        if n == 0:
+            return windows, lengths
+
+        slots = self._slots_for(keys, now)
+        ok = slots >= 0
+        s = slots[ok]
+        head = self._head[s]
+        self._data[s, head] = X[ok]
+        self._head[s] = (head + 1) % T
+        self._length[s] = np.minimum(self._length[s] + 1, T)
+
+        # urutan ring (head .. head + T - 1) = observasi terlama -> terbaru
+        order = (self._head[s][:, None] + np.arange(T)[None, :]) % T
+        windows[ok] = self._data[s[:, None], order]
+        lengths[ok] = self._length[s]
+
+        if not ok.all():
+            windows[~ok, -1] = X[~ok]
+            self.overflow += int(np.count_nonzero(~ok))
+        return windows, lengths
+
+
+def build_windows(groups, timestamps, X, timesteps, max_idle=DEFAULT_MAX_IDLE):
+    """
+    Window (n, T, F) untuk setiap baris, dalam urutan baris input: baris itu sendiri
+    dan T - 1 observasi sebelumnya dari flow (groups) yang sama, urut timestamp.
+    Jeda lebih dari max_idle detik memulai sekuens baru. Return (windows, lengths).
+    """
+    n = len(X)
+    order = np.lexsort((timestamps, groups))
+    g = groups[order]
+    t = timestamps[order]
+    index = np.arange(n)
+
+    new_sequence = np.ones(n, dtype=bool)
+    new_sequence[1:] = (g[1:] != g[:-1]) | (np.diff(t) > max_idle)
+    start = np.maximum.accumulate(np.where(new_sequence, index, 0))
+
+    lookup = index[:, None] - (timesteps - 1) + np.arange(timesteps)[None, :]
+    valid = lookup >= start[:, None]
+    sorted_windows = np.asarray(X, dtype=np.float32)[order][np.maximum(lookup, 0)]
+    sorted_windows[~valid] = 0
+
+    windows = np.empty_like(sorted_windows)
+    lengths = np.empty(n, dtype=np.int64)
+    windows[order] = sorted_windows
+    lengths[order] = valid.sum(axis=1)
+    return windows, lengths
+
+
+class SequenceWindower(object):
+    """
+    build_windows() per chunk dengan konteks antar chunk: T - 1 observasi terakhir
+    tiap flow yang masih aktif dibawa ke chunk berikutnya. Chunk diasumsikan
+    datang urut waktu (FlowStatsfile.csv ditulis append per siklus polling).
+    """
+
+    def __init__(self, timesteps, max_idle=DEFAULT_MAX_IDLE):
+        self.timesteps = timesteps
+        self.max_idle = max_idle
+        self._carry = None   # (groups, timestamps, X) konteks dari chunk sebelumnya
+
+    def transform(self, groups, timestamps, X):
+        n = len(X)
+        if self._carry is not None and len(self._carry[0]):
+            groups = np.concatenate([self._carry[0], groups])
+            timestamps = np.concatenate([self._carry[1], timestamps])
+            X = np.concatenate([self._carry[2], X])
+        context = len(X) - n
+        windows, lengths = build_windows(groups, timestamps, X, self.timesteps, self.max_idle)
+        self._carry = self._tail(groups, timestamps, X)
+        return windows[context:], lengths[context:]
+
+    def _tail(self, groups, timestamps, X):
+        keep = self.timesteps - 1
+        if keep == 0 or len(X) == 0:
+            return None
+        order = np.lexsort((timestamps, groups))
+        g = groups[order]
+        last = np.ones(len(g), dtype=bool)
+        last[:-1] = g[:-1] != g[1:]
+        # jarak ke baris terakhir flow yang sama (0 = observasi terbaru)
+        end = np.minimum.accumulate(np.where(last, np.arange(len(g)), len(g))[::-1])[::-1]
+        recent = (end - np.arange(len(g))) < keep
+        alive = timestamps[order] >= timestamps.max() - self.max_idle
+        idx = order[recent & alive[end]]
+        return groups[idx], timestamps[idx], X[idx]
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# stats_record.py
+# Rekaman ringkas reply flow stats (OFPFlowStatsReply) dalam bentuk pesan
+# OpenFlow mentah, untuk di-replay tanpa Mininet / OVS (lihat replay_bench.py).
+#
+#   header file : b'OFSR' + versi (uint16)
+#   per record  : timestamp (float64), epoch (uint64), datapath_id (uint64),
+#                 panjang (uint32), lalu pesan OpenFlow apa adanya (msg.buf)
+#
+# Semua bagian multipart direkam (flag REPLY_MORE ada di pesan). Path berakhiran
+# .gz ditulis / dibaca dengan gzip (ukuran biasanya < 1/5).
+import gzip
+import struct
+
+RECORD_MAGIC = b'OFSR'
+RECORD_VERSION = 1
+
+_FILE_HEADER = struct.Struct('<4sH')
+_RECORD_HEADER = struct.Struct('<dQQI')
+
+
+def _open(path, mode):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode, compresslevel=1) if 'w' in mode else gzip.open(path, mode)
+    return open(path, mode)
+
+
+class StatsRecorder(object):
+    """Tulis bagian reply flow stats ke file rekaman (dipanggil dari reply handler)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.records = 0
+        self._f = _open(path, 'wb')
+        self._f.write(_FILE_HEADER.pack(RECORD_MAGIC, RECORD_VERSION))
+
+    def write(self, timestamp, epoch, datapath_id, buf):
+        self._f.write(_RECORD_HEADER.pack(timestamp, epoch, datapath_id, len(buf)))
+        self._f.write(buf)
+        self.records += 1
+
+    def flush(self):
+        self._f.flush()
+
+    def close(self):
+        self._f.close()
+
+
+def read_records(path):
+    """Yield (timestamp, epoch, datapath_id, buf) sesuai urutan rekaman."""
+    with _open(path, 'rb') as f:
+        magic, version = _FILE_HEADER.unpack(f.read(_FILE_HEADER.size))
+        if magic != RECORD_MAGIC or version != RECORD_VERSION:
+            raise ValueError("{} bukan rekaman flow stats (versi {})".format(path, RECORD_VERSION))
+        while True:
+            header = f.read(_RECORD_HEADER.size)
+            if len(header) < _RECORD_HEADER.size:
+                return
+            timestamp, epoch, datapath_id, length = _RECORD_HEADER.unpack(header)
+            buf = f.read(length)
+            if len(buf) < length:
+                # rekaman terpotong (controller berhenti saat menulis)
+                return
+            yield timestamp, epoch, datapath_id, buf
+
+
+def read_cycles(path):
+    """
+    Yield satu siklus polling per epoch: (timestamp reply pertama, list (datapath_id, buf)).
+    Record dengan epoch yang sama dan berurutan dianggap satu siklus.
+    """
+    epoch = None
+    start = None
+    parts = []
+    for timestamp, record_epoch, datapath_id, buf in read_records(path):
+        if record_epoch != epoch and parts:
+            yield start, parts
+            parts = []
+        if not parts:
+            epoch, start = record_epoch, timestamp
+        parts.append((datapath_id, buf))
+    if parts:
+        yield start, parts
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+# synthetic_flows.py
+# Tabel flow sintetis (traffic benign + flood) dan encoder OFPFlowStatsReply
+# OpenFlow 1.3 tanpa Ryu / OVS, dipakai replay_bench.py (rekaman sintetis) dan
+# fake_switch.py (switch palsu untuk uji beban controller).
+#
+# Setiap entri flow berukuran tetap 120 byte: ofp_flow_stats (48) + match OXM
+# eth_type/ipv4_src/ipv4_dst/ip_proto/port L4 atau tipe-kode ICMP (48, dengan
+# padding) + instruksi apply-actions output (24). Karena ukurannya tetap, semua
+# entri di-encode sekaligus sebagai numpy structured array (big-endian), hanya
+# counter yang ditulis ulang tiap poll.
+import struct
+
+import numpy as np
+
+OFP_VERSION = 0x04
+OFPT_MULTIPART_REPLY = 19
+OFPMP_FLOW = 1
+OFPMPF_REPLY_MORE = 1
+# panjang maksimum satu pesan OpenFlow (field length uint16)
+MAX_MESSAGE_LEN = 0xffff
+
+OF_HEADER = struct.Struct('!BBHI')
+MULTIPART_HEADER = struct.Struct('!HH4x')
+
+_MATCH_LEN = 48
+_INSTRUCTIONS_LEN = 24
+ENTRY_DTYPE = np.dtype([
+    ('length', '>u2'), ('table_id', 'u1'), ('pad', 'u1'),
+    ('duration_sec', '>u4'), ('duration_nsec', '>u4'),
+    ('priority', '>u2'), ('idle_timeout', '>u2'), ('hard_timeout', '>u2'), ('flags', '>u2'),
+    ('pad2', 'u1', (4,)), ('cookie', '>u8'), ('packet_count', '>u8'), ('byte_count', '>u8'),
+    ('tail', 'u1', (_MATCH_LEN + _INSTRUCTIONS_LEN,)),
+])
+ENTRY_LEN = ENTRY_DTYPE.itemsize
+ENTRIES_PER_MESSAGE = (MAX_MESSAGE_LEN - OF_HEADER.size - MULTIPART_HEADER.size) // ENTRY_LEN
+
+# OXM OpenFlow basic: (field, panjang value)
+_OXM_ETH_TYPE = (5, 2)
+_OXM_IP_PROTO = (10, 1)
+_OXM_IPV4_SRC = (11, 4)
+_OXM_IPV4_DST = (12, 4)
+_OXM_L4 = {
+    6: ((13, 2), (14, 2)),     # tcp_src, tcp_dst
+    17: ((15, 2), (16, 2)),    # udp_src, udp_dst
+    1: ((19, 1), (20, 1)),     # icmpv4_type, icmpv4_code
+}
+
+# host topologi Mininet (10.0.0.1 .. 10.0.0.18)
+DEFAULT_HOSTS = 18
+
+
+def _oxm_header(field):
+    return [0x80, 0x00, field[0] << 1, field[1]]
+
+
+def _be_bytes(values, dtype):
+    return np.ascontiguousarray(values, dtype=dtype).view(np.uint8).reshape(len(values), -1)
+
+
+def encode_matches(ip_src, ip_dst, ip_proto, port_a, port_b, out_port):
+    """
+    Bagian match + instruksi (72 byte) per flow. ip_src / ip_dst uint32,
+    port_a / port_b = port L4 (tcp / udp) atau tipe / kode ICMP.
+    """
+    n = len(ip_src)
+    tail = np.zeros((n, _MATCH_LEN + _INSTRUCTIONS_LEN), dtype=np.uint8)
+    tail[:, 0:2] = (0, 1)                                # OFPMT_OXM
+    tail[:, 4:10] = _oxm_header(_OXM_ETH_TYPE) + [0x08, 0x00]
+    tail[:, 10:14] = _oxm_header(_OXM_IPV4_SRC)
+    tail[:, 14:18] = _be_bytes(ip_src, '>u4')
+    tail[:, 18:22] = _oxm_header(_OXM_IPV4_DST)
+    tail[:, 22:26] = _be_bytes(ip_dst, '>u4')
+    tail[:, 26:30] = _oxm_header(_OXM_IP_PROTO)
+    tail[:, 30] = ip_proto
+    match_len = np.full(n, 31, dtype=np.uint16)
+    for proto, (field_a, field_b) in _OXM_L4.items():
+        rows = ip_proto == proto
+        if not rows.any():
+            continue
+        size = field_a[1]
+        dtype = '>u2' if size == 2 else 'u1'
+        pos = 31
+        for field, values in ((field_a, port_a[rows]), (field_b, port_b[rows])):
+            tail[rows, pos:pos + 4] = _oxm_header(field)
+            tail[rows, pos + 4:pos + 4 + size] = _be_bytes(values, dtype)
+            pos += 4 + size
+        match_len[rows] = pos
+    tail[:, 2:4] = _be_bytes(match_len, '>u2')
+    # OFPIT_APPLY_ACTIONS (len 24) berisi satu OFPActionOutput (len 16)
+    tail[:, 48:52] = (0, 4, 0, 24)
+    tail[:, 56:60] = (0, 0, 0, 16)
+    tail[:, 60:64] = _be_bytes(out_port, '>u4')
+    return tail
+
+
+def encode_flow_stats_reply(xid, entries, max_entries=ENTRIES_PER_MESSAGE):
+    """
+    Pecah array entri (ENTRY_DTYPE) menjadi list pesan OFPMultipartReply
+    (OFPMP_FLOW) dengan flag REPLY_MORE di semua bagian kecuali terakhir.
+    """
+    raw = entries.tobytes()
+    n = len(entries)
+    messages = []
+    start = 0
+    while True:
+        end = min(n, start + max_entries)
+        body = raw[start * ENTRY_LEN:end * ENTRY_LEN]
+        flags = OFPMPF_REPLY_MORE if end < n else 0
+        length = OF_HEADER.size + MULTIPART_HEADER.size + len(body)
+        messages.append(OF_HEADER.pack(OFP_VERSION, OFPT_MULTIPART_REPLY, length, xid) +
+                        MULTIPART_HEADER.pack(OFPMP_FLOW, flags) + body)
+        if end >= n:
+            return messages
+        start = end
+
+
+def _host_ip(index):
+    return (10 << 24) + 1 + np.asarray(index, dtype=np.uint32)
+
+
+class SyntheticFlowTable(object):
+    """
+    Tabel flow satu switch dengan counter yang bertambah tiap advance():
+
+      - benign: pasangan host topologi, TCP / UDP / ICMP, beberapa paket per
+        detik dengan ukuran paket campuran
+      - flood : sumber acak (spoofed) ke n_victims host, rate tinggi dengan
+        paket kecil; hanya bertambah selama flooding=True
+
+    Flow memakai priority / timeout rule SimpleSwitch13 (priority 1).
+    """
+
+    def __init__(self, n_flows, flood_fraction=0.2, n_hosts=DEFAULT_HOSTS, n_victims=1,
+                 priority=1, idle_timeout=20, hard_timeout=100, table_id=0, seed=0):
+        rng = self._rng = np.random.RandomState(seed)
+        n_flood = int(round(n_flows * flood_fraction))
+        n_benign = n_flows - n_flood
+        self.n_flows = n_flows
+        self.flooding = n_flood > 0
+        self.flood = np.zeros(n_flows, dtype=bool)
+        self.flood[n_benign:] = True
+
+        src_host = rng.randint(0, n_hosts, n_flows)
+        dst_host = (src_host + rng.randint(1, max(n_hosts, 2), n_flows)) % n_hosts
+        victims = rng.choice(n_hosts, min(n_victims, n_hosts), replace=False)
+        dst_host[n_benign:] = victims[rng.randint(0, len(victims), n_flood)]
+        self.ip_src = _host_ip(src_host)
+        # sumber flood: alamat acak 1.0.0.0 - 223.255.255.255 (--rand-source)
+        self.ip_src[n_benign:] = rng.randint(1 << 24, 224 << 24, n_flood).astype(np.uint32)
+        self.ip_dst = _host_ip(dst_host)
+
+        self.ip_proto = rng.choice(np.array([6, 17, 1], dtype=np.uint8), n_flows, p=[0.7, 0.25, 0.05])
+        self.ip_proto[n_benign:] = rng.choice(np.array([6, 17, 1], dtype=np.uint8), n_flood)
+        port_a = rng.randint(1024, 65536, n_flows)
+        port_b = rng.choice(np.array([80, 443, 53, 22, 8080]), n_flows)
+        icmp = self.ip_proto == 1
+        port_a[icmp] = 8            # echo request
+        port_b[icmp] = 0
+        out_port = dst_host.astype(np.uint32) % 4 + 1
+
+        # paket per detik dan ukuran paket per flow
+        self.pps = rng.lognormal(1.0, 1.0, n_flows)
+        self.pps[n_benign:] = rng.lognormal(4.0, 0.5, n_flood)
+        self.packet_size = rng.randint(64, 1500, n_flows)
+        self.packet_size[n_benign:] = rng.randint(60, 100, n_flood)
+
+        self.duration = rng.uniform(0.0, 30.0, n_flows)
+        self.duration[n_benign:] = 0.0
+        self.packet_count = np.zeros(n_flows, dtype=np.uint64)
+        self.byte_count = np.zeros(n_flows, dtype=np.uint64)
+        # waktu tabel (jumlah dt advance) dan batas waktu drop per flow (rule mitigasi)
+        self.clock = 0.0
+        self.blocked_until = np.zeros(n_flows, dtype=np.float64)
+
+        self.entries = np.zeros(n_flows, dtype=ENTRY_DTYPE)
+        self.entries['length'] = ENTRY_LEN
+        self.entries['table_id'] = table_id
+        self.entries['priority'] = priority
+        self.entries['idle_timeout'] = idle_timeout
+        self.entries['hard_timeout'] = hard_timeout
+        self.entries['tail'] = encode_matches(self.ip_src, self.ip_dst, self.ip_proto,
+                                              port_a, port_b, out_port)
+        self._sync()
+
+    def advance(self, dt):
+        """Majukan waktu dt detik: counter bertambah sesuai rate (Poisson) tiap flow."""
+        packets = self._rng.poisson(self.pps * dt).astype(np.uint64)
+        self.clock += dt
+        active = np.ones(self.n_flows, dtype=bool) if self.flooding else ~self.flood
+        # flow flood baru "terpasang" di switch saat flooding dimulai
+        self.duration[active] += dt
+        # paket yang cocok dengan rule drop tidak lagi sampai ke flow ini
+        packets[~active | (self.blocked_until > self.clock)] = 0
+        self.packet_count += packets
+        self.byte_count += packets * self.packet_size.astype(np.uint64)
+        self._sync()
+
+    def block(self, ip_src=None, ip_dst=None, duration=0.0):
+        """
+        Rule drop (mis. dari MitigationManager) untuk ip_src / ip_dst (uint32,
+        None = semua) selama duration detik. Return jumlah flow yang terkena.
+        """
+        mask = np.ones(self.n_flows, dtype=bool)
+        if ip_src is not None:
+            mask &= self.ip_src == ip_src
+        if ip_dst is not None:
+            mask &= self.ip_dst == ip_dst
+        until = self.clock + (duration if duration > 0 else float('inf'))
+        self.blocked_until[mask] = np.maximum(self.blocked_until[mask], until)
+        return int(mask.sum())
+
+    def _sync(self):
+        seconds = np.floor(self.duration)
+        self.entries['duration_sec'] = seconds
+        self.entries['duration_nsec'] = (self.duration - seconds) * 1e9
+        self.entries['packet_count'] = self.packet_count
+        self.entries['byte_count'] = self.byte_count
+
+    def replies(self, xid, max_entries=ENTRIES_PER_MESSAGE):
+        """
+        Pesan OFPFlowStatsReply (multipart) untuk seluruh tabel dengan xid request.
+        Selama flooding=False flow flood tidak ada di tabel.
+        """
+        entries = self.entries if self.flooding else self.entries[~self.flood]
+        return encode_flow_stats_reply(xid, entries, max_entries)
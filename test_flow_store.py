@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# test_flow_store.py
+# FlowRateCache dengan datapath yang di-poll pada interval berbeda.
+import numpy as np
+
+from flow_store import FlowRateCache
+
+
+def _update(cache, datapath_id, packet_count, byte_count, duration):
+    key = (datapath_id, 0, 1, (('ipv4_src', '10.0.0.1'), ('ipv4_dst', '10.0.0.2')))
+    pps, bps = cache.update_many([key], np.array([packet_count], dtype=np.float64),
+                                 np.array([byte_count], dtype=np.float64),
+                                 np.array([duration], dtype=np.float64))
+    return pps[0], bps[0]
+
+
+def test_rate_cache_keeps_datapaths_not_polled():
+    cache = FlowRateCache()
+    # epoch 1: kedua datapath di-poll
+    _update(cache, 1, 100, 1000, 10)
+    _update(cache, 2, 100, 1000, 10)
+    cache.commit([1, 2])
+
+    # epoch 2: hanya dp1 jatuh tempo (interval dp2 lebih panjang)
+    assert _update(cache, 1, 300, 3000, 12) == (100.0, 1000.0)
+    cache.commit([1])
+
+    # epoch 3: dp2 masih punya counter epoch 1
+    assert _update(cache, 2, 500, 5000, 14) == (100.0, 1000.0)
+    assert _update(cache, 1, 500, 5000, 14) == (100.0, 1000.0)
+    cache.commit([1, 2])
+    assert len(cache) == 2
+
+
+def test_rate_cache_expires_flows_of_polled_datapath():
+    cache = FlowRateCache()
+    _update(cache, 1, 100, 1000, 10)
+    _update(cache, 2, 100, 1000, 10)
+    cache.commit([1, 2])
+    # dp1 di-poll tanpa flow tersebut: counter-nya kadaluarsa, dp2 tidak berubah
+    cache.commit([1])
+    assert len(cache) == 1
+    # tanpa counter sebelumnya: rate sejak flow dibuat
+    assert _update(cache, 1, 300, 3000, 12) == (25.0, 250.0)
+
+
+def test_rate_cache_first_poll_uses_lifetime_rate():
+    cache = FlowRateCache()
+    assert _update(cache, 1, 50000, 500000, 5) == (10000.0, 100000.0)
+    assert _update(cache, 2, 10, 100, 0) == (0.0, 0.0)
+    cache.commit([1, 2])
+    assert _update(cache, 1, 60000, 600000, 6) == (10000.0, 100000.0)
+
+
+def test_rate_cache_counter_reset_uses_lifetime_rate():
+    cache = FlowRateCache()
+    _update(cache, 1, 50000, 500000, 50)
+    cache.commit([1])
+    # flow dipasang ulang dengan match yang sama: counter dan durasi mulai dari 0
+    assert _update(cache, 1, 400, 4000, 2) == (200.0, 2000.0)
+
+
+def test_rate_cache_ignores_straggler_parts():
+    cache = FlowRateCache()
+    _update(cache, 1, 100, 1000, 10)
+    cache.commit([1])
+    # reply dp1 tidak lengkap saat timeout: bagiannya tidak menggantikan counter lama
+    _update(cache, 1, 200, 2000, 11)
+    cache.commit([])
+    assert _update(cache, 1, 300, 3000, 12) == (100.0, 1000.0)
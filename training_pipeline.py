@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+# training_pipeline.py
+# Pipeline training LSTM streaming untuk FlowStatsfile.csv, dipakai oleh
+# retrain.py dan lstm.py. CSV dibaca per chunk sehingga memori puncak dibatasi
+# ukuran chunk, bukan ukuran dataset:
+#   pass 1: MinMaxScaler.partial_fit per chunk + kumpulkan kelas label
+#   pass 2: generator batch (scale + reshape per chunk) -> tf.data -> model.fit
+# Dengan timesteps > 1, setiap baris menjadi window T observasi terakhir flow
+# yang sama (urut timestamp), dibangun per chunk oleh sequence_buffer.
+# Dengan cache_dir, chunk dibaca dari cache .npy hasil dataset_cache (tanpa
+# parsing CSV) dan hanya baris yang baru ditambahkan ke CSV yang di-parse.
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder, MinMaxScaler
+
+import dataset_cache
+from flow_store import DROP_COLUMNS
+from sequence_buffer import DEFAULT_MAX_IDLE, SequenceWindower, scale_windows
+
+LABEL_COLUMN = 'label'
+DEFAULT_CHUNKSIZE = 100000
+DEFAULT_CACHE_DIR = '.dataset_cache'
+
+
+def _validation_mask(chunk_index, n_rows, test_size, random_state):
+    # split train/validation deterministik per chunk: sama di setiap pass dan epoch
+    rng = np.random.RandomState((random_state + chunk_index) % (2 ** 32))
+    return rng.rand(n_rows) < test_size
+
+
+class StreamingDataset(object):
+    """
+    Dataset training dari CSV yang dibaca ulang per chunk di setiap epoch.
+
+    fit() menjalankan pass pertama (scaler, label encoder, jumlah baris),
+    batches() / dataset() menghasilkan batch (X (b, timesteps, features), y)
+    untuk subset 'train' atau 'val'. Split train/validation ditentukan per
+    baris secara acak dengan seed tetap (pengganti train_test_split yang butuh
+    seluruh data di memori).
+
+    cache_dir (opsional) mengaktifkan cache preprocessing dataset_cache; batas
+    chunk sama dengan pembacaan CSV sehingga split dan hasil training identik.
+
+    timesteps > 1 membutuhkan kolom datapath_id / flow_id (identitas flow) dan
+    timestamp; window dibangun dengan aturan yang sama dengan FlowSequenceBuffer
+    di controller (padding di awal, sekuens diputus setelah max_idle detik).
+    """
+
+    def __init__(self, csv_path, chunksize=DEFAULT_CHUNKSIZE, test_size=0.2,
+                 random_state=42, batch_size=64, cache_dir=None, timesteps=1,
+                 max_idle=DEFAULT_MAX_IDLE):
+        self.csv_path = csv_path
+        self.chunksize = chunksize
+        self.test_size = test_size
+        self.random_state = random_state
+        self.batch_size = batch_size
+        self.cache_dir = cache_dir
+        self.timesteps = timesteps
+        self.max_idle = max_idle
+
+        self.scaler = None
+        self.le = None
+        self.features = None
+        self.n_train = 0
+        self.n_val = 0
+        self._shuffle_round = 0
+
+    @property
+    def n_features(self):
+        return len(self.features)
+
+    def _iter_arrays(self):
+        """
+        Yield (nama fitur, X float64, y label mentah, id flow, timestamp) per chunk
+        dari cache atau langsung dari CSV (kolom DROP_COLUMNS dibuang, fillna 0).
+        """
+        if self.cache_dir is not None:
+            cached = dataset_cache.load(self.csv_path, self.cache_dir, LABEL_COLUMN,
+                                        DROP_COLUMNS, self.chunksize)
+            if self.timesteps > 1 and not cached.has_groups:
+                raise ValueError("Kolom datapath_id / flow_id dibutuhkan untuk timesteps > 1")
+            for X, y, groups, timestamps in cached.iter_chunks(self.chunksize):
+                yield cached.features, X, y, groups, timestamps
+            return
+        for chunk in pd.read_csv(self.csv_path, chunksize=self.chunksize):
+            if LABEL_COLUMN not in chunk.columns:
+                raise ValueError("Kolom '{}' tidak ditemukan di {}".format(LABEL_COLUMN, self.csv_path))
+            if self.timesteps > 1 and not any(c in chunk.columns for c in dataset_cache.GROUP_COLUMNS):
+                raise ValueError("Kolom datapath_id / flow_id dibutuhkan untuk timesteps > 1")
+            features = [c for c in chunk.columns if c != LABEL_COLUMN and c not in DROP_COLUMNS]
+            yield (features,) + dataset_cache.split_chunk(chunk, features, LABEL_COLUMN)
+
+    def fit(self):
+        """Pass pertama: fit scaler (incremental min/max) dan label encoder."""
+        scaler = MinMaxScaler()
+        classes = set()
+        n_train = n_val = 0
+        features = None
+        for i, (chunk_features, X, y, _, _) in enumerate(self._iter_arrays()):
+            if features is None:
+                features = chunk_features
+            # partial_fit dengan DataFrame agar nama kolom tersimpan di scaler.feature_names_in_
+            scaler.partial_fit(pd.DataFrame(X, columns=features))
+            classes.update(np.unique(y).tolist())
+            n = int(_validation_mask(i, len(X), self.test_size, self.random_state).sum())
+            n_val += n
+            n_train += len(X) - n
+        if features is None:
+            raise ValueError("{} kosong".format(self.csv_path))
+
+        self.scaler = scaler
+        self.le = LabelEncoder().fit(sorted(classes))
+        self.features = features
+        self.n_train = n_train
+        self.n_val = n_val
+        return self
+
+    def batches(self, subset='train', shuffle=True):
+        """Pass kedua: generator batch (X float32, y int64) untuk subset 'train' / 'val'."""
+        self._shuffle_round += 1
+        rng = np.random.RandomState((self.random_state + self._shuffle_round) % (2 ** 32))
+        # konteks sekuens dibawa antar chunk, dimulai ulang setiap pass
+        windower = SequenceWindower(self.timesteps, self.max_idle) if self.timesteps > 1 else None
+        for i, (_, X, y, groups, timestamps) in enumerate(self._iter_arrays()):
+            val = _validation_mask(i, len(X), self.test_size, self.random_state)
+            keep = val if subset == 'val' else ~val
+            if windower is not None:
+                # window dibangun dari semua baris (train + val) agar history flow lengkap
+                windows, lengths = windower.transform(groups, timestamps, X)
+                if not keep.any():
+                    continue
+                X = scale_windows(windows[keep], lengths[keep], self.scaler)
+            else:
+                if not keep.any():
+                    continue
+                # sama dengan MinMaxScaler.transform, tanpa overhead validasi DataFrame per chunk
+                X = (X[keep] * self.scaler.scale_ + self.scaler.min_).astype(np.float32)
+                # reshape ke 3D untuk LSTM (timesteps=1)
+                X = X.reshape((X.shape[0], 1, X.shape[1]))
+            y = self.le.transform(y[keep]).astype(np.int64)
+            # shuffle hanya di dalam chunk agar memori tetap terbatas
+            order = rng.permutation(len(X)) if shuffle else np.arange(len(X))
+            for start in range(0, len(order), self.batch_size):
+                idx = order[start:start + self.batch_size]
+                yield X[idx], y[idx]
+
+    def dataset(self, subset='train', shuffle=True):
+        """tf.data.Dataset dari batches(); generator dipanggil ulang setiap epoch."""
+        import tensorflow as tf
+
+        spec = (
+            tf.TensorSpec(shape=(None, self.timesteps, self.n_features), dtype=tf.float32),
+            tf.TensorSpec(shape=(None,), dtype=tf.int64),
+        )
+        return tf.data.Dataset.from_generator(
+            lambda: self.batches(subset, shuffle), output_signature=spec).prefetch(2)
+
+
+def build_lstm_model(timesteps, n_features, n_classes):
+    """Arsitektur LSTM(128) -> Dropout -> Dense(64) -> Dropout -> Dense softmax."""
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Input, LSTM, Dense, Dropout
+
+    model = Sequential()
+    model.add(Input(shape=(timesteps, n_features)))
+    model.add(LSTM(128, return_sequences=False))
+    model.add(Dropout(0.3))
+    model.add(Dense(64, activation='relu'))
+    model.add(Dropout(0.3))
+    # binary tetap memakai 2 output softmax + sparse_categorical_crossentropy
+    model.add(Dense(max(n_classes, 2), activation='softmax'))
+    model.compile(optimizer='adam', loss='sparse_categorical_crossentropy', metrics=['accuracy'])
+    return model
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# victims.py
+# Agregasi hasil prediksi satu epoch per tujuan (ip_dst): jumlah flow ddos,
+# packet / byte rate, dan K sumber (ip_src) terbesar per victim. Semua dihitung
+# sekali atas seluruh batch (kode string per IP, lalu bincount / lexsort), dipakai
+# untuk laporan _report_prediction dan rule MitigationManager.
+from collections import namedtuple
+
+import numpy as np
+
+# satu sumber serangan untuk satu victim; datapath_ids = datapath tempat flow-nya terlihat
+SourceSummary = namedtuple('SourceSummary', 'ip_src flows pps bps datapath_ids')
+# satu victim: flow ddos / total flow ke ip_dst ini, rate ddos, dan sumber teratas
+VictimSummary = namedtuple('VictimSummary', 'ip_dst ddos_flows total_flows pps bps sources')
+
+
+def _factorize(values):
+    """Kode integer per nilai unik (urutan kemunculan) dan list nilainya; lebih cepat dari np.unique untuk string."""
+    index = {}
+    codes = np.fromiter((index.setdefault(v, len(index)) for v in values.tolist()), np.int64, len(values))
+    return list(index), codes
+
+
+def _rank_in_group(group, score, flows):
+    """
+    Urutan (index) berdasarkan group lalu score menurun (seri: jumlah flow
+    menurun), dan peringkat di dalam group.
+    """
+    order = np.lexsort((-flows, -score, group))
+    sorted_group = group[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = sorted_group[1:] != sorted_group[:-1]
+    start = np.maximum.accumulate(np.where(first, np.arange(len(order)), 0))
+    return order, np.arange(len(order)) - start
+
+
+def rank_victims(snapshot, preds, top_k=5):
+    """
+    Return list VictimSummary untuk setiap ip_dst yang punya flow ddos, urut
+    packet rate ddos terbesar (seri: jumlah flow ddos). Setiap victim membawa
+    maksimum top_k sumber (urut packet rate, lalu jumlah flow) beserta
+    datapath tempat pasangan sumber-victim terlihat.
+    """
+    ddos = np.asarray(preds) != 0
+    if len(snapshot) == 0 or not ddos.any():
+        return []
+
+    victims, dst_code = _factorize(snapshot.column('ip_dst'))
+    n_victims = len(victims)
+    total_flows = np.bincount(dst_code, minlength=n_victims)
+
+    code = dst_code[ddos]
+    pps = snapshot.column('interval_packet_count_per_second')[ddos]
+    bps = snapshot.column('interval_byte_count_per_second')[ddos]
+    ddos_flows = np.bincount(code, minlength=n_victims)
+    victim_pps = np.bincount(code, weights=pps, minlength=n_victims)
+    victim_bps = np.bincount(code, weights=bps, minlength=n_victims)
+
+    # pasangan (victim, sumber) di antara flow ddos
+    sources, src_code = _factorize(snapshot.column('ip_src')[ddos])
+    n_sources = len(sources)
+    pair_codes, pair = np.unique(code * n_sources + src_code, return_inverse=True)
+    pair_flows = np.bincount(pair, minlength=len(pair_codes))
+    pair_pps = np.bincount(pair, weights=pps, minlength=len(pair_codes))
+    pair_bps = np.bincount(pair, weights=bps, minlength=len(pair_codes))
+    pair_victim = pair_codes // n_sources
+    pair_source = pair_codes % n_sources
+
+    order, rank = _rank_in_group(pair_victim, pair_pps, pair_flows)
+    top = order[rank < top_k]
+
+    # datapath per pasangan teratas: kombinasi unik (pasangan, datapath)
+    is_top = np.zeros(len(pair_codes), dtype=bool)
+    is_top[top] = True
+    rows = is_top[pair]
+    combos = np.unique(np.stack([pair[rows].astype(np.uint64),
+                                 snapshot.column('datapath_id')[ddos][rows].astype(np.uint64)]), axis=1)
+    datapaths = {}
+    for p, dpid in combos.T.tolist():
+        datapaths.setdefault(p, []).append(dpid)
+
+    top_by_victim = {}
+    for p in top.tolist():
+        top_by_victim.setdefault(int(pair_victim[p]), []).append(SourceSummary(
+            str(sources[pair_source[p]]), int(pair_flows[p]), float(pair_pps[p]),
+            float(pair_bps[p]), datapaths.get(p, [])))
+
+    result = []
+    ranked = np.flatnonzero(ddos_flows)
+    ranked = ranked[np.lexsort((-ddos_flows[ranked], -victim_pps[ranked]))]
+    for v in ranked.tolist():
+        result.append(VictimSummary(str(victims[v]), int(ddos_flows[v]), int(total_flows[v]),
+                                    float(victim_pps[v]), float(victim_bps[v]),
+                                    top_by_victim.get(v, [])))
+    return result